@@ -0,0 +1,78 @@
+# ================= AÇILIŞ BÜTÇESİ =================
+# app.py'nin modül düzeyindeki içe aktarmalarının açılışa eklediği süreyi ölçer:
+#   python acilis_butcesi.py --butce-ms 1500
+# İçe aktarmalar app.py'deki sırayla, temiz bir yorumlayıcıda `-X importtime`
+# ile çalıştırılıyor; her satıra, daha önce yüklenmemiş modüllerin toplam
+# süresi yazılıyor (ortak bağımlılıklar ilk kullanan satıra sayılır). Ölçüm
+# birkaç kez tekrarlanıp en küçük değer alınıyor. Toplam bütçeyi aşarsa çıkış
+# kodu 1; yalnızca ilk kullanımda yüklenen (ertelenen) paketler ayrıca
+# bilgi olarak listeleniyor.
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+KLASOR = os.path.dirname(os.path.abspath(__file__))
+UYGULAMA = os.path.join(KLASOR, "app.py")
+BUTCE_MS = 1000
+GENISLIK = 60  # uzun import satırları tabloda kısaltılıyor
+ERTELENEN = ["google.generativeai", "openmeteo_requests", "requests_cache", "retry_requests"]
+
+
+def ice_aktarmalar(yol=UYGULAMA):
+    # Modül düzeyindeki import satırları (fonksiyon içindekiler hariç), dosyadaki sırayla
+    with open(yol, encoding="utf-8") as f:
+        agac = ast.parse(f.read())
+    return [ast.unparse(dugum) for dugum in agac.body if isinstance(dugum, (ast.Import, ast.ImportFrom))]
+
+
+def olc(satirlar):
+    # Satır başına yeni yüklenen modüllerin süresi (ms)
+    kod = "import sys\n" + "".join(f"{satir}\nsys.stderr.write('#{i}\\n')\n" for i, satir in enumerate(satirlar))
+    cikti = subprocess.run([sys.executable, "-X", "importtime", "-c", kod], cwd=KLASOR,
+                           capture_output=True, text=True, check=True).stderr
+    sureler = [0.0] * len(satirlar)
+    i = 0
+    for satir in cikti.splitlines():
+        if satir.startswith("#"):
+            i = int(satir[1:]) + 1
+        elif satir.startswith("import time:") and i < len(satirlar):
+            _, kumulatif, ad = satir.split("|", 2)
+            # Sadece en üst düzeydeki modüller; iç içe olanlar zaten kümülatif süreye dahil
+            if ad and not ad[1:].startswith(" ") and kumulatif.strip().isdigit():
+                sureler[i] += int(kumulatif) / 1000
+    return sureler
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(description="app.py içe aktarmalarının açılış süresi bütçe kontrolü.")
+    ayristirici.add_argument("--butce-ms", type=float, default=BUTCE_MS, help=f"izin verilen toplam süre (varsayılan: {BUTCE_MS} ms)")
+    ayristirici.add_argument("--tekrar", type=int, default=3, help="ölçüm tekrarı, en küçüğü alınır (varsayılan: 3)")
+    args = ayristirici.parse_args(argv)
+
+    satirlar = ice_aktarmalar()
+    olcumler = [olc(satirlar) for _ in range(max(1, args.tekrar))]
+    sureler = [min(s) for s in zip(*olcumler)]
+    genislik = min(max(len(s) for s in satirlar), GENISLIK)
+    for satir, sure in sorted(zip(satirlar, sureler), key=lambda x: -x[1]):
+        if len(satir) > genislik:
+            satir = satir[:genislik - 3] + "..."
+        print(f"{satir:<{genislik}}  {sure:8.1f} ms")
+    toplam = sum(sureler)
+    print(f"{'Toplam':<{genislik}}  {toplam:8.1f} ms (bütçe {args.butce_ms:.0f} ms)")
+
+    # Ertelenen paketler: açılışa dahil değil, ilk kullanıldıklarında bu kadar süre ekliyorlar
+    ertelenen = [min(s) for s in zip(*[olc(satirlar + [f"import {ad}" for ad in ERTELENEN]) for _ in range(max(1, args.tekrar))])][len(satirlar):]
+    for ad, sure in zip(ERTELENEN, ertelenen):
+        print(f"{'  ertelenen: ' + ad:<{genislik}}  {sure:8.1f} ms")
+
+    if toplam > args.butce_ms:
+        print(f"Açılış bütçesi {toplam - args.butce_ms:.0f} ms aşıldı.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
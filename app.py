@@ -1,15 +1,34 @@
 import streamlit as st
-import google.generativeai as genai
-import openmeteo_requests
-import requests_cache
 import pandas as pd
-from retry_requests import retry
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
 import datetime
+import functools
+import threading
 import time
+from contextlib import contextmanager
 import streamlit as st
+from arsiv_deposu import ArsivDeposu
+from concurrent.futures import wait
+from eszamanli import arka_planda, doldurma_arka_planda
+import queue
+from onbellek import CEYREK_SAAT, SAAT
+from hiz_sinirlayici import kova
+from rapor_onbellegi import parmak_izi, rapor_akisi
+from klimatoloji import normalleri_getir, anomali_analizi, ozet_istatistikleri
+from turetilmis import donem_ozeti, kod_bilgisi, kod_cozucu, tavsiye_metinleri, turetilmis_ekle
+from grafik_verisi import cizgi_verisi, cizgi_izi, yagis_verisi
+from konum_dizini import konum_dizini
+from saatlik import SaatlikDepo, gunici_dongu, gunluk_ozet, yeniden_ornekle
+from veri_havuzu import veri_havuzu
+from disa_aktarma import BICIMLER, dosya as disa_aktarma_dosyasi, ust_veri
+import izleme
+from bolge import cevre_kutusu, harita_yakinligi, hucre_geojson, izgara_olustur
+from veri_kaynaklari import (koordinat_bul, anlik_durum_cek, gecmis_veri_cek_v2, saatlik_veri_cek, tahmin_veri_cek, saatlik_tahmin_cek,
+                             bolge_anlik_cek, bolge_tahmin_cek, bolge_arsiv_cek)
+import os
+import warnings
 # ... diğer importlar ...
 
 # ================= BAKIM MODU =================
@@ -32,235 +51,618 @@ except:
     st.error("⚠️ API Anahtarı bulunamadı! Lütfen Streamlit Cloud 'Secrets' ayarlarını yapın.")
     st.stop()
 
-genai.configure(api_key=GOOGLE_API_KEY)
-model = genai.GenerativeModel('gemini-1.5-flash')
-
 # ================= SAYFA AYARLARI =================
 st.set_page_config(page_title="İklim Analiz Sistemi", layout="wide", page_icon="🌍")
 
 # ================= FONKSİYONLAR =================
 
-@st.cache_data
-def koordinat_bul(sehir_adi):
-    # geopy yerine Open-Meteo'nun kendi Geocoding API'si kullanılıyor
-    url = "https://geocoding-api.open-meteo.com/v1/search"
-    params = {"name": sehir_adi, "count": 1, "language": "tr"}
-    
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status() # HTTP hatalarını kontrol et
-        data = response.json()
-        
-        if data and 'results' in data and data['results']:
-            result = data['results'][0]
-            lat = result.get('latitude')
-            lon = result.get('longitude')
-            
-            # Adres bilgilerini al
-            isim = result.get('name', sehir_adi)
-            ulke = result.get('country', '')
-            tam_adres = f"{isim}, {ulke}"
+# st.cache_data / st.cache_resource sarmalayıcısı: fonksiyon gövdesi sadece ıskada
+# çalıştığı için çağrı başına isabet/ıska izleme'ye sayılıyor
+_iska_sayaci = threading.local()
+
+def izlenen(onbellek, **ayarlar):
+    def dekorator(fonksiyon):
+        @functools.wraps(fonksiyon)
+        def govde(*args, **kwargs):
+            _iska_sayaci.deger = getattr(_iska_sayaci, "deger", 0) + 1
+            return fonksiyon(*args, **kwargs)
+        onbellekli = onbellek(**ayarlar)(govde)
+
+        @functools.wraps(fonksiyon)
+        def sarici(*args, **kwargs):
+            # İç içe önbellekli çağrılarda da doğru olsun diye bayrak değil sayaç karşılaştırılıyor
+            once = getattr(_iska_sayaci, "deger", 0)
+            sonuc = onbellekli(*args, **kwargs)
+            izleme.say(f"st.cache · {fonksiyon.__name__}", "iska" if getattr(_iska_sayaci, "deger", 0) > once else "isabet")
+            return sonuc
+        sarici.clear = onbellekli.clear
+        return sarici
+    return dekorator
+
+RAPOR_OMRU_GECMIS = 30 * 24 * SAAT  # geçmiş veri değişmiyor
+RAPOR_OMRU_TAHMIN = SAAT  # tahminler saatlik güncelleniyor
+
+# google.generativeai yüklenmesi uzun süren bir paket; açılışta değil ilk rapor üretilirken
+# içe aktarılıyor ve model süreç başına bir kez kuruluyor
+# GEMINI_API_URL verilirse (yerel test sunucusu) REST üzerinden o adrese gidiliyor
+GEMINI_API_URL = os.environ.get("GEMINI_API_URL")
+
+@izlenen(st.cache_resource, show_spinner=False)
+def gemini_modeli():
+    import google.generativeai as genai
+    if GEMINI_API_URL:
+        genai.configure(api_key=GOOGLE_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_URL})
+    else:
+        genai.configure(api_key=GOOGLE_API_KEY)
+    return genai.GenerativeModel('gemini-1.5-flash')
 
-            return lat, lon, tam_adres
-        else:
-            return None, None, None
+def teknik_analiz_akisi(prompt):
+    # Gemini cevabını geldikçe parça parça döndürür: (metin, hata_mi)
+    try:
+        for parca in gemini_modeli().generate_content(prompt, stream=True):
+            yield parca.text, False
     except Exception as e:
-        # Hata olursa buraya düşer (Örneğin internet yoksa falan)
-        print(f"Geocoding API Hatası: {e}")
-        return None, None, None
-
-def anlik_durum_cek(lat, lon):
-    openmeteo = openmeteo_requests.Client()
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "current": ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "is_day", "weather_code", "wind_speed_10m"],
-        "timezone": "auto"
-    }
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-    current = response.Current()
+        yield f"Rapor oluşturulamadı. (Hata: {e})", True
+
+def gecmis_raporu(adres, baslangic, bitis, df, klima=None):
+    # Rapor diskte varsa LLM çağrılmaz; yoksa arka planda üretim başlar (veya süren üretime bağlanılır)
+    parmak = parmak_izi(tur="gecmis", adres=adres, baslangic=baslangic, bitis=bitis,
+                        maks=df['max'].max(), minn=df['min'].min(), ort=df['max'].mean(), top_yagis=df['yagis'].sum(), klima=klima)
+    prompt = gecmis_raporu_istemi(adres, baslangic, bitis, df, klima)
+    return rapor_akisi(parmak, lambda: teknik_analiz_akisi(prompt), RAPOR_OMRU_GECMIS)
+
+def tahmin_raporu(adres, df):
+    parmak = parmak_izi(tur="tahmin", adres=adres, ilk_gun=df['date'].iloc[0].date(),
+                        maks=df['max'].tolist(), minn=df['min'].tolist(), yagis_ihtimal=df['yagis_ihtimal'].tolist(), ruzgar=df['ruzgar'].tolist())
+    prompt = tahmin_raporu_istemi(adres, df)
+    return rapor_akisi(parmak, lambda: teknik_analiz_akisi(prompt), RAPOR_OMRU_TAHMIN)
+
+def gecmis_raporu_istemi(adres, baslangic, bitis, df, klima=None):
+    gun_sayisi = (bitis - baslangic).days
+    ort = df['max'].mean()
+    maks = df['max'].max()
+    minn = df['min'].min()
+    top_yagis = df['yagis'].sum()
+    normaller = ""
+    if klima:
+        normaller = f"""
+    - 1991-2020 Normallerine Göre: Ortalama sıcaklık sapması {klima['ort_anomali']:+.1f}°C, ortalama yüzdelik sırası {klima['ort_yuzdelik']:.0f}.
+    - Sıcak hava dalgası: {klima['sicak_dalga_sayisi']} olay, {klima['sicak_dalga_gun']} gün. Soğuk hava dalgası: {klima['soguk_dalga_sayisi']} olay, {klima['soguk_dalga_gun']} gün.
+    - Yağış normalin %{klima['yagis_normale_orani']:.0f}'i kadar. En uzun kurak seri {klima['en_uzun_kurak']} gün."""
+    # İMZA YASAĞI EKLENMİŞ YENİ PROMPT
+    return f"""
+    Sen uzman bir Meteoroloji Mühendisisin. Aşağıdaki verileri kullanarak teknik bir analiz raporu yaz.
     
-    sicaklik = current.Variables(0).Value()
-    nem = current.Variables(1).Value()
-    hissedilen = current.Variables(2).Value()
-    gunduz_mu = current.Variables(3).Value()
-    kod = current.Variables(4).Value()
-    ruzgar_hiz = current.Variables(5).Value()
+    Veri Seti:
+    - Bölge: {adres}
+    - Dönem: {baslangic.strftime('%d.%m.%Y')} - {bitis.strftime('%d.%m.%Y')} ({gun_sayisi} Gün)
+    - İstatistikler: Max {maks}°C, Min {minn}°C, Ort {ort}°C, Toplam Yağış {top_yagis}mm.{normaller}
     
-    utc_simdi = datetime.datetime.now(datetime.timezone.utc)
-    offset_saniye = response.UtcOffsetSeconds()
-    yerel_saat = utc_simdi + datetime.timedelta(seconds=offset_saniye)
+    Rapor Formatı:
+    1. **Giriş:** Dönemin genel meteorolojik karakteristiği.
+    2. **Sıcaklık Rejimi:** Mevsim normallerine göre sapmalar.
+    3. **Yağış Analizi:** Kuraklık durumu veya yağışın dağılımı.
+    4. **Sonuç:** Tarım ve su kaynakları üzerindeki olası etkiler.
     
-    return sicaklik, nem, hissedilen, gunduz_mu, ruzgar_hiz, yerel_saat, int(kod)
-
-@st.cache_data
-def gecmis_veri_cek_v2(lat, lon, baslangic, bitis):
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-    
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "start_date": baslangic,
-        "end_date": bitis,
-        "daily": ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean", "precipitation_sum", "wind_speed_10m_max"],
-        "timezone": "auto"
-    }
-    responses = openmeteo.weather_api(url, params=params)
-    daily = responses[0].Daily()
-    
-    data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    data["max"] = daily.Variables(0).ValuesAsNumpy()
-    data["min"] = daily.Variables(1).ValuesAsNumpy()
-    data["mean"] = daily.Variables(2).ValuesAsNumpy()
-    data["yagis"] = daily.Variables(3).ValuesAsNumpy()
-    data["ruzgar"] = daily.Variables(4).ValuesAsNumpy()
+    ÇOK ÖNEMLİ YASAKLAR:
+    1. Asla "[Adınız]", "Hazırlayan:", "İmza" gibi şeyler YAZMA.
+    2. "Rapor sonu", "Teşekkürler" deme.
+    3. Sonuç maddesini yaz ve dur.
+    """
+
+def tahmin_raporu_istemi(adres, df):
+    return f"""
+    GÖREV: Aşağıdaki 7 günlük hava tahmin verilerini analiz et ve teknik bir rapor yaz.
     
-    return pd.DataFrame(data)
-
-@st.cache_data
-def tahmin_veri_cek(lat, lon):
-    openmeteo = openmeteo_requests.Client()
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_probability_max", "wind_speed_10m_max", "weather_code"],
-        "forecast_days": 7,
-        "timezone": "auto"
-    }
-    responses = openmeteo.weather_api(url, params=params)
-    daily = responses[0].Daily()
+    VERİLER:
+    Konum: {adres}
+    Maksimum Sıcaklıklar: {df['max'].tolist()}
+    Minimum Sıcaklıklar: {df['min'].tolist()}
+    Yağış İhtimalleri: {df['yagis_ihtimal'].tolist()}
+    Rüzgar Hızları: {df['ruzgar'].tolist()}
     
-    data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    data["max"] = daily.Variables(0).ValuesAsNumpy()
-    data["min"] = daily.Variables(1).ValuesAsNumpy()
-    data["yagis_ihtimal"] = daily.Variables(2).ValuesAsNumpy()
-    data["ruzgar"] = daily.Variables(3).ValuesAsNumpy()
-    data["kod"] = daily.Variables(4).ValuesAsNumpy()
+    FORMAT:
+    1. **Sıcaklık Trendi:** (Isınma/Soğuma analizi)
+    2. **Yağış Riski:** (Hangi günler riskli?)
+    3. **Rüzgar Durumu:** (Fırtına riski analizi)
+    4. **Mühendislik Notu:** (Kısa teknik tavsiye)
     
-    return pd.DataFrame(data)
-
-@st.cache_data
-def teknik_analiz_olustur(prompt):
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Rapor oluşturulamadı. (Hata: {e})"
+    KURALLAR:
+    - "Merhaba", "Saygılar", "İmza" YOK.
+    - Direkt maddelerle başla.
+    """
 
 # --- İKON VE DURUM METİNLERİ 
-def kod_cozucu(kod, gunduz_mu=True):
-    if kod == 0: 
-        return "☀️" if gunduz_mu else "🌙", "Açık"
-    if 1 <= kod <= 2: 
-        return "🌤️" if gunduz_mu else "☁️", "Parçalı Bulutlu"
-    if kod == 3: 
-        return "☁️", "Bulutlu"
-    if 45 <= kod <= 48: 
-        return "☁️", "Çok Bulutlu" 
-    if 51 <= kod <= 55: 
-        return "🌦️", "Hafif Yağmur"
-    if 56 <= kod <= 57: 
-        return "🌨️", "Karla Karışık"
-    if 61 <= kod <= 65: 
-        return "🌧️", "Yağmurlu"
-    if 66 <= kod <= 67: 
-        return "🌨️", "Donan Yağmur"
-    if 71 <= kod <= 77: 
-        return "❄️", "Karlı"
-    if 80 <= kod <= 82: 
-        return "☔", "Sağanak"
-    if 95 <= kod <= 99: 
-        return "⛈️", "Gök Gürültülü"
-    return "❓", "Bilinmiyor"
+def kuyruk_durumu(kutu):
+    # Hız sınırına takılan istekler hata vermek yerine sırada bekliyor, kullanıcıya kuyruk gösteriliyor
+    derinlik = kova.kuyruk_derinligi()
+    if derinlik:
+        kutu.info(f"⏳ Yoğunluk nedeniyle istekler sırada bekliyor (kuyrukta {derinlik} istek var)")
+    else:
+        kutu.empty()
+
+def sonucu_bekle(is_, kutu):
+    while not wait([is_], timeout=0.25).done:
+        kuyruk_durumu(kutu)
+    kutu.empty()
+    return is_.result()
+
+# Dönem metrikleri veri başına bir kez hesaplanıyor
+@izlenen(st.cache_data, max_entries=16, show_spinner=False)
+def donem_metrikleri(iz, _df):
+    return {**ozet_istatistikleri(_df), **donem_ozeti(_df)}
+
+def metrikleri_goster(df, klima=None, iz=None):
+    # iz verilirse (havuzdaki, türetilmiş sütunlu veri) önbellekten; önizlemede doğrudan hesaplanıyor
+    ozet = donem_metrikleri(iz, df) if iz else ozet_istatistikleri(df)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Ortalama", f"{ozet['ortalama']:.1f} °C")
+    c2.metric("En Yüksek", f"{ozet['en_yuksek']:.1f} °C")
+    c3.metric("En Düşük", f"{ozet['en_dusuk']:.1f} °C")
+    c4.metric("Top. Yağış", f"{ozet['toplam_yagis']:.1f} mm")
+    if iz:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Donlu Gün", f"{ozet['don_gunu']} gün", help="En düşük sıcaklığın 0 °C altında olduğu günler")
+        c2.metric("Büyüme Derece-Gün", f"{ozet['buyume_gd']:.0f}", help="10 °C tabanlı (30 °C'de kırpılmış) büyüme derece-günü toplamı")
+        c3.metric("Isıtma Derece-Gün", f"{ozet['isitma_gd']:.0f}", help="Günlük ortalama sıcaklığın 18 °C altında kalan kısmının toplamı")
+        c4.metric("Soğutma Derece-Gün", f"{ozet['sogutma_gd']:.0f}", help="Günlük ortalama sıcaklığın 22 °C üstündeki kısmının toplamı")
+    if klima:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Normalden Sapma", f"{klima['ort_anomali']:+.1f} °C", help="1991-2020 günlük ortalama sıcaklık normaline göre")
+        c2.metric("Sıcak Hava Dalgası", f"{klima['sicak_dalga_gun']} gün", help=f"{klima['sicak_dalga_sayisi']} olay (en az 3 gün max sıcaklık > %90 yüzdelik)")
+        c3.metric("Soğuk Hava Dalgası", f"{klima['soguk_dalga_gun']} gün", help=f"{klima['soguk_dalga_sayisi']} olay (en az 3 gün min sıcaklık < %10 yüzdelik)")
+        c4.metric("En Uzun Kurak Seri", f"{klima['en_uzun_kurak']} gün", help=f"Yağış normalin %{klima['yagis_normale_orani']:.0f}'i")
 
 def get_theme_colors(tema):
     if "dark" in tema: return "rgba(0,0,0,0)", "white"
     else: return "#FFFFFF", "black"
 
-def interaktif_grafik(df, sehir_adi, renk_max, renk_min, renk_yagis, grafik_temasi, font_color, bg_color):
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Scatter(x=df['date'], y=df['max'], name="Max Sıcaklık", line=dict(color=renk_max, width=3)), secondary_y=False)
-    fig.add_trace(go.Scatter(x=df['date'], y=df['min'], name="Min Sıcaklık", line=dict(color=renk_min, width=3, dash='dot')), secondary_y=False)
-    fig.add_trace(go.Bar(x=df['date'], y=df['yagis'], name="Yağış (mm)", marker_color=renk_yagis, opacity=0.5), secondary_y=True)
-    
+# Şekiller veri parmak izine göre bir kez kuruluyor; renk/tema değişiklikleri
+# yenilemelerde sadece kopyanın stilini güncelliyor
+def _tema_uygula(fig, tema, font_color, bg_color):
     fig.update_layout(
-        title=dict(text=f'<b>{sehir_adi}</b> Geçmiş Analizi', font=dict(color=font_color, size=20)),
-        template=grafik_temasi, 
-        hovermode="x unified", 
-        height=400, 
-        legend=dict(orientation="h", y=1.1, x=0.5, font=dict(color=font_color)),
+        template=tema, 
         paper_bgcolor=bg_color, 
         plot_bgcolor=bg_color, 
-        font=dict(color=font_color)
+        font=dict(color=font_color),
+        title_font_color=font_color,
+        legend_font_color=font_color
     )
     fig.update_xaxes(title_font=dict(color=font_color), tickfont=dict(color=font_color))
     fig.update_yaxes(title_font=dict(color=font_color), tickfont=dict(color=font_color))
     return fig
 
-def ruzgar_grafigi(df, renk_ruzgar, plotly_tema, font_color, bg_color):
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['date'], y=df['ruzgar'], name="Rüzgar Hızı", fill='tozeroy', line=dict(color=renk_ruzgar)))
+def _gecmis_sekli_kur(sehir_adi, df):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    # Uzun aralıklarda çizgiler tepe/dip korunarak seyreltiliyor, yağış haftalık/aylık toplanıyor
+    fig.add_trace(cizgi_izi(*cizgi_verisi(df, 'max'), name="Max Sıcaklık", line=dict(width=3)), secondary_y=False)
+    fig.add_trace(cizgi_izi(*cizgi_verisi(df, 'min'), name="Min Sıcaklık", line=dict(width=3, dash='dot')), secondary_y=False)
+    yagis_x, yagis_y, yagis_adi = yagis_verisi(df)
+    fig.add_trace(go.Bar(x=yagis_x, y=yagis_y, name=yagis_adi, opacity=0.5), secondary_y=True)
+    if 'normal_max' in df:
+        fig.add_trace(cizgi_izi(*cizgi_verisi(df, 'normal_max'), name="Normal Max", line=dict(color="gray", width=1, dash='dash')), secondary_y=False)
+        fig.add_trace(cizgi_izi(*cizgi_verisi(df, 'normal_min'), name="Normal Min", line=dict(color="gray", width=1, dash='dash')), secondary_y=False)
     
     fig.update_layout(
-        title=dict(text="Rüzgar Analizi (km/h)", font=dict(color=font_color, size=20)),
-        template=plotly_tema, 
-        height=350, 
-        paper_bgcolor=bg_color, 
-        plot_bgcolor=bg_color, 
-        font=dict(color=font_color),
-        xaxis=dict(title_font=dict(color=font_color), tickfont=dict(color=font_color)),
-        yaxis=dict(title_font=dict(color=font_color), tickfont=dict(color=font_color))
+        title=dict(text=f'<b>{sehir_adi}</b> Geçmiş Analizi', font=dict(size=20)),
+        hovermode="x unified", 
+        height=400, 
+        legend=dict(orientation="h", y=1.1, x=0.5)
     )
     return fig
 
-def tahmin_grafigi(df, sehir_adi, tema, font, bg):
+# Şekil önbelleklerinin anahtarı verinin havuz anahtarı (içerik parmak izi); her fragment
+# yenilemesinde DataFrame yeniden özetlenmiyor
+@izlenen(st.cache_resource, max_entries=32, show_spinner=False)
+def _gecmis_sekli(iz, sehir_adi, _df):
+    return _gecmis_sekli_kur(sehir_adi, _df)
+
+def interaktif_grafik(iz, df, sehir_adi, renk_max, renk_min, renk_yagis, grafik_temasi, font_color, bg_color):
+    # iz None ise (parça parça gelen önizlemeler) şekil önbelleğe girmeden kuruluyor, kalıcı şekilleri atmasın
+    fig = go.Figure(_gecmis_sekli(iz, sehir_adi, df)) if iz is not None else _gecmis_sekli_kur(sehir_adi, df)
+    fig.data[0].line.color = renk_max
+    fig.data[1].line.color = renk_min
+    fig.data[2].marker.color = renk_yagis
+    return _tema_uygula(fig, grafik_temasi, font_color, bg_color)
+
+@izlenen(st.cache_resource, max_entries=32, show_spinner=False)
+def _ruzgar_sekli(iz, _df):
+    fig = go.Figure()
+    fig.add_trace(cizgi_izi(*cizgi_verisi(_df, 'ruzgar'), name="Rüzgar Hızı", fill='tozeroy'))
+    fig.update_layout(title=dict(text="Rüzgar Analizi (km/h)", font=dict(size=20)), height=350)
+    return fig
+
+def ruzgar_grafigi(iz, df, renk_ruzgar, plotly_tema, font_color, bg_color):
+    fig = go.Figure(_ruzgar_sekli(iz, df))
+    fig.data[0].line.color = renk_ruzgar
+    return _tema_uygula(fig, plotly_tema, font_color, bg_color)
+
+@izlenen(st.cache_resource, max_entries=32, show_spinner=False)
+def _tahmin_sekli(iz, sehir_adi, _df):
+    df = _df
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=df['date'], y=df['max'], name="Gündüz", line=dict(color='#FF4B4B', width=4)))
     fig.add_trace(go.Scatter(x=df['date'], y=df['min'], name="Gece", line=dict(color='#4B4BFF', width=4)))
     fig.add_trace(go.Scatter(x=df['date'].tolist() + df['date'].tolist()[::-1], y=df['max'].tolist() + df['min'].tolist()[::-1], fill='toself', fillcolor='rgba(100, 100, 100, 0.2)', line=dict(color='rgba(255,255,255,0)'), name='Aralık', showlegend=False))
     
     fig.update_layout(
-        title=dict(text=f"7 Günlük Tahmin: {sehir_adi}", font=dict(color=font, size=20)),
-        template=tema, 
-        paper_bgcolor=bg, 
-        plot_bgcolor=bg, 
-        font=dict(color=font), 
+        title=dict(text=f"7 Günlük Tahmin: {sehir_adi}", font=dict(size=20)),
         height=400, 
-        hovermode="x unified",
-        legend=dict(font=dict(color=font)),
-        xaxis=dict(title_font=dict(color=font), tickfont=dict(color=font)),
-        yaxis=dict(title_font=dict(color=font), tickfont=dict(color=font))
+        hovermode="x unified"
     )
     return fig
 
+def tahmin_grafigi(iz, df, sehir_adi, tema, font, bg):
+    return _tema_uygula(go.Figure(_tahmin_sekli(iz, sehir_adi, df)), tema, font, bg)
+
+# Bölge ısı haritası: hücre geometrileri ızgara başına bir kez kuruluyor, katman değişince sadece değerler değişiyor
+@izlenen(st.cache_resource, max_entries=8, show_spinner=False)
+def _bolge_sekli(izgara):
+    enlem, boylam = izgara.noktalar()
+    fig = go.Figure(go.Choroplethmap(
+        geojson=hucre_geojson(izgara), locations=np.arange(len(enlem)), featureidkey="id",
+        customdata=np.column_stack([enlem, boylam]), marker_opacity=0.6, marker_line_width=0
+    ))
+    fig.update_layout(
+        map_center=dict(lat=float(enlem.mean()), lon=float(boylam.mean())), map_zoom=harita_yakinligi(izgara),
+        height=520, margin=dict(l=0, r=0, t=0, b=0)
+    )
+    return fig
+
+def bolge_haritasi(izgara, z, birim, renk_olcegi, tema, font_color, bg_color):
+    fig = go.Figure(_bolge_sekli(izgara))
+    fig.update_traces(
+        z=z.ravel(), colorscale=renk_olcegi, colorbar_title=birim,
+        hovertemplate=f"%{{customdata[0]:.2f}}, %{{customdata[1]:.2f}}<br><b>%{{z:.1f}} {birim}</b><extra></extra>"
+    )
+    fig.update_layout(map_style="carto-darkmatter" if tema == "plotly_dark" else "carto-positron")
+    return _tema_uygula(fig, tema, font_color, bg_color)
+
+# Saatlik özetler depo sürümüne göre önbellekte; oturumda ham saatlik veri tutulmuyor
+@izlenen(st.cache_data, max_entries=4, show_spinner=False)
+def saatlik_gunluk_ozet(lat, lon, baslangic, bitis, surum):
+    return gunluk_ozet(SaatlikDepo(lat, lon), baslangic, bitis)
+
+@izlenen(st.cache_data, max_entries=16, show_spinner=False)
+def saatlik_tablo(lat, lon, baslangic, bitis, kural, surum):
+    return yeniden_ornekle(saatlik_gunluk_ozet(lat, lon, baslangic, bitis, surum), kural)
+
+@izlenen(st.cache_data, max_entries=16, show_spinner=False)
+def saatlik_dongu(lat, lon, baslangic, bitis, ad, aylara_gore, surum):
+    return gunici_dongu(SaatlikDepo(lat, lon), baslangic, bitis, ad, aylara_gore)
+
+SAATLIK_ETIKETLER = {"sicaklik": ("Sıcaklık", "°C"), "nem": ("Nem", "%"), "yagis": ("Yağış", "mm"), "ruzgar": ("Rüzgar", "km/h"), "hamle": ("Rüzgar Hamlesi", "km/h")}
+AY_ADLARI = ["Oca", "Şub", "Mar", "Nis", "May", "Haz", "Tem", "Ağu", "Eyl", "Eki", "Kas", "Ara"]
+
+def saatlik_ozet_grafigi(tablo, donem_adi, tema, font_color, bg_color):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(cizgi_izi(*cizgi_verisi(tablo, 'sicaklik_max'), name="En Yüksek", line=dict(color="#FF4B4B", width=2)), secondary_y=False)
+    fig.add_trace(cizgi_izi(*cizgi_verisi(tablo, 'sicaklik_min'), name="En Düşük", line=dict(color="#4B4BFF", width=2)), secondary_y=False)
+    fig.add_trace(cizgi_izi(*cizgi_verisi(tablo, 'genlik'), name="Günlük Genlik", line=dict(color="gray", width=1, dash='dot')), secondary_y=False)
+    # Günlük tabloda yağış geçmiş grafiğindeki gibi uzun aralıklarda haftalık/aylık toplanıyor
+    yagis_x, yagis_y, yagis_adi = yagis_verisi(tablo) if donem_adi == "Günlük" else (tablo['date'], tablo['yagis'], f"{donem_adi} Yağış (mm)")
+    fig.add_trace(go.Bar(x=yagis_x, y=yagis_y, name=yagis_adi, marker_color="#00AA00", opacity=0.5), secondary_y=True)
+    fig.update_layout(hovermode="x unified", height=400, legend=dict(orientation="h", y=1.1, x=0.5), margin=dict(t=40))
+    return _tema_uygula(fig, tema, font_color, bg_color)
+
+def gunici_grafigi(dongu, ad, tema, font_color, bg_color):
+    etiket, birim = SAATLIK_ETIKETLER[ad]
+    saatler = [f"{s:02d}:00" for s in range(24)]
+    if dongu.ndim == 2:
+        fig = go.Figure(go.Heatmap(z=dongu, x=saatler, y=AY_ADLARI, colorscale="RdYlBu_r" if ad == "sicaklik" else "Viridis",
+                                   colorbar_title=birim, hovertemplate=f"%{{y}} %{{x}}: %{{z:.1f}} {birim}<extra></extra>"))
+    else:
+        fig = go.Figure(go.Scatter(x=saatler, y=dongu, mode="lines+markers", name=etiket, line=dict(width=3)))
+        fig.update_yaxes(title_text=f"{etiket} ({birim})")
+    fig.update_layout(title=dict(text=f"Gün İçi {etiket} Döngüsü (yerel saat)"), height=400, margin=dict(t=50))
+    return _tema_uygula(fig, tema, font_color, bg_color)
+
+def saatlik_tahmin_grafigi(df, tema, font_color, bg_color):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(x=df['date'], y=df['sicaklik'], name="Sıcaklık (°C)", line=dict(color="#FF4B4B", width=2)), secondary_y=False)
+    fig.add_trace(go.Scatter(x=df['date'], y=df['hamle'], name="Hamle (km/h)", line=dict(color="#FFA500", width=1, dash='dot')), secondary_y=False)
+    fig.add_trace(go.Bar(x=df['date'], y=df['yagis'], name="Yağış (mm/saat)", marker_color="#00AA00", opacity=0.6), secondary_y=True)
+    fig.update_layout(hovermode="x unified", height=350, legend=dict(orientation="h", y=1.1, x=0.5), margin=dict(t=40))
+    return _tema_uygula(fig, tema, font_color, bg_color)
+
+# İndirme dosyası yenilemelerde değil, düğmeye basılınca ayrı iş parçacığında üretiliyor
+# (download_button'a fonksiyon veriliyor); aynı veri ve biçim için diskteki kopya kullanılıyor
+def indirme_alani(veri, ust, dosya_adi, etiket):
+    c1, c2 = st.columns([1, 3])
+    bicim = c1.selectbox("Biçim", list(BICIMLER), format_func=lambda b: BICIMLER[b].etiket, key=f"bicim_{dosya_adi}", label_visibility="collapsed")
+
+    def uret():
+        with open(disa_aktarma_dosyasi(veri.anahtar, veri.df(), bicim, ust), "rb") as f:
+            return f.read()
+    c2.download_button(label=f"{etiket} ({BICIMLER[bicim].etiket})", data=uret, file_name=dosya_adi + BICIMLER[bicim].uzanti,
+                       mime=BICIMLER[bicim].mime, on_click="ignore")
+
+# Tahmin kartlarının içeriği de veri başına bir kez hazırlanıyor
+@izlenen(st.cache_data, max_entries=16, show_spinner=False)
+def tahmin_kartlari_verisi(iz, _df):
+    ikonlar, _ = kod_bilgisi(_df['kod'])
+    return list(zip(_df['date'].dt.strftime('%d.%m'), ikonlar, _df['max'], _df['min'], tavsiye_metinleri(_df)))
+
+# Bölge haritası katmanları: etiket -> (kaynak, değişken, indirgeme, birim, renk ölçeği)
+BOLGE_KATMANLARI = {
+    "Anlık · Sıcaklık": ("anlik", "sicaklik", None, "°C", "RdYlBu_r"),
+    "Anlık · Hissedilen": ("anlik", "hissedilen", None, "°C", "RdYlBu_r"),
+    "Anlık · Nem": ("anlik", "nem", None, "%", "YlGnBu"),
+    "Anlık · Rüzgar": ("anlik", "ruzgar", None, "km/h", "Viridis"),
+    "Tahmin · En Yüksek": ("tahmin", "max", "gun", "°C", "RdYlBu_r"),
+    "Tahmin · En Düşük": ("tahmin", "min", "gun", "°C", "RdYlBu_r"),
+    "Tahmin · Yağış İhtimali": ("tahmin", "yagis_ihtimal", "gun", "%", "Blues"),
+    "Tahmin · Rüzgar": ("tahmin", "ruzgar", "gun", "km/h", "Viridis"),
+    "Dönem · Ortalama En Yüksek": ("arsiv", "max", "ortalama", "°C", "RdYlBu_r"),
+    "Dönem · Ortalama En Düşük": ("arsiv", "min", "ortalama", "°C", "RdYlBu_r"),
+    "Dönem · Ortalama Sıcaklık": ("arsiv", "mean", "ortalama", "°C", "RdYlBu_r"),
+    "Dönem · Toplam Yağış": ("arsiv", "yagis", "toplam", "mm", "Blues"),
+    "Dönem · En Yüksek Rüzgar": ("arsiv", "ruzgar", "en_yuksek", "km/h", "Viridis"),
+}
+
+def bolge_ozeti(dizi, indirgeme):
+    # (gün, ny, nx) -> (ny, nx); tamamı boş hücreler NaN kalıyor
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if indirgeme == "toplam":
+            return np.where(np.isnan(dizi).all(axis=0), np.nan, np.nansum(dizi, axis=0))
+        if indirgeme == "en_yuksek":
+            return np.nanmax(dizi, axis=0)
+        return np.nanmean(dizi, axis=0)
+
+# ?debug=1 ile açılınca her panel kendi sunucu süresini altına yazıyor; süreler izleme'ye de kaydediliyor
+def hata_ayiklama_acik():
+    return bool(st.query_params.get("debug"))
+
+@contextmanager
+def sure_olc(ad):
+    bas = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - bas) * 1000
+        st.session_state.setdefault("sureler", {})[ad] = ms
+        izleme.kaydet(f"panel · {ad}", ms)
+        if hata_ayiklama_acik():
+            st.caption(f"⏱️ {ad}: {ms:.0f} ms")
+
+def izleme_paneli():
+    # Süreç genelindeki ölçümler (tüm oturumlar); en çok süre harcayan aşamalar üstte
+    ozet = izleme.ozet()
+    with st.expander("📊 Ölçümler"):
+        araliklar = pd.DataFrame.from_dict(ozet["araliklar"], orient="index")
+        if len(araliklar):
+            st.dataframe(araliklar.sort_values("toplam_ms", ascending=False), use_container_width=True)
+        onbellekler = pd.DataFrame.from_dict(ozet["sayaclar"], orient="index").fillna(0)
+        if len(onbellekler):
+            st.dataframe(onbellekler, use_container_width=True)
+        boyutlar = pd.DataFrame.from_dict(ozet["boyutlar"], orient="index")
+        if len(boyutlar):
+            st.dataframe(boyutlar, use_container_width=True)
+        st.json(ozet["kaynaklar"], expanded=False)
+        st.download_button("Ölçümleri İndir (JSON)", data=izleme.json_ozet(), file_name="izleme.json", mime="application/json", on_click="ignore")
+
 # ================= ARAYÜZ =================
+# Sonuç alanı bağımsız fragment'lara bölündü: bir paneldeki etkileşim (renk seçimi,
+# indirme vb.) sadece o paneli yeniden çalıştırıyor, sayfanın geri kalanı ve kenar
+# çubuğu tekrar çizilmiyor.
+
+_calisma_basi = time.perf_counter()
+
+VARSAYILAN_RENKLER = {"renk_max": "#FF4B4B", "renk_min": "#4B4BFF", "renk_yagis": "#00FF00", "renk_ruzgar": "#FFA500"}
+
+for anahtar, varsayilan in {"analiz_yapildi": False, "df_gecmis": None, "klima": None, "df_tahmin": None,
+                            "konum": None, "gecmis_bilgi": None, "normal_bekleyen": None, "normal_uyarisi": None, "tahmin_bilgi": None, "bolge": None,
+                            "saatlik": None, "df_tahmin_saatlik": None}.items():
+    if anahtar not in st.session_state:
+        st.session_state[anahtar] = varsayilan
+
+def renk(anahtar):
+    return st.session_state.get(anahtar, VARSAYILAN_RENKLER[anahtar])
 
-if 'analiz_yapildi' not in st.session_state: st.session_state.analiz_yapildi = False
-if 'df_gecmis' not in st.session_state: st.session_state.df_gecmis = None
-if 'df_tahmin' not in st.session_state: st.session_state.df_tahmin = None
-if 'adres' not in st.session_state: st.session_state.adres = ""
-if 'baslangic' not in st.session_state: st.session_state.baslangic = None
-if 'bitis' not in st.session_state: st.session_state.bitis = None
+def renk_secici(etiket, anahtar):
+    return st.color_picker(etiket, VARSAYILAN_RENKLER[anahtar], key=anahtar)
+
+@st.fragment(run_every=CEYREK_SAAT)
+def anlik_durum_karti(lat, lon, tam_adres):
+    # Anlık durum 15 dakikalık önbellekten geliyor; kart da aynı aralıkla kendi kendini yeniliyor
+    with sure_olc("Anlık durum"):
+        kuyruk_kutusu = st.empty()
+        try:
+            sicaklik, nem, his, gunduz, ruzgar, saat, kod = sonucu_bekle(arka_planda(anlik_durum_cek, lat, lon), kuyruk_kutusu)
+        except Exception as e:
+            st.error(f"Veri Hatası: {e}")
+            return
+        ikon, durum_metni = kod_cozucu(kod, gunduz)
+        arkaplan = "linear-gradient(to right, #4facfe 0%, #00f2fe 100%)" if gunduz else "linear-gradient(to right, #434343 0%, black 100%)"
+        
+        st.markdown(f"""
+        <div style="padding: 20px; border-radius: 15px; background: {arkaplan}; color: white; box-shadow: 0 4px 15px rgba(0,0,0,0.2); margin-bottom: 20px;">
+            <div style="display: flex; justify-content: space-between; align-items: center;">
+                <div>
+                    <h2 style="margin:0; font-size: 2rem;">{tam_adres.split(",")[0]}</h2>
+                    <p style="margin:0; opacity: 0.9;">{tam_adres}</p>
+                    <h3 style="margin-top: 10px;">{saat.strftime('%H:%M')} <span style="font-size: 0.8em; opacity: 0.8;">(Yerel Saat)</span></h3>
+                </div>
+                <div style="text-align: center;">
+                    <div style="font-size: 4rem;">{ikon}</div>
+                    <div style="font-size: 1.2rem; font-weight: bold;">{durum_metni}</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 3.5rem; font-weight: bold;">{sicaklik:.1f}°C</div>
+                    <div style="font-size: 1rem;">Hissedilen: <b>{his:.1f}°C</b></div>
+                    <div style="font-size: 1rem;">Nem: <b>%{nem:.0f}</b> | Rüzgar: <b>{ruzgar:.1f} km/h</b></div>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        with st.expander("Konumu Haritada Göster"):
+            map_data = pd.DataFrame({'lat': [lat], 'lon': [lon]})
+            st.map(map_data, zoom=10)
+
+@st.fragment
+def sicaklik_paneli(veri, klima, bilgi, plotly_tema, font_color, bg_color):
+    # Fragment argümanı olarak DataFrame değil havuz tutamacı saklanıyor.
+    # bilgi: veriyle birlikte saklanan (lat, lon, adres, başlangıç, bitiş); başka modda yapılan analiz değiştirmiyor
+    with sure_olc("Sıcaklık & Yağış"):
+        df = veri.df()
+        lat, lon, adres, baslangic, bitis = bilgi
+        with st.expander("🎨 Grafik Renkleri"):
+            c1, c2, c3 = st.columns(3)
+            with c1: renk_max = renk_secici("Max", "renk_max")
+            with c2: renk_min = renk_secici("Min", "renk_min")
+            with c3: renk_yagis = renk_secici("Yağış", "renk_yagis")
+        with sure_olc("Grafik · Geçmiş"):
+            fig = interaktif_grafik(veri.anahtar, df, adres.split(",")[0], renk_max, renk_min, renk_yagis, plotly_tema, font_color, bg_color)
+        st.plotly_chart(fig, use_container_width=True)
+        metrikleri_goster(df, klima, veri.anahtar)
+        ust = ust_veri(df, adres, lat, lon, baslangic, bitis, veri="Günlük geçmiş veri",
+                       normaller="1991-2020" if klima else None)
+        indirme_alani(veri, ust, f"{adres.split(',')[0]}_gecmis_veri", "Verileri İndir")
+
+@st.fragment
+def ruzgar_paneli(veri, plotly_tema, font_color, bg_color):
+    with sure_olc("Rüzgar"):
+        df = veri.df()
+        renk_ruzgar = renk_secici("Rüzgar rengi", "renk_ruzgar")
+        st.plotly_chart(ruzgar_grafigi(veri.anahtar, df, renk_ruzgar, plotly_tema, font_color, bg_color), use_container_width=True)
+        st.info(f"Maksimum rüzgar hamlesi: **{df['ruzgar'].max()} km/h**")
+
+def normalleri_ekle(depo, normal_isi):
+    # Dönem verisine anomali sütunları ve klima özeti ekleniyor; normaller alınamazsa veri olduğu gibi kalıyor
+    _, _, _, baslangic, bitis = st.session_state.gecmis_bilgi
+    with izleme.aralik("analiz · normaller"):
+        try:
+            df, klima = anomali_analizi(depo, baslangic.strftime("%Y-%m-%d"), bitis.strftime("%Y-%m-%d"), normal_isi.result())
+        except Exception as e:
+            st.session_state.normal_uyarisi = f"Mevsim normalleri hesaplanamadı, analiz normaller olmadan gösteriliyor. ({e})"
+            return
+        st.session_state.df_gecmis = veri_havuzu.ekle(turetilmis_ekle(df))
+        st.session_state.klima = klima
+
+@st.fragment(run_every=1)
+def normal_bekleme_paneli():
+    # İlk sorguda 30 yıllık doldurma sürerken sayfa normaller olmadan gösteriliyor; hazır olunca
+    # anomali sütunları eklenip sayfa yeniden çiziliyor
+    if st.session_state.normal_bekleyen is None:
+        return  # yeni analizle değişmiş olabilir
+    normal_isi, depo = st.session_state.normal_bekleyen
+    if not normal_isi.done():
+        st.caption("⏳ Mevsim normalleri hazırlanıyor (bu konum için ilk sorguda 30 yıllık veri çekiliyor). Normalden sapma ve hava dalgaları hazır olunca eklenecek.")
+        return
+    normalleri_ekle(depo, normal_isi)
+    st.session_state.normal_bekleyen = None
+    st.rerun()
+
+@st.fragment
+def gecmis_rapor_paneli(adres, baslangic, bitis, veri, klima):
+    with sure_olc("Teknik Değerlendirme"):
+        if st.session_state.normal_bekleyen is not None:
+            # Rapor normallerle birlikte bir kez üretilsin
+            st.info("Teknik değerlendirme mevsim normalleri hazır olunca yazılacak.")
+            return
+        # Metin geldikçe sayfaya akıyor
+        st.write_stream(gecmis_raporu(adres, baslangic, bitis, veri.df(), klima).parcalar())
+
+@st.fragment
+def saatlik_paneli(saatlik, plotly_tema, font_color, bg_color):
+    with sure_olc("Saatlik"):
+        lat, lon, baslangic, bitis = saatlik
+        surum = SaatlikDepo(lat, lon).surum()
+        cozunurluk = st.radio("Çözünürlük:", ["Günlük", "Haftalık", "Aylık", "Gün İçi Döngü"], horizontal=True)
+        if cozunurluk == "Gün İçi Döngü":
+            c1, c2 = st.columns([2, 1])
+            ad = c1.selectbox("Değişken:", list(SAATLIK_ETIKETLER), format_func=lambda a: SAATLIK_ETIKETLER[a][0])
+            aylara_gore = c2.toggle("Aylara göre", value=True)
+            st.plotly_chart(gunici_grafigi(saatlik_dongu(lat, lon, baslangic, bitis, ad, aylara_gore, surum), ad, plotly_tema, font_color, bg_color), use_container_width=True)
+        else:
+            kural = {"Günlük": "D", "Haftalık": "W-MON", "Aylık": "MS"}[cozunurluk]
+            st.plotly_chart(saatlik_ozet_grafigi(saatlik_tablo(lat, lon, baslangic, bitis, kural, surum), cozunurluk, plotly_tema, font_color, bg_color), use_container_width=True)
+        
+        gunluk = saatlik_gunluk_ozet(lat, lon, baslangic, bitis, surum)
+        if gunluk["sicaklik_max"].isna().all():
+            st.warning("Bu dönem için saatlik veri yok.")
+            return
+        siddetli = gunluk["yagis_siddeti"].idxmax() if gunluk["yagis_siddeti"].notna().any() else None
+        hamle_saatleri = gunluk.loc[gunluk["hamle_saati"] >= 0, "hamle_saati"]
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Ort. Günlük Genlik", f"{gunluk['genlik'].mean():.1f} °C")
+        if siddetli is not None:
+            c2.metric("En Şiddetli Yağış", f"{gunluk.at[siddetli, 'yagis_siddeti']:.1f} mm/saat", gunluk.at[siddetli, 'date'].strftime('%d.%m.%Y'), delta_color="off")
+        c3.metric("Yağışlı Saat", f"{int(gunluk['islak_saat'].sum())} saat")
+        if len(hamle_saatleri):
+            c4.metric("En Sık Hamle Saati", f"{int(hamle_saatleri.mode().iloc[0]):02d}:00")
+
+@st.fragment
+def tahmin_paneli(veri, bilgi, plotly_tema, font_color, bg_color):
+    with sure_olc("7 Günlük Tahmin"):
+        df = veri.df()
+        lat, lon, adres = bilgi
+        st.subheader("7 Günlük Tahmin")
+        with sure_olc("Grafik · Tahmin"):
+            fig = tahmin_grafigi(veri.anahtar, df, adres.split(",")[0], plotly_tema, font_color, bg_color)
+        st.plotly_chart(fig, use_container_width=True)
+        indirme_alani(veri, ust_veri(df, adres, lat, lon, veri="7 günlük tahmin"), f"{adres.split(',')[0]}_tahmin_veri", "Tahmin Verisini İndir")
+        
+        cols = st.columns(7)
+        for col, (tarih, ikon, en_yuksek, en_dusuk, tavsiye) in zip(cols, tahmin_kartlari_verisi(veri.anahtar, df)):
+            with col:
+                st.caption(tarih)
+                st.markdown(f"### {ikon}")
+                st.markdown(f"**{en_yuksek:.0f}°** / {en_dusuk:.0f}°")
+                st.caption(tavsiye)
+        
+        if st.session_state.df_tahmin_saatlik is not None:
+            with st.expander("⏱️ Saatlik Tahmin"):
+                st.plotly_chart(saatlik_tahmin_grafigi(st.session_state.df_tahmin_saatlik.df(), plotly_tema, font_color, bg_color), use_container_width=True)
+
+@st.fragment
+def tahmin_rapor_paneli(adres, veri):
+    with sure_olc("Haftalık Teknik Değerlendirme"):
+        st.subheader("📝 Haftalık Teknik Değerlendirme") # <-- Başlık değişti
+        
+        sonuc = st.write_stream(tahmin_raporu(adres, veri.df()).parcalar())
+        if not sonuc:
+            st.error("Rapor oluşturulamadı. Lütfen tekrar deneyin.")
+
+@st.fragment
+def bolge_paneli(bolge, plotly_tema, font_color, bg_color):
+    with sure_olc("Bölge haritası"):
+        izgara = bolge["izgara"]
+        ny, nx = izgara.sekil
+        st.subheader(f"🗺️ {bolge['ad']}")
+        st.caption(f"{ny} × {nx} = {ny * nx} nokta, {izgara.adim:.2f}° aralıklı ızgara")
+        secenekler = [etiket for etiket, (kaynak, *_) in BOLGE_KATMANLARI.items() if bolge.get(kaynak) is not None]
+        katman = st.selectbox("Katman:", secenekler)
+        kaynak, degisken, indirgeme, birim, renk_olcegi = BOLGE_KATMANLARI[katman]
+        if kaynak == "anlik":
+            z = bolge["anlik"][degisken]
+        else:
+            gunler, diziler = bolge[kaynak]
+            if indirgeme == "gun":
+                gun = st.select_slider("Gün:", options=range(len(gunler)), format_func=lambda i: gunler[i].strftime("%d.%m"))
+                z = diziler[degisken][gun]
+            else:
+                st.caption(f"Dönem: {gunler[0]:%d.%m.%Y} - {gunler[-1]:%d.%m.%Y}")
+                z = bolge_ozeti(diziler[degisken], indirgeme)
+        
+        with st.expander("Bölgeyi Haritada Göster", expanded=True):
+            st.plotly_chart(bolge_haritasi(izgara, z, birim, renk_olcegi, plotly_tema, font_color, bg_color), use_container_width=True)
+        
+        if np.isnan(z).all():
+            st.warning("Bu katman için veri yok.")
+            return
+        enlem, boylam = izgara.noktalar()
+        en_yuksek, en_dusuk = int(np.nanargmax(z)), int(np.nanargmin(z))
+        c1, c2, c3 = st.columns(3)
+        c1.metric("En Düşük", f"{z.flat[en_dusuk]:.1f} {birim}", f"{enlem[en_dusuk]:.2f}, {boylam[en_dusuk]:.2f}", delta_color="off")
+        c2.metric("Bölge Ortalaması", f"{np.nanmean(z):.1f} {birim}")
+        c3.metric("En Yüksek", f"{z.flat[en_yuksek]:.1f} {birim}", f"{enlem[en_yuksek]:.2f}, {boylam[en_yuksek]:.2f}", delta_color="off")
 
 with st.sidebar:
     st.title("Kontrol Paneli")
-    mod_secimi = st.radio("İşlem Modu:", ["Geçmiş Veri Analizi", "Hava Tahmini"], index=0)
+    mod_secimi = st.radio("İşlem Modu:", ["Geçmiş Veri Analizi", "Hava Tahmini", "Bölge Analizi"], index=0)
     st.markdown("---")
     
     secilen_mod = st.radio("Arayüz:", ["Karanlık", "Aydınlık"], index=0)
@@ -300,23 +702,43 @@ with st.sidebar:
     
     st.subheader("Konum Seçimi")
     girilen_sehir = st.text_input("Şehir:", value="Diyarbakır")
+    # Yazılan ön eke uyan konumlar yerel dizinden öneriliyor, aynı adlı yerler arasında seçim yapılabiliyor.
+    # Seçilen kaydın kendisi (koordinatlarıyla) kullanılıyor; etiket tekrar çözülürse en kalabalık yere düşerdi
+    secilen_konum = None
+    oneriler = konum_dizini().ara(girilen_sehir)
+    if len(oneriler) > 1 or (oneriler and konum_dizini().bul(girilen_sehir) is None):
+        etiketler = [k.tam_etiket for k in oneriler]
+        etiketler = [e if etiketler.count(e) == 1 else f"{e} ({k.lat:.2f}, {k.lon:.2f})" for e, k in zip(etiketler, oneriler)]
+        secilen_konum = oneriler[st.selectbox("Eşleşen konumlar:", range(len(oneriler)), format_func=etiketler.__getitem__)]
     
     
     if mod_secimi == "Geçmiş Veri Analizi":
         st.subheader("Tarih Aralığı")
         bugun = datetime.date.today()
         gecen_yil = bugun - datetime.timedelta(days=365)
-        tarih_araligi = st.date_input("Dönem:", (gecen_yil, bugun), max_value=bugun)
+        # Arşiv 1940'tan başlıyor; varsayılan alt sınır (10 yıl) uzun dönemleri engelliyordu
+        tarih_araligi = st.date_input("Dönem:", (gecen_yil, bugun), min_value=datetime.date(1940, 1, 1), max_value=bugun)
+        saatlik_mod = st.toggle("Saatlik çözünürlük", help="Gün içi genlik, yağış şiddeti ve hamle saatleri için saatlik veriyi de çeker.")
         st.markdown("---")
-        c1, c2 = st.columns(2)
-        with c1:
-            renk_max = st.color_picker("Max", "#FF4B4B")
-            renk_ruzgar = st.color_picker("Rüzgar", "#FFA500")
-        with c2:
-            renk_min = st.color_picker("Min", "#4B4BFF")
-            renk_yagis = st.color_picker("Yağış", "#00FF00")
         baslat = st.button("Analizi Başlat", type="primary")
         
+    elif mod_secimi == "Bölge Analizi":
+        st.subheader("Bölge")
+        bolge_turu = st.radio("Bölge seçimi:", ["Şehir çevresi", "Koordinat kutusu"], horizontal=True)
+        if bolge_turu == "Şehir çevresi":
+            yaricap = st.slider("Yarıçap (km):", 10, 300, 75, step=5)
+        else:
+            c1, c2 = st.columns(2)
+            kuzey = c1.number_input("Kuzey", -90.0, 90.0, 38.5)
+            guney = c1.number_input("Güney", -90.0, 90.0, 37.0)
+            bati = c2.number_input("Batı", -180.0, 180.0, 39.5)
+            dogu = c2.number_input("Doğu", -180.0, 180.0, 41.5)
+        izgara_adimi = st.select_slider("Izgara aralığı (°):", [0.05, 0.1, 0.25, 0.5], value=0.1)
+        bugun = datetime.date.today()
+        tarih_araligi = st.date_input("Dönem özeti:", (bugun - datetime.timedelta(days=30), bugun - datetime.timedelta(days=1)), min_value=datetime.date(1940, 1, 1), max_value=bugun)
+        st.markdown("---")
+        baslat = st.button("Bölgeyi Getir", type="primary")
+        
     else:
         
         st.markdown("---")
@@ -327,176 +749,172 @@ with st.sidebar:
     st.caption("**Geliştirici:** Mücahid Kerem")
     st.caption("**Veri Altyapısı:** Open-Meteo API")
 
-if baslat:
-    lat, lon, tam_adres = koordinat_bul(girilen_sehir)
+veri_isi = None
+bolge_kutusu = None
+if baslat and mod_secimi == "Bölge Analizi" and bolge_turu == "Koordinat kutusu":
+    bolge_kutusu = (guney, bati, kuzey, dogu)
+    bolge_adi = f"{min(guney, kuzey):.2f}°–{max(guney, kuzey):.2f}° K, {min(bati, dogu):.2f}°–{max(bati, dogu):.2f}° D"
+elif baslat:
+    with izleme.aralik("analiz · konum"):
+        if secilen_konum is not None:
+            lat, lon, tam_adres = secilen_konum.lat, secilen_konum.lon, secilen_konum.tam_etiket
+        else:
+            lat, lon, tam_adres = koordinat_bul(girilen_sehir)
     if lat:
-        st.session_state.adres = tam_adres
-        try:
-            sicaklik, nem, his, gunduz, ruzgar, saat, kod = anlik_durum_cek(lat, lon)
-            ikon, durum_metni = kod_cozucu(kod, gunduz)
-            arkaplan = "linear-gradient(to right, #4facfe 0%, #00f2fe 100%)" if gunduz else "linear-gradient(to right, #434343 0%, black 100%)"
-            
-            st.markdown(f"""
-            <div style="padding: 20px; border-radius: 15px; background: {arkaplan}; color: white; box-shadow: 0 4px 15px rgba(0,0,0,0.2); margin-bottom: 20px;">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div>
-                        <h2 style="margin:0; font-size: 2rem;">{tam_adres.split(",")[0]}</h2>
-                        <p style="margin:0; opacity: 0.9;">{tam_adres}</p>
-                        <h3 style="margin-top: 10px;">{saat.strftime('%H:%M')} <span style="font-size: 0.8em; opacity: 0.8;">(Yerel Saat)</span></h3>
-                    </div>
-                    <div style="text-align: center;">
-                        <div style="font-size: 4rem;">{ikon}</div>
-                        <div style="font-size: 1.2rem; font-weight: bold;">{durum_metni}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 3.5rem; font-weight: bold;">{sicaklik:.1f}°C</div>
-                        <div style="font-size: 1rem;">Hissedilen: <b>{his:.1f}°C</b></div>
-                        <div style="font-size: 1rem;">Nem: <b>%{nem:.0f}</b> | Rüzgar: <b>{ruzgar:.1f} km/h</b></div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            with st.expander("Konumu Haritada Göster"):
-                map_data = pd.DataFrame({'lat': [lat], 'lon': [lon]})
-                st.map(map_data, zoom=10)
-            
-            if mod_secimi == "Geçmiş Veri Analizi" and len(tarih_araligi) == 2:
-                st.session_state.analiz_yapildi = True
-                st.session_state.baslangic = tarih_araligi[0]
-                st.session_state.bitis = tarih_araligi[1]
-                with st.spinner('Veriler taranıyor...'):
-                    df = gecmis_veri_cek_v2(lat, lon, tarih_araligi[0].strftime("%Y-%m-%d"), tarih_araligi[1].strftime("%Y-%m-%d"))
-                    st.session_state.df_gecmis = df
-
-            elif mod_secimi == "Hava Tahmini":
-                st.session_state.analiz_yapildi = True
-                with st.spinner('Tahmin alınıyor...'):
-                    df_tahmin = tahmin_veri_cek(lat, lon)
-                    st.session_state.df_tahmin = df_tahmin
-
-        except Exception as e:
-            st.error(f"Veri Hatası: {e}")
+        st.session_state.konum = (lat, lon, tam_adres)
+        # Koordinatlar belli olduktan sonra ana veri çağrıları başlatılıyor, anlık durum kartı bunlarla aynı anda çekiliyor
+        gecmis_modu = mod_secimi == "Geçmiş Veri Analizi" and len(tarih_araligi) == 2
+        if gecmis_modu:
+            ilerleme_kuyrugu = queue.Queue()
+            veri_isi = arka_planda(gecmis_veri_cek_v2, lat, lon, tarih_araligi[0].strftime("%Y-%m-%d"), tarih_araligi[1].strftime("%Y-%m-%d"), ilerleme=ilerleme_kuyrugu.put)
+            # Mevsim normalleri hücre başına bir kez hesaplanıp saklanıyor, ilk sorguda 30 yıllık veri de arka planda çekiliyor
+            depo = ArsivDeposu(lat, lon)
+            normal_isi = doldurma_arka_planda(normalleri_getir, depo, gecmis_veri_cek_v2)
+            saatlik_isi = arka_planda(saatlik_veri_cek, lat, lon, tarih_araligi[0].strftime("%Y-%m-%d"), tarih_araligi[1].strftime("%Y-%m-%d")) if saatlik_mod else None
+        elif mod_secimi == "Hava Tahmini":
+            veri_isi = arka_planda(tahmin_veri_cek, lat, lon)
+            saatlik_isi = arka_planda(saatlik_tahmin_cek, lat, lon)
+        elif mod_secimi == "Bölge Analizi":
+            bolge_kutusu = cevre_kutusu(lat, lon, yaricap)
+            bolge_adi = f"{tam_adres.split(',')[0]} çevresi ({yaricap} km)"
+        else:
+            # Takvimde sadece başlangıç seçiliyken analiz başlatılmıyor
+            st.warning("Dönemin bitiş tarihini de seçin.")
     else:
         st.error("Şehir bulunamadı.")
 
+bolge_isleri = None
+if bolge_kutusu is not None:
+    # Anlık, tahmin ve dönem verileri ızgaranın tamamı için aynı anda, partiler halinde çekiliyor
+    izgara = izgara_olustur(*bolge_kutusu, adim=izgara_adimi)
+    donem_var = len(tarih_araligi) == 2
+    bolge_isleri = {
+        "anlik": arka_planda(bolge_anlik_cek, izgara),
+        "tahmin": arka_planda(bolge_tahmin_cek, izgara),
+        "arsiv": arka_planda(bolge_arsiv_cek, izgara, tarih_araligi[0].strftime("%Y-%m-%d"), tarih_araligi[1].strftime("%Y-%m-%d")) if donem_var else None,
+    }
+
+# Anlık durum kartı tek noktalık modlarda; bölge haritasının kendi anlık katmanı var,
+# koordinat kutusuyla getirilen bölgede önceki şehrin kartı kalmasın
+if st.session_state.konum and mod_secimi != "Bölge Analizi":
+    anlik_durum_karti(*st.session_state.konum)
+
+if bolge_isleri is not None:
+    try:
+        kuyruk_kutusu = st.empty()
+        with st.spinner(f"{izgara.sekil[0] * izgara.sekil[1]} noktalık ızgara taranıyor..."):
+            bolge = {ad: sonucu_bekle(is_, kuyruk_kutusu) if is_ is not None else None for ad, is_ in bolge_isleri.items()}
+        st.session_state.bolge = dict(bolge, ad=bolge_adi, izgara=izgara)
+        st.session_state.analiz_yapildi = True
+    except Exception as e:
+        st.error(f"Veri Hatası: {e}")
+
+if veri_isi is not None:
+    try:
+        kuyruk_kutusu = st.empty()
+        if gecmis_modu:
+            st.session_state.analiz_yapildi = True
+            # Uzun aralıklarda parçalar geldikçe grafik ve metrikler önizleme olarak güncellenir
+            onizleme = st.empty()
+            with st.spinner('Veriler taranıyor...'), izleme.aralik("analiz · geçmiş veri"):
+                while True:
+                    try:
+                        df_parca = ilerleme_kuyrugu.get(timeout=0.1)
+                    except queue.Empty:
+                        if veri_isi.done():
+                            break
+                        kuyruk_durumu(kuyruk_kutusu)
+                        continue
+                    with onizleme.container():
+                        st.plotly_chart(interaktif_grafik(None, df_parca, tam_adres.split(",")[0], renk("renk_max"), renk("renk_min"), renk("renk_yagis"), plotly_tema, font_color, bg_color), use_container_width=True, key=f"onizleme_{len(df_parca)}")
+                        metrikleri_goster(df_parca)
+                kuyruk_kutusu.empty()
+                df = veri_isi.result()
+            # Oturumda sadece havuz tutamacı; aynı veriyi açan oturumlar tek kopyayı paylaşıyor.
+            # Türetilmiş sütunlar (derece-günler, don vb.) bir kez eklenip veriyle birlikte saklanıyor.
+            st.session_state.df_gecmis = veri_havuzu.ekle(turetilmis_ekle(df))
+            st.session_state.klima = None
+            st.session_state.normal_uyarisi = None
+            # Konum ve dönem veriyle birlikte saklanıyor; dışa aktarılan dosyanın metaverisi bundan
+            st.session_state.gecmis_bilgi = (lat, lon, tam_adres, tarih_araligi[0], tarih_araligi[1])
+            # Normaller hazırsa hemen ekleniyor; değilse (ilk sorguda 30 yıllık doldurma) sayfa
+            # beklemeden gösteriliyor, normal_bekleme_paneli hazır olunca ekliyor
+            if normal_isi.done():
+                normalleri_ekle(depo, normal_isi)
+                st.session_state.normal_bekleyen = None
+            else:
+                st.session_state.normal_bekleyen = (normal_isi, depo)
+            onizleme.empty()
+            if st.session_state.normal_bekleyen is None:
+                # Rapor sadece özet istatistiklere bağlı, grafikler çizilirken arka planda hazırlanıyor.
+                # Parmak izi panelle aynı olsun diye havuzdaki (float32) kopya kullanılıyor.
+                gecmis_raporu(tam_adres, tarih_araligi[0], tarih_araligi[1], st.session_state.df_gecmis.df(), st.session_state.klima)
+            st.session_state.saatlik = None
+            if saatlik_isi is not None:
+                with st.spinner('Saatlik veriler taranıyor...'):
+                    depo_saatlik = sonucu_bekle(saatlik_isi, kuyruk_kutusu)
+                st.session_state.saatlik = (depo_saatlik.lat, depo_saatlik.lon, tarih_araligi[0].strftime("%Y-%m-%d"), tarih_araligi[1].strftime("%Y-%m-%d"))
+
+        else:
+            st.session_state.analiz_yapildi = True
+            with st.spinner('Tahmin alınıyor...'), izleme.aralik("analiz · tahmin"):
+                df_tahmin = sonucu_bekle(veri_isi, kuyruk_kutusu)
+                st.session_state.df_tahmin = veri_havuzu.ekle(turetilmis_ekle(df_tahmin))
+                st.session_state.tahmin_bilgi = (lat, lon, tam_adres)
+                try:
+                    st.session_state.df_tahmin_saatlik = veri_havuzu.ekle(sonucu_bekle(saatlik_isi, kuyruk_kutusu))
+                except Exception:
+                    # Saatlik görünüm ek bilgi; alınamazsa tahmin yine gösteriliyor
+                    st.session_state.df_tahmin_saatlik = None
+            tahmin_raporu(tam_adres, st.session_state.df_tahmin.df())
+
+    except Exception as e:
+        st.error(f"Veri Hatası: {e}")
+
 if st.session_state.analiz_yapildi:
     
     # GEÇMİŞ MOD
     if mod_secimi == "Geçmiş Veri Analizi" and st.session_state.df_gecmis is not None:
-        df = st.session_state.df_gecmis
-        baslangic = st.session_state.baslangic
-        bitis = st.session_state.bitis
+        veri = st.session_state.df_gecmis
+        if st.session_state.normal_bekleyen is not None:
+            normal_bekleme_paneli()
+        if st.session_state.normal_uyarisi:
+            st.warning(st.session_state.normal_uyarisi)
         
-        ort = df['max'].mean()
-        maks = df['max'].max()
-        minn = df['min'].min()
-        top_yagis = df['yagis'].sum()
-        max_ruzgar = df['ruzgar'].max()
-
-        tab1, tab2, tab3 = st.tabs(["Sıcaklık & Yağış", "Rüzgar", "Teknik Değerlendirme"])
+        sekmeler = ["Sıcaklık & Yağış", "Rüzgar", "Teknik Değerlendirme"] + (["Saatlik"] if st.session_state.saatlik else [])
+        tab1, tab2, tab3, *tab_saatlik = st.tabs(sekmeler)
         
         with tab1:
-            st.plotly_chart(interaktif_grafik(df, st.session_state.adres.split(",")[0], renk_max, renk_min, renk_yagis, plotly_tema, font_color, bg_color), use_container_width=True)
-            c1, c2, c3, c4 = st.columns(4)
-            c1.metric("Ortalama", f"{ort:.1f} °C")
-            c2.metric("En Yüksek", f"{maks:.1f} °C")
-            c3.metric("En Düşük", f"{minn:.1f} °C")
-            c4.metric("Top. Yağış", f"{top_yagis:.1f} mm")
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(label="Verileri İndir (CSV)", data=csv, file_name=f"{girilen_sehir}_gecmis_veri.csv", mime="text/csv")
+            sicaklik_paneli(veri, st.session_state.klima, st.session_state.gecmis_bilgi, plotly_tema, font_color, bg_color)
             
         with tab2:
-            st.plotly_chart(ruzgar_grafigi(df, renk_ruzgar, plotly_tema, font_color, bg_color), use_container_width=True)
-            st.info(f"Maksimum rüzgar hamlesi: **{max_ruzgar} km/h**")
+            ruzgar_paneli(veri, plotly_tema, font_color, bg_color)
             
         with tab3:
-            gun_sayisi = (bitis - baslangic).days
-            # İMZA YASAĞI EKLENMİŞ YENİ PROMPT
-            prompt = f"""
-            Sen uzman bir Meteoroloji Mühendisisin. Aşağıdaki verileri kullanarak teknik bir analiz raporu yaz.
-            
-            Veri Seti:
-            - Bölge: {st.session_state.adres}
-            - Dönem: {baslangic.strftime('%d.%m.%Y')} - {bitis.strftime('%d.%m.%Y')} ({gun_sayisi} Gün)
-            - İstatistikler: Max {maks}°C, Min {minn}°C, Ort {ort}°C, Toplam Yağış {top_yagis}mm.
-            
-            Rapor Formatı:
-            1. **Giriş:** Dönemin genel meteorolojik karakteristiği.
-            2. **Sıcaklık Rejimi:** Mevsim normallerine göre sapmalar.
-            3. **Yağış Analizi:** Kuraklık durumu veya yağışın dağılımı.
-            4. **Sonuç:** Tarım ve su kaynakları üzerindeki olası etkiler.
-            
-            ÇOK ÖNEMLİ YASAKLAR:
-            1. Asla "[Adınız]", "Hazırlayan:", "İmza" gibi şeyler YAZMA.
-            2. "Rapor sonu", "Teşekkürler" deme.
-            3. Sonuç maddesini yaz ve dur.
-            """
-            with st.spinner('Analiz hazırlanıyor...'):
-                st.markdown(teknik_analiz_olustur(prompt))
+            gecmis_rapor_paneli(*st.session_state.gecmis_bilgi[2:], veri, st.session_state.klima)
+        
+        if tab_saatlik:
+            with tab_saatlik[0]:
+                saatlik_paneli(st.session_state.saatlik, plotly_tema, font_color, bg_color)
 
     # TAHMİN MODU
     elif mod_secimi == "Hava Tahmini" and st.session_state.df_tahmin is not None:
-        df = st.session_state.df_tahmin
-        
-        st.subheader("7 Günlük Tahmin")
-        st.plotly_chart(tahmin_grafigi(df, st.session_state.adres.split(",")[0], plotly_tema, font_color, bg_color), use_container_width=True)
-        csv_tahmin = df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="Tahmin Verisini İndir (CSV)", data=csv_tahmin, file_name=f"{girilen_sehir}_tahmin_veri.csv", mime="text/csv")
-        
-        cols = st.columns(7)
-        for i, row in df.iterrows():
-            with cols[i]:
-                ikon, durum = kod_cozucu(row['kod'], True)
-                st.caption(f"{row['date'].strftime('%d.%m')}")
-                st.markdown(f"### {ikon}")
-                st.markdown(f"**{row['max']:.0f}°** / {row['min']:.0f}°")
-                
-                # TAVSİYE MANTIĞI GÜNCELLENDİ
-                tavsiye = ""
-                if row['kod'] >= 95: tavsiye = "⚠️ Fırtına"
-                elif row['yagis_ihtimal'] > 60: tavsiye = "☔ Yağışlı"
-                elif row['max'] > 30: tavsiye = "🔥 Sıcak"
-                elif row['max'] < 5: tavsiye = "❄️ Soğuk"
-                elif row['max'] < 15: tavsiye = "🧥 Serin"
-                elif durum == "Açık": tavsiye = "☀️ Güneşli"
-                else: tavsiye = f"☁️ {durum}" # "Normal" yerine gerçek durumu yaz
-                
-                st.caption(tavsiye)
+        veri = st.session_state.df_tahmin
+        tahmin_paneli(veri, st.session_state.tahmin_bilgi, plotly_tema, font_color, bg_color)
         
         st.markdown("---")
-        st.subheader("📝 Haftalık Teknik Değerlendirme") # <-- Başlık değişti
-        
-        # PROMPT 
-        prompt_tahmin = f"""
-        GÖREV: Aşağıdaki 7 günlük hava tahmin verilerini analiz et ve teknik bir rapor yaz.
-        
-        VERİLER:
-        Konum: {st.session_state.adres}
-        Maksimum Sıcaklıklar: {df['max'].tolist()}
-        Minimum Sıcaklıklar: {df['min'].tolist()}
-        Yağış İhtimalleri: {df['yagis_ihtimal'].tolist()}
-        Rüzgar Hızları: {df['ruzgar'].tolist()}
-        
-        FORMAT:
-        1. **Sıcaklık Trendi:** (Isınma/Soğuma analizi)
-        2. **Yağış Riski:** (Hangi günler riskli?)
-        3. **Rüzgar Durumu:** (Fırtına riski analizi)
-        4. **Mühendislik Notu:** (Kısa teknik tavsiye)
-        
-        KURALLAR:
-        - "Merhaba", "Saygılar", "İmza" YOK.
-        - Direkt maddelerle başla.
-        """
-        
-        with st.spinner('Değerlendirme hazırlanıyor...'):
-            sonuc = teknik_analiz_olustur(prompt_tahmin)
-            if sonuc:
-                st.markdown(sonuc)
-            else:
-
-                st.error("Rapor oluşturulamadı. Lütfen tekrar deneyin.")
-
-
-
-
+        tahmin_rapor_paneli(st.session_state.tahmin_bilgi[2], veri)
+
+    # BÖLGE MODU
+    elif mod_secimi == "Bölge Analizi" and st.session_state.bolge is not None:
+        bolge_paneli(st.session_state.bolge, plotly_tema, font_color, bg_color)
+
+# Tam çalıştırma süresi; fragment yenilemelerinde bu satıra gelinmiyor
+st.session_state.setdefault("sureler", {})["Tam sayfa"] = (time.perf_counter() - _calisma_basi) * 1000
+izleme.kaydet("panel · Tam sayfa", st.session_state.sureler["Tam sayfa"])
+if hata_ayiklama_acik():
+    with st.sidebar:
+        st.caption(f"⏱️ Tam sayfa: {st.session_state.sureler['Tam sayfa']:.0f} ms")
+        havuz = veri_havuzu.durum()
+        st.caption(f"🗄️ Veri havuzu: {havuz['kayit']} kayıt, {havuz['bayt'] / 1024:.0f} KB, {havuz['referans']} tutamaç")
+        izleme_paneli()
@@ -0,0 +1,180 @@
+# ================= ARŞİV DEPOSU =================
+# Geçmiş (arşiv) günlük verileri diskte, yuvarlanmış grid hücresi başına
+# tutulur. Her hücre klasöründe:
+#   meta.json   -> ilk gün (epoch günü) ve UTC ofseti
+#   veri.npy    -> (gün_sayısı, 5) float32 dizi (max, min, mean, yagis, ruzgar)
+#   kapsam.npy  -> hangi günlerin zaten çekildiğini gösteren bool maske
+# Okumalar memmap ile yapılır, sadece istenen dilim belleğe kopyalanır.
+# Aralık genişlerken üç dosya sırayla değiştiği için okumalar da yazmayla
+# aynı hücre kilidini alıyor (eski meta + yeni dizi kaymış dilim verirdi).
+
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEPO_KLASORU = os.environ.get("ARSIV_DEPO_KLASORU", ".arsiv")
+HUCRE_BOYUTU = 0.1  # derece
+DEGISKENLER = ["max", "min", "mean", "yagis", "ruzgar"]
+KESINLESME_GUNU = 7  # arşiv API'si son günleri birkaç gün gecikmeli dolduruyor
+
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+_kilitler = {}
+_kilitler_kilidi = threading.Lock()
+
+
+def gun_no(tarih):
+    # "YYYY-MM-DD", date veya datetime -> 1970'ten itibaren gün sayısı
+    if isinstance(tarih, str):
+        tarih = datetime.date.fromisoformat(tarih)
+    if isinstance(tarih, datetime.datetime):
+        tarih = tarih.date()
+    return tarih.toordinal() - _EPOCH
+
+
+def gun_tarihi(gun):
+    return datetime.date.fromordinal(int(gun) + _EPOCH)
+
+
+def hucre_koordinat(lat, lon):
+    return (round(round(lat / HUCRE_BOYUTU) * HUCRE_BOYUTU, 2),
+            round(round(lon / HUCRE_BOYUTU) * HUCRE_BOYUTU, 2))
+
+
+def yillik_parcalar(bas_gun, bit_gun):
+    # [bas_gun, bit_gun] aralığını takvim yılı sınırlarından bölerek sıralı parçalar döndürür
+    parcalar = []
+    while bas_gun <= bit_gun:
+        yil_sonu = gun_no(datetime.date(gun_tarihi(bas_gun).year, 12, 31))
+        parcalar.append((bas_gun, min(yil_sonu, bit_gun)))
+        bas_gun = yil_sonu + 1
+    return parcalar
+
+
+def _kilit(yol):
+    with _kilitler_kilidi:
+        return _kilitler.setdefault(yol, threading.Lock())
+
+
+def _atomik_kaydet(yol, dizi):
+    gecici = yol + ".tmp.npy"
+    np.save(gecici, dizi)
+    os.replace(gecici, yol)
+
+
+class ArsivDeposu:
+    def __init__(self, lat, lon, klasor=DEPO_KLASORU):
+        self.lat, self.lon = hucre_koordinat(lat, lon)
+        self.yol = os.path.join(klasor, f"{self.lat:+.2f}_{self.lon:+.2f}")
+        self._meta_yolu = os.path.join(self.yol, "meta.json")
+        self._veri_yolu = os.path.join(self.yol, "veri.npy")
+        self._kapsam_yolu = os.path.join(self.yol, "kapsam.npy")
+        self._kilit_yolu = self.yol
+
+    def _meta(self):
+        try:
+            with open(self._meta_yolu, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _kapsam(self):
+        meta = self._meta()
+        if meta is None:
+            return None, None
+        try:
+            return meta, np.load(self._kapsam_yolu, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+    def eksik_araliklar(self, baslangic, bitis):
+        # [baslangic, bitis] içinde depoda olmayan günleri (bas_gun, bit_gun) aralıkları olarak döndürür
+        bas, bit = gun_no(baslangic), gun_no(bitis)
+        istenen = np.zeros(bit - bas + 1, dtype=bool)
+        with _kilit(self._kilit_yolu):
+            meta, kapsam = self._kapsam()
+            if meta is not None:
+                ilk = meta["ilk_gun"]
+                i0, i1 = max(bas, ilk), min(bit, ilk + len(kapsam) - 1)
+                if i0 <= i1:
+                    istenen[i0 - bas:i1 - bas + 1] = kapsam[i0 - ilk:i1 - ilk + 1]
+            del kapsam
+
+        eksik = np.flatnonzero(~istenen)
+        if eksik.size == 0:
+            return []
+        kopma = np.flatnonzero(np.diff(eksik) > 1)
+        baslar = np.concatenate(([eksik[0]], eksik[kopma + 1]))
+        bitler = np.concatenate((eksik[kopma], [eksik[-1]]))
+        return [(bas + int(b), bas + int(e)) for b, e in zip(baslar, bitler)]
+
+    def yaz(self, ilk_gun, degerler, utc_offset):
+        # degerler: (gün_sayısı, len(DEGISKENLER)) dizisi, ilk satır ilk_gun'e ait
+        degerler = np.asarray(degerler, dtype=np.float32)
+        son_gun = ilk_gun + len(degerler) - 1
+        bugun = gun_no(datetime.date.today())
+        gunler = np.arange(ilk_gun, son_gun + 1)
+        # Kesinleşmemiş son günler boş geldiyse bir dahaki sorguda tekrar çekilsin
+        yeni_kapsam = (gunler <= bugun - KESINLESME_GUNU) | ~np.isnan(degerler).all(axis=1)
+
+        with _kilit(self._kilit_yolu):
+            os.makedirs(self.yol, exist_ok=True)
+            meta, _ = self._kapsam()
+            if meta is not None:
+                veri = np.load(self._veri_yolu, mmap_mode="r+")
+                kapsam = np.load(self._kapsam_yolu, mmap_mode="r+")
+                ilk = meta["ilk_gun"]
+                if ilk <= ilk_gun and son_gun < ilk + len(kapsam):
+                    # Mevcut dosyaların içine sığıyor, yerinde güncelle
+                    veri[ilk_gun - ilk:son_gun - ilk + 1] = degerler
+                    kapsam[ilk_gun - ilk:son_gun - ilk + 1] |= yeni_kapsam
+                    veri.flush()
+                    kapsam.flush()
+                    return
+
+                # Aralık genişliyor, dosyaları birleşim aralığıyla yeniden oluştur
+                yeni_ilk = min(ilk, ilk_gun)
+                yeni_son = max(ilk + len(kapsam) - 1, son_gun)
+                tum_veri = np.full((yeni_son - yeni_ilk + 1, len(DEGISKENLER)), np.nan, dtype=np.float32)
+                tum_kapsam = np.zeros(yeni_son - yeni_ilk + 1, dtype=bool)
+                tum_veri[ilk - yeni_ilk:ilk - yeni_ilk + len(veri)] = veri
+                tum_kapsam[ilk - yeni_ilk:ilk - yeni_ilk + len(kapsam)] = kapsam
+                del veri, kapsam
+                utc_offset = meta["utc_offset"]
+            else:
+                yeni_ilk = ilk_gun
+                tum_veri = np.empty_like(degerler)
+                tum_kapsam = np.zeros(len(degerler), dtype=bool)
+
+            tum_veri[ilk_gun - yeni_ilk:son_gun - yeni_ilk + 1] = degerler
+            tum_kapsam[ilk_gun - yeni_ilk:son_gun - yeni_ilk + 1] |= yeni_kapsam
+            _atomik_kaydet(self._veri_yolu, tum_veri)
+            _atomik_kaydet(self._kapsam_yolu, tum_kapsam)
+            with open(self._meta_yolu + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"ilk_gun": int(yeni_ilk), "utc_offset": int(utc_offset),
+                           "lat": self.lat, "lon": self.lon}, f)
+            os.replace(self._meta_yolu + ".tmp", self._meta_yolu)
+
+    def oku(self, baslangic, bitis):
+        # Depodaki veriyi gecmis_veri_cek_v2 ile aynı biçimde DataFrame olarak döndürür
+        bas, bit = gun_no(baslangic), gun_no(bitis)
+        dilim = np.full((bit - bas + 1, len(DEGISKENLER)), np.nan, dtype=np.float32)
+        utc_offset = 0
+        with _kilit(self._kilit_yolu):
+            meta = self._meta()
+            if meta is not None:
+                ilk, utc_offset = meta["ilk_gun"], meta["utc_offset"]
+                veri = np.load(self._veri_yolu, mmap_mode="r")
+                i0, i1 = max(bas, ilk), min(bit, ilk + len(veri) - 1)
+                if i0 <= i1:
+                    dilim[i0 - bas:i1 - bas + 1] = veri[i0 - ilk:i1 - ilk + 1]
+                del veri
+
+        saniyeler = np.arange(bas, bit + 1, dtype=np.int64) * 86400 - utc_offset
+        data = {"date": pd.to_datetime(saniyeler, unit="s", utc=True)}
+        for i, ad in enumerate(DEGISKENLER):
+            data[ad] = dilim[:, i]
+        return pd.DataFrame(data)
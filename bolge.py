@@ -0,0 +1,108 @@
+# ================= BÖLGE IZGARASI =================
+# Bölge modu için bir sınır kutusunu düzenli bir enlem/boylam ızgarasına böler.
+# Open-Meteo tek istekte virgülle ayrılmış çok sayıda koordinatı kabul ettiği
+# için noktalar PARTI_BOYUTU'luk partiler halinde (birkaç istekte) çekiliyor;
+# FlatBuffers cevapları (ny, nx) veya (gün, ny, nx) şekilli NumPy dizilerine
+# diziliyor. Harita için her nokta, ızgara adımı kadar bir kare hücre olarak
+# GeoJSON'a çevriliyor.
+
+import functools
+import math
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+IZGARA_ADIMI = 0.1  # derece
+MAKS_NOKTA = 400  # aşılırsa adım büyütülüyor
+PARTI_BOYUTU = 100  # istek başına koordinat
+ISCI_SAYISI = 4
+KM_DERECE = 111.32  # bir enlem derecesi
+
+
+class Izgara(namedtuple("Izgara", "enlemler boylamlar")):
+    # Hashlenebilir olsun diye eksenler tuple; önbellek anahtarı olarak kullanılabiliyor
+    __slots__ = ()
+
+    @property
+    def sekil(self):
+        return len(self.enlemler), len(self.boylamlar)
+
+    @property
+    def adim(self):
+        eksen = self.enlemler if len(self.enlemler) > 1 else self.boylamlar
+        return eksen[1] - eksen[0] if len(eksen) > 1 else IZGARA_ADIMI
+
+    def noktalar(self):
+        # Satır satır (güneyden kuzeye, batıdan doğuya) düzleştirilmiş koordinatlar
+        enlem, boylam = np.meshgrid(self.enlemler, self.boylamlar, indexing="ij")
+        return enlem.ravel(), boylam.ravel()
+
+
+def cevre_kutusu(lat, lon, yaricap_km):
+    # Merkez etrafında yarıçap kadar (güney, batı, kuzey, doğu) kutusu
+    d_enlem = yaricap_km / KM_DERECE
+    d_boylam = yaricap_km / (KM_DERECE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - d_enlem, lon - d_boylam, lat + d_enlem, lon + d_boylam
+
+
+def izgara_olustur(guney, bati, kuzey, dogu, adim=IZGARA_ADIMI, maks_nokta=MAKS_NOKTA):
+    guney, kuzey = max(min(guney, kuzey), -90.0), min(max(guney, kuzey), 90.0)
+    bati, dogu = min(bati, dogu), max(bati, dogu)
+    # Nokta sayısı sınırı aşılıyorsa adım, kutu alanına göre büyütülüyor
+    adim = max(adim, math.sqrt((kuzey - guney) * (dogu - bati) / maks_nokta))
+    while True:
+        enlemler = np.arange(guney + adim / 2, kuzey, adim) if kuzey - guney > adim else np.array([(guney + kuzey) / 2])
+        boylamlar = np.arange(bati + adim / 2, dogu, adim) if dogu - bati > adim else np.array([(bati + dogu) / 2])
+        if len(enlemler) * len(boylamlar) <= maks_nokta:
+            break
+        adim *= 1.05
+    return Izgara(tuple(np.round(enlemler, 4).tolist()), tuple(np.round(boylamlar, 4).tolist()))
+
+
+def toplu_cek(istek, izgara):
+    # istek(enlemler, boylamlar) virgülle ayrılmış koordinat metinleriyle bir parti çeker ve
+    # nokta sırasıyla cevap listesi döndürür. Partiler paralel gidiyor, sıra korunuyor.
+    enlem, boylam = izgara.noktalar()
+    partiler = [slice(i, i + PARTI_BOYUTU) for i in range(0, len(enlem), PARTI_BOYUTU)]
+
+    def parti_cek(s):
+        return istek(",".join(f"{x:.4f}" for x in enlem[s]), ",".join(f"{x:.4f}" for x in boylam[s]))
+
+    if len(partiler) == 1:
+        return list(parti_cek(partiler[0]))
+    with ThreadPoolExecutor(max_workers=ISCI_SAYISI) as havuz:
+        return [cevap for cevaplar in havuz.map(parti_cek, partiler) for cevap in cevaplar]
+
+
+def anlik_matrisleri(cevaplar, izgara, adlar):
+    # ad -> (ny, nx)
+    degerler = np.array([[c.Current().Variables(i).Value() for i in range(len(adlar))] for c in cevaplar], dtype=np.float32)
+    return {ad: degerler[:, i].reshape(izgara.sekil) for i, ad in enumerate(adlar)}
+
+
+def gunluk_matrisler(cevaplar, izgara, adlar):
+    # (yerel günler, ad -> (gün, ny, nx))
+    yigin = np.stack([np.stack([c.Daily().Variables(i).ValuesAsNumpy() for i in range(len(adlar))], axis=1) for c in cevaplar], axis=1)
+    ilk = cevaplar[0]
+    gunler = pd.date_range(pd.to_datetime(ilk.Daily().Time() + ilk.UtcOffsetSeconds(), unit="s"), periods=yigin.shape[0], freq="D")
+    return gunler, {ad: yigin[:, :, i].reshape(-1, *izgara.sekil) for i, ad in enumerate(adlar)}
+
+
+@functools.lru_cache(maxsize=16)
+def hucre_geojson(izgara):
+    # Her ızgara noktası için kenarı adım kadar bir kare; id = düzleştirilmiş nokta sırası
+    yarim = izgara.adim / 2
+    enlem, boylam = izgara.noktalar()
+    ozellikler = []
+    for i, (y, x) in enumerate(zip(enlem.tolist(), boylam.tolist())):
+        kare = [[x - yarim, y - yarim], [x + yarim, y - yarim], [x + yarim, y + yarim], [x - yarim, y + yarim], [x - yarim, y - yarim]]
+        ozellikler.append({"type": "Feature", "id": i, "properties": {}, "geometry": {"type": "Polygon", "coordinates": [kare]}})
+    return {"type": "FeatureCollection", "features": ozellikler}
+
+
+def harita_yakinligi(izgara):
+    # Kutunun tamamı görünecek kadar yakınlaştırma seviyesi
+    genislik = max(izgara.boylamlar[-1] - izgara.boylamlar[0], izgara.enlemler[-1] - izgara.enlemler[0], izgara.adim)
+    return max(0.0, min(12.0, math.log2(360 / genislik) - 0.5))
@@ -0,0 +1,187 @@
+# ================= DIŞA AKTARMA =================
+# İndirilecek dosyalar sadece istendiğinde ve veri başına bir kez üretiliyor:
+#   - biçimler: CSV, gzip CSV, Parquet, Arrow IPC,
+#   - veri satır parçaları halinde yazılıyor; tüm dosyanın metni/tablosu
+#     bellekte hiç birikmiyor (70 yıllık veya saatlik veride de tepe bellek
+#     bir parça kadar),
+#   - konum, koordinat, dönem ve birimler dosyanın içine gömülüyor: Parquet ve
+#     Arrow'da şema metaverisinde ("iklim" anahtarı, JSON), CSV'de dosya
+#     başında "#" ile başlayan satırlarda (pd.read_csv(..., comment="#")),
+#   - üretilen dosyalar diskte veri anahtarı + biçim + metaveri özetiyle
+#     saklanıyor; aynı indirme tekrar istendiğinde doğrudan okunuyor.
+# Streamlit'e bağımlı değil; toplu analiz de Parquet çıktısını buradan yazıyor.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+import izleme
+
+DISA_AKTARMA_KLASORU = os.environ.get("DISA_AKTARMA_KLASORU", ".disa_aktarma")
+MAKS_BOYUT = 512 * 1024 * 1024  # bayt; aşılınca en eski dosyalardan siliniyor
+PARCA_SATIR = 100_000  # Parquet/Arrow'da parça başına bir satır grubu
+CSV_PARCA_SATIR = 2_000  # metin biçimlendirme satır başına ~1 KB geçici bellek tutuyor
+
+Bicim = namedtuple("Bicim", "etiket uzanti mime")
+BICIMLER = {
+    "csv": Bicim("CSV", ".csv", "text/csv"),
+    "csv.gz": Bicim("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": Bicim("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "arrow": Bicim("Arrow IPC", ".arrow", "application/vnd.apache.arrow.file"),
+}
+
+BIRIMLER = {
+    "max": "°C", "min": "°C", "mean": "°C", "normal_max": "°C", "normal_min": "°C", "anomali": "°C",
+    "hissedilen_min": "°C", "sicaklik": "°C",
+    "buyume_gd": "°C·gün", "isitma_gd": "°C·gün", "sogutma_gd": "°C·gün",
+    "yagis": "mm", "yagis_ihtimal": "%", "nem": "%", "yuzdelik": "%",
+    "ruzgar": "km/h", "hamle": "km/h",
+}
+
+KILIT_SAYISI = 64  # dosya yolları bu kadar kilide dağıtılıyor; kilit sayısı süreç boyunca sabit
+
+_yazma_kilidi = threading.Lock()
+_dosya_kilitleri = [threading.Lock() for _ in range(KILIT_SAYISI)]
+
+
+def ust_veri(df, konum=None, lat=None, lon=None, baslangic=None, bitis=None, **ek):
+    # Dosyaya gömülen bilgiler; dönem verilmezse verinin ilk ve son tarihi
+    if baslangic is None and len(df) and "date" in df:
+        baslangic, bitis = df["date"].iloc[0], df["date"].iloc[-1]
+    ust = {
+        "konum": konum,
+        "enlem": None if lat is None else round(float(lat), 4),
+        "boylam": None if lon is None else round(float(lon), 4),
+        "baslangic": baslangic.isoformat()[:10] if hasattr(baslangic, "isoformat") else baslangic,
+        "bitis": bitis.isoformat()[:10] if hasattr(bitis, "isoformat") else bitis,
+        "satir": len(df),
+        "birimler": {s: BIRIMLER[s] for s in df.columns if s in BIRIMLER},
+        "kaynak": "Open-Meteo",
+    }
+    ust.update(ek)
+    return ust
+
+
+def _parcalar(df, satir=PARCA_SATIR):
+    for i in range(0, max(len(df), 1), satir):
+        yield df.iloc[i:i + satir]
+
+
+def _csv_yaz(df, f, ust):
+    for anahtar, deger in ust.items():
+        f.write(f"# {anahtar}: {json.dumps(deger, ensure_ascii=False)}\n")
+    for i, parca in enumerate(_parcalar(df, CSV_PARCA_SATIR)):
+        parca.to_csv(f, index=False, header=i == 0, lineterminator="\n")
+
+
+def _arrow_yaz(df, yol, ust, bicim):
+    import pyarrow as pa
+
+    # Şema ilk satırlardan; parçalar aynı şemaya dönüştürülüyor
+    sema = pa.Table.from_pandas(df.iloc[:1], preserve_index=False).schema
+    sema = sema.with_metadata({**(sema.metadata or {}), b"iklim": json.dumps(ust, ensure_ascii=False).encode("utf-8")})
+    if bicim == "parquet":
+        import pyarrow.parquet as pq
+        yazici = pq.ParquetWriter(yol, sema, compression="zstd")
+    else:
+        yazici = pa.ipc.new_file(yol, sema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    with yazici:
+        for parca in _parcalar(df):
+            yazici.write_table(pa.Table.from_pandas(parca, schema=sema, preserve_index=False))
+
+
+def yaz(df, yol, bicim, ust=None):
+    # Önce geçici dosyaya, bitince yerine; yarıda kalan yazma bozuk dosya bırakmıyor
+    ust = ust if ust is not None else ust_veri(df)
+    gecici = f"{yol}.{threading.get_ident()}.tmp"
+    with izleme.aralik(f"dışa aktarma · {bicim}"):
+        try:
+            if bicim == "csv":
+                with open(gecici, "w", encoding="utf-8", newline="") as f:
+                    _csv_yaz(df, f, ust)
+            elif bicim == "csv.gz":
+                with gzip.open(gecici, "wt", encoding="utf-8", newline="", compresslevel=6) as f:
+                    _csv_yaz(df, f, ust)
+            elif bicim in ("parquet", "arrow"):
+                _arrow_yaz(df, gecici, ust, bicim)
+            else:
+                raise ValueError(f"Bilinmeyen biçim: {bicim}")
+            os.replace(gecici, yol)
+        except BaseException:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+            raise
+    izleme.boyut(f"dışa aktarma · {bicim}", os.path.getsize(yol))
+    return yol
+
+
+def _yol(anahtar, bicim, ust):
+    ozet = hashlib.sha1(json.dumps(ust, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(DISA_AKTARMA_KLASORU, f"{anahtar}_{ozet}{BICIMLER[bicim].uzanti}")
+
+
+def dosya(anahtar, df, bicim, ust):
+    # anahtar: verinin kimliği (veri havuzu anahtarı); aynı veri + biçim + metaveri bir kez yazılıyor
+    yol = _yol(anahtar, bicim, ust)
+    if os.path.exists(yol):
+        izleme.say("dışa aktarma", "isabet")
+        os.utime(yol)  # budamada en son kullanılanlar kalsın
+        return yol
+    # Aynı dosya için eşzamanlı istekler (iki oturum, çift tıklama) tek yazmada birleşiyor
+    with _dosya_kilitleri[hash(yol) % KILIT_SAYISI]:
+        if os.path.exists(yol):
+            izleme.say("dışa aktarma", "paylasilan")
+            return yol
+        izleme.say("dışa aktarma", "iska")
+        os.makedirs(DISA_AKTARMA_KLASORU, exist_ok=True)
+        yaz(df, yol, bicim, ust)
+    _buda()
+    return yol
+
+
+def _buda():
+    with _yazma_kilidi:
+        dosyalar = []
+        for ad in os.listdir(DISA_AKTARMA_KLASORU):
+            if ad.endswith(".tmp"):
+                continue
+            yol = os.path.join(DISA_AKTARMA_KLASORU, ad)
+            try:
+                bilgi = os.stat(yol)
+            except FileNotFoundError:
+                continue
+            dosyalar.append((bilgi.st_mtime, bilgi.st_size, yol))
+        toplam = sum(boyut for _, boyut, _ in dosyalar)
+        for _, boyut, yol in sorted(dosyalar):
+            if toplam <= MAKS_BOYUT:
+                break
+            try:
+                os.remove(yol)
+            except FileNotFoundError:
+                pass
+            toplam -= boyut
+
+
+def oku_ust_veri(yol):
+    # Dosyaya gömülü metaveri (test ve toplu işler için)
+    if yol.endswith((".csv", ".csv.gz")):
+        ac = gzip.open if yol.endswith(".gz") else open
+        ust = {}
+        with ac(yol, "rt", encoding="utf-8") as f:
+            for satir in f:
+                if not satir.startswith("# "):
+                    break
+                anahtar, _, deger = satir[2:].partition(": ")
+                ust[anahtar] = json.loads(deger)
+        return ust
+    import pyarrow as pa
+    if yol.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        sema = pq.read_schema(yol)
+    else:
+        with pa.memory_map(yol) as kaynak:
+            sema = pa.ipc.open_file(kaynak).schema
+    return json.loads(sema.metadata[b"iklim"])
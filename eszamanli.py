@@ -0,0 +1,88 @@
+# ================= EŞZAMANLI İSTEKLER =================
+# Tüm API çağrılarının paylaştığı HTTP oturumları ve iş parçacığı havuzu.
+# Birbirinden bağımsız çağrılar (anlık durum, arşiv/tahmin, Gemini raporu)
+# aynı anda başlatılır, böylece toplam süre en yavaş çağrıya yaklaşır.
+# Uzun süren işler kullanıcının beklediği çağrıların önünü tıkamasın diye ayrı
+# havuzlarda: Gemini rapor akışları (üretim boyunca iş parçacığını tutuyor) ve
+# arka plan doldurmaları (30 yıllık normaller, bayat önbellek yenilemesi).
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import izleme
+from hiz_sinirlayici import SinirliAdapter
+
+HAVUZ_BOYUTU = 8  # etkileşimli çağrılar: anlık durum, arşiv, tahmin, saatlik, bölge
+RAPOR_HAVUZU_BOYUTU = 4
+DOLDURMA_HAVUZU_BOYUTU = 2
+BAGLANTI_SAYISI = 16
+
+_havuz = ThreadPoolExecutor(max_workers=HAVUZ_BOYUTU, thread_name_prefix="iklim")
+_rapor_havuzu = ThreadPoolExecutor(max_workers=RAPOR_HAVUZU_BOYUTU, thread_name_prefix="iklim-rapor")
+_doldurma_havuzu = ThreadPoolExecutor(max_workers=DOLDURMA_HAVUZU_BOYUTU, thread_name_prefix="iklim-doldurma")
+_oturumlar = {}
+_oturum_kilidi = threading.Lock()
+
+
+def _havuzlu_retry(session):
+    # retry() varsayılan 10 bağlantılık adaptör takıyor, aynı Retry ayarıyla daha büyük havuzlu
+    # ve hız sınırlayıcıdan geçen adaptör kullan. requests_cache ve retry_requests açılışı
+    # yavaşlatmasın diye oturumlar ilk kez istendiğinde içe aktarılıyor.
+    from retry_requests import retry
+    session = retry(session, retries=5, backoff_factor=0.2)
+    for prefix in ("http://", "https://"):
+        yeniden_deneme = session.get_adapter(prefix).max_retries
+        session.mount(prefix, SinirliAdapter(max_retries=yeniden_deneme, pool_connections=BAGLANTI_SAYISI, pool_maxsize=BAGLANTI_SAYISI))
+    return session
+
+
+def _yanit_izleyici(ad, onbellekli):
+    # Cevap boyutu oturum başına; '.cache' oturumunda isabet/ıska sayısı da tutuluyor
+    def izle(response, *args, **kwargs):
+        onbellekten = getattr(response, "from_cache", None)
+        if onbellekli:
+            if onbellekten is None:
+                return  # requests_cache ıskada kancayı bir de önbellek bilgisiyle çağırıyor
+            izleme.say(".cache", "isabet" if onbellekten else "iska")
+        izleme.boyut(f"http · {ad}", len(response.content))
+    return izle
+
+
+def _oturum(ad, olustur, onbellekli=False):
+    with _oturum_kilidi:
+        if ad not in _oturumlar:
+            oturum = _havuzlu_retry(olustur())
+            oturum.hooks["response"].append(_yanit_izleyici(ad, onbellekli))
+            _oturumlar[ad] = oturum
+        return _oturumlar[ad]
+
+
+def ortak_oturum():
+    # Anlık durum, tahmin ve geocoding için önbelleksiz ortak oturum
+    return _oturum("ortak", requests.Session)
+
+
+def arsiv_oturumu():
+    # Arşiv verisi değişmediği için istekler '.cache' SQLite dosyasında da tutuluyor
+    def olustur():
+        import requests_cache
+        return requests_cache.CachedSession('.cache', expire_after=3600)
+    return _oturum("arsiv", olustur, onbellekli=True)
+
+
+def arka_planda(fonksiyon, *args, **kwargs):
+    # Fonksiyonu ortak havuzda başlatır ve Future döndürür. Havuzdaki işler
+    # sayfaya eleman yazmamalı (st.* çağrıları ana betikte kalır).
+    return _havuz.submit(fonksiyon, *args, **kwargs)
+
+
+def rapor_arka_planda(fonksiyon, *args, **kwargs):
+    # Gemini akışları için; arka_planda ile aynı kurallar
+    return _rapor_havuzu.submit(fonksiyon, *args, **kwargs)
+
+
+def doldurma_arka_planda(fonksiyon, *args, **kwargs):
+    # Kimsenin hemen beklemediği uzun doldurma ve yenileme işleri için
+    return _doldurma_havuzu.submit(fonksiyon, *args, **kwargs)
@@ -0,0 +1,55 @@
+# ================= GRAFİK VERİSİ =================
+# Uzun zaman serilerinde tarayıcıya giden nokta sayısını sınırlar:
+#   - çizgiler her dilimin en düşük ve en yüksek noktası korunarak seyreltilir
+#     (tepe ve dip değerler kaybolmaz),
+#   - yağış çubukları aralığın uzunluğuna göre haftalık/aylık toplanır,
+#   - nokta sayısı eşiği aşan izler WebGL (Scattergl) ile çizilir.
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+HEDEF_NOKTA = 2000  # çizgi başına en fazla nokta
+WEBGL_ESIGI = 1000  # bundan fazla noktalı izler Scattergl
+HAFTALIK_ESIK = 400  # gün; üstünde yağış haftalık toplanır
+AYLIK_ESIK = 5 * 365  # gün; üstünde aylık
+
+
+def minmax_indeksleri(y, hedef=HEDEF_NOKTA):
+    # Seriyi hedef/2 dilime bölüp her dilimden en küçük ve en büyük değerli noktanın
+    # indeksini zaman sırasıyla döndürür. Tamamen vektörel, NaN'lar seçilmez.
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= hedef:
+        return np.arange(n)
+    dilim = np.arange(n) * (hedef // 2) // n
+    bos = np.isnan(y)
+    en_buyuk = np.lexsort((np.where(bos, -np.inf, y), dilim))
+    en_kucuk = np.lexsort((np.where(bos, np.inf, y), dilim))
+    sinirlar = np.flatnonzero(np.diff(dilim[en_buyuk]))
+    son = np.append(sinirlar, n - 1)
+    ilk = np.insert(sinirlar + 1, 0, 0)
+    return np.unique(np.concatenate((en_buyuk[son], en_kucuk[ilk])))
+
+
+def cizgi_verisi(df, sutun, hedef=HEDEF_NOKTA):
+    secilen = minmax_indeksleri(df[sutun].to_numpy(), hedef)
+    return df['date'].iloc[secilen], df[sutun].iloc[secilen]
+
+
+def yagis_verisi(df, sutun='yagis'):
+    # Uzun aralıklarda günlük çubuklar yerine haftalık/aylık toplam; etiket dönem adıyla döner
+    gun = len(df)
+    if gun <= HAFTALIK_ESIK:
+        return df['date'], df[sutun], "Yağış (mm)"
+    kural, etiket = ("MS", "Aylık Yağış (mm)") if gun > AYLIK_ESIK else ("W-MON", "Haftalık Yağış (mm)")
+    # Tarihler yerel gece yarısının UTC karşılığı; +12 saat kaydırınca yerel güne denk geliyor
+    gunluk = pd.Series(df[sutun].to_numpy(), index=df['date'] + pd.Timedelta(hours=12))
+    toplam = gunluk.resample(kural, label="left", closed="left").sum(min_count=1)
+    return toplam.index, toplam.to_numpy(), etiket
+
+
+def cizgi_izi(x, y, **kwargs):
+    # Nokta sayısına göre SVG veya WebGL iz seçer
+    iz = go.Scattergl if len(x) > WEBGL_ESIGI else go.Scatter
+    return iz(x=x, y=y, **kwargs)
@@ -0,0 +1,140 @@
+# ================= HIZ SINIRLAYICI =================
+# Süreç genelinde Open-Meteo'ya giden istekleri düzenler:
+#   - JetonKovasi: dakika başı kotayı aşmamak için istekleri kuyruğa alır,
+#     öncelik sırasına göre (anlık durum > tahmin/geocoding > arşiv) bırakır.
+#   - tek_ucus: aynı argümanlarla eşzamanlı gelen çağrılar tek bir istekte birleşir.
+#   - SinirliAdapter: requests oturumlarına takılan, her gerçek HTTP isteğinde
+#     jeton alan ve 429 cevabında kovayı duraklatıp tekrar deneyen adaptör.
+
+import functools
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+import izleme
+
+ONCELIK_ANLIK = 0
+ONCELIK_NORMAL = 1
+ONCELIK_ARSIV = 2
+
+DAKIKA_LIMITI = int(os.environ.get("OPEN_METEO_DAKIKA_LIMITI", 600))
+ANI_YUK = int(os.environ.get("OPEN_METEO_ANI_YUK", 20))
+YENIDEN_DENEME_429 = 3
+
+
+class JetonKovasi:
+    def __init__(self, saniye_basi, kapasite):
+        self.saniye_basi = saniye_basi
+        self.kapasite = kapasite
+        self._jeton = float(kapasite)
+        self._son = time.monotonic()
+        self._bekleme_sonu = 0.0
+        self._sira = itertools.count()
+        self._kuyruk = []  # (öncelik, sıra)
+        self._kosul = threading.Condition()
+
+    def _doldur(self, simdi):
+        self._jeton = min(self.kapasite, self._jeton + (simdi - self._son) * self.saniye_basi)
+        self._son = simdi
+
+    def izin_al(self, oncelik=ONCELIK_NORMAL):
+        # Sıra bu isteğe gelip jeton olana kadar bekler
+        with self._kosul:
+            kayit = (oncelik, next(self._sira))
+            heapq.heappush(self._kuyruk, kayit)
+            try:
+                while True:
+                    simdi = time.monotonic()
+                    self._doldur(simdi)
+                    if self._kuyruk[0] == kayit and simdi >= self._bekleme_sonu and self._jeton >= 1:
+                        self._jeton -= 1
+                        return
+                    if simdi < self._bekleme_sonu:
+                        bekle = self._bekleme_sonu - simdi
+                    else:
+                        bekle = max((1 - self._jeton) / self.saniye_basi, 0.01)
+                    self._kosul.wait(bekle)
+            finally:
+                self._kuyruk.remove(kayit)
+                heapq.heapify(self._kuyruk)
+                self._kosul.notify_all()
+
+    def duraklat(self, saniye):
+        # Sunucu kota aşımı bildirdiğinde tüm kuyruğu bir süre beklet
+        with self._kosul:
+            self._bekleme_sonu = max(self._bekleme_sonu, time.monotonic() + saniye)
+            self._jeton = 0.0
+            self._kosul.notify_all()
+
+    def kuyruk_derinligi(self):
+        with self._kosul:
+            return len(self._kuyruk)
+
+
+kova = JetonKovasi(DAKIKA_LIMITI / 60, ANI_YUK)
+
+
+def istek_onceligi(url):
+    parca = urlsplit(url)
+    if parca.path.endswith("/archive"):
+        return ONCELIK_ARSIV
+    if "current=" in parca.query:
+        return ONCELIK_ANLIK
+    return ONCELIK_NORMAL
+
+
+class SinirliAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        oncelik = istek_onceligi(request.url)
+        uc_nokta = urlsplit(request.url).path.rstrip("/").rpartition("/")[2]
+        for deneme in range(1, YENIDEN_DENEME_429 + 1):
+            with izleme.aralik("http · kuyruk bekleme"):
+                kova.izin_al(oncelik)
+            with izleme.aralik(f"http · {uc_nokta}"):
+                response = super().send(request, **kwargs)
+            if response.status_code != 429 or deneme == YENIDEN_DENEME_429:
+                return response
+            izleme.say("http", "429")
+            try:
+                bekle = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                bekle = 5.0 * deneme
+            response.close()
+            kova.duraklat(bekle)
+
+
+# Streamlit yenilemelerinde fonksiyonlar yeniden tanımlansa da uçuştaki çağrılar paylaşılsın
+_ucustakiler = {}
+_ucus_kilidi = threading.Lock()
+
+
+def tek_ucus(fonksiyon):
+    ad = f"{fonksiyon.__module__}.{fonksiyon.__qualname__}"
+
+    @functools.wraps(fonksiyon)
+    def sarici(*args, **kwargs):
+        anahtar = (ad, args, tuple(sorted(kwargs.items())))
+        with _ucus_kilidi:
+            gelecek = _ucustakiler.get(anahtar)
+            lider = gelecek is None
+            if lider:
+                gelecek = _ucustakiler[anahtar] = Future()
+        if not lider:
+            return gelecek.result()
+
+        try:
+            gelecek.set_result(fonksiyon(*args, **kwargs))
+        except BaseException as e:
+            gelecek.set_exception(e)
+        finally:
+            with _ucus_kilidi:
+                del _ucustakiler[anahtar]
+        return gelecek.result()
+
+    return sarici
@@ -0,0 +1,129 @@
+# ================= İZLEME =================
+# Süreç genelinde hafif ölçüm kaydı; "Analizi Başlat" yavaşladığında süre
+# hangi aşamada (geocoding, arşiv isteği, çözme, grafik, rapor) geçiyor, hangi
+# önbellek ıskalıyor görülebilsin diye. Streamlit'e bağımlı değil:
+#   - aralik(ad): with bloğunun süresi (sayı, toplam, en uzun, son),
+#   - say(ad, olay): önbellek isabet/ıska gibi sayaçlar,
+#   - boyut(ad, bayt): HTTP cevabı gibi veri boyutları,
+#   - kaynak_ekle(ad, fonksiyon): kendi durumunu tutan bileşenler (veri
+#     havuzu, zamanlı önbellek) ozet()'e o anki değerleriyle ekleniyor.
+# ozet() JSON'a çevrilebilir sözlük döndürür; IZLEME_DOSYASI verilirse süreç
+# kapanırken oraya yazılıyor.
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+IZLEME_DOSYASI = os.environ.get("IZLEME_DOSYASI")
+
+_kilit = threading.Lock()
+_araliklar = {}  # ad -> [sayı, toplam ms, en uzun ms, son ms]
+_sayaclar = {}  # ad -> {olay: sayı}
+_boyutlar = {}  # ad -> [sayı, toplam bayt, en büyük bayt]
+_kaynaklar = {}  # ad -> durum fonksiyonu
+_baslangic = time.time()
+
+
+def kaydet(ad, ms):
+    with _kilit:
+        kayit = _araliklar.get(ad)
+        if kayit is None:
+            _araliklar[ad] = [1, ms, ms, ms]
+        else:
+            kayit[0] += 1
+            kayit[1] += ms
+            kayit[2] = max(kayit[2], ms)
+            kayit[3] = ms
+
+
+@contextmanager
+def aralik(ad):
+    bas = time.perf_counter()
+    try:
+        yield
+    finally:
+        kaydet(ad, (time.perf_counter() - bas) * 1000)
+
+
+def izle(ad):
+    # Fonksiyonun her çağrısını aralik(ad) içinde çalıştıran dekoratör
+    def dekorator(fonksiyon):
+        @functools.wraps(fonksiyon)
+        def sarici(*args, **kwargs):
+            with aralik(ad):
+                return fonksiyon(*args, **kwargs)
+        return sarici
+    return dekorator
+
+
+def say(ad, olay, adet=1):
+    with _kilit:
+        sayac = _sayaclar.setdefault(ad, {})
+        sayac[olay] = sayac.get(olay, 0) + adet
+
+
+def boyut(ad, bayt):
+    with _kilit:
+        kayit = _boyutlar.get(ad)
+        if kayit is None:
+            _boyutlar[ad] = [1, bayt, bayt]
+        else:
+            kayit[0] += 1
+            kayit[1] += bayt
+            kayit[2] = max(kayit[2], bayt)
+
+
+def kaynak_ekle(ad, fonksiyon):
+    with _kilit:
+        _kaynaklar[ad] = fonksiyon
+
+
+def ozet():
+    with _kilit:
+        araliklar = {ad: {"sayi": s, "toplam_ms": round(t, 2), "ort_ms": round(t / s, 2), "en_uzun_ms": round(m, 2), "son_ms": round(n, 2)}
+                     for ad, (s, t, m, n) in sorted(_araliklar.items())}
+        sayaclar = {ad: dict(sayac) for ad, sayac in sorted(_sayaclar.items())}
+        boyutlar = {ad: {"sayi": s, "toplam_bayt": t, "ort_bayt": t // s, "en_buyuk_bayt": m}
+                    for ad, (s, t, m) in sorted(_boyutlar.items())}
+        kaynaklar = dict(_kaynaklar)
+    for sayac in sayaclar.values():
+        toplam = sayac.get("isabet", 0) + sayac.get("iska", 0)
+        if toplam:
+            sayac["isabet_orani"] = round(sayac.get("isabet", 0) / toplam, 3)
+    return {
+        "zaman": time.time(),
+        "calisma_suresi_sn": round(time.time() - _baslangic, 1),
+        "araliklar": araliklar,
+        "sayaclar": sayaclar,
+        "boyutlar": boyutlar,
+        "kaynaklar": {ad: fonksiyon() for ad, fonksiyon in sorted(kaynaklar.items())},
+    }
+
+
+def json_ozet():
+    return json.dumps(ozet(), ensure_ascii=False, indent=2, default=str)
+
+
+def disa_dok(yol):
+    gecici = yol + ".tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        f.write(json_ozet())
+    os.replace(gecici, yol)
+
+
+def sifirla():
+    # Kaynaklar kalıyor, biriken ölçümler siliniyor
+    global _baslangic
+    with _kilit:
+        _araliklar.clear()
+        _sayaclar.clear()
+        _boyutlar.clear()
+        _baslangic = time.time()
+
+
+if IZLEME_DOSYASI:
+    atexit.register(disa_dok, IZLEME_DOSYASI)
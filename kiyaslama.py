@@ -0,0 +1,247 @@
+# ================= KIYASLAMA =================
+# Sıcak yolların süresini canlı servislere gitmeden ölçer ve karşılaştırılabilir
+# JSON olarak yazar:
+#   python kiyaslama.py --cikti kiyaslama.json
+#   python kiyaslama.py --cikti yeni.json --karsilastir kiyaslama.json --esik 20
+# Open-Meteo ve Gemini istekleri kiyaslama_sunucusu'na gidiyor (--gecikme-ms ile
+# ağ gecikmesi eklenebilir). Depo, rapor ve HTTP önbellekleri her çalıştırmada
+# geçici bir klasörde sıfırdan oluşturuluyor; hız sınırı ölçümü bozmasın diye
+# kapatılıyor. Ölçülenler:
+#   - arsiv_<n>y_soguk / _sicak: gecmis_veri_cek_v2 (boş depo: istek + FlatBuffers
+#     çözme + depoya yazma; dolu depo: sadece okuma), 1/10/80 yıl,
+#   - disa_aktarma_<biçim>_<n>y: türetilmiş sütunlarıyla verinin her biçimde
+#     dosyaya yazılması,
+#   - sayfa_<n>y_*: uygulamanın tamamı (AppTest ile) ilk analizde, aynı
+#     sayfanın yeniden çalıştırılmasında ve önbellekler boşken; panel içindeki
+#     şekil kurma süresi uygulamanın kendi süre ölçümünden,
+#   - tahmin_*: tahmin modu için aynıları.
+# --karsilastir verilirse ortak ölçümlerin medyanları karşılaştırılıyor; eşikten
+# fazla yavaşlayan varsa çıkış kodu 1. Sonuca izleme.py'nin aşama süreleri ve
+# önbellek sayaçları da ekleniyor.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+KLASOR = os.path.dirname(os.path.abspath(__file__))
+YILLAR = (1, 10, 80)
+SEHIR = "Ankara"  # yerel konum dizininde, geocoding isteği yapılmıyor
+ESIK = 20  # %; karşılaştırmada bundan fazla yavaşlama gerileme sayılıyor
+
+
+def _ortami_hazirla(sunucu, klasor):
+    # Proje modülleri bu ayarları içe aktarılırken okuyor; modüller bundan sonra yüklenmeli
+    os.environ.update(sunucu.ortam())
+    os.environ.update({
+        "ARSIV_DEPO_KLASORU": os.path.join(klasor, "arsiv"),
+        "RAPOR_ONBELLEK_KLASORU": os.path.join(klasor, "rapor"),
+        "KONUM_DIZINI_KLASORU": os.path.join(klasor, "konum"),
+        "DISA_AKTARMA_KLASORU": os.path.join(klasor, "disa_aktarma"),
+        "OPEN_METEO_DAKIKA_LIMITI": "1000000",
+        "OPEN_METEO_ANI_YUK": "1000000",
+    })
+    os.chdir(klasor)  # requests_cache'in '.cache' dosyası da geçici klasöre düşsün
+    sys.path.insert(0, KLASOR)
+
+
+def _donem(yil):
+    bitis = datetime.date(datetime.date.today().year - 1, 12, 31)
+    return datetime.date(bitis.year - yil + 1, 1, 1), bitis
+
+
+def _olc(fonksiyon, tekrar, hazirla=None):
+    sureler = []
+    for _ in range(tekrar):
+        if hazirla:
+            hazirla()
+        bas = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - bas) * 1000)
+    return sureler
+
+
+def arsiv_olcumleri(tekrar, sonuclar):
+    from arsiv_deposu import DEPO_KLASORU
+    from eszamanli import arsiv_oturumu
+    from konum_dizini import konum_dizini
+    from veri_kaynaklari import gecmis_veri_cek_v2
+
+    konum = konum_dizini().bul(SEHIR)
+
+    def bosalt():
+        shutil.rmtree(DEPO_KLASORU, ignore_errors=True)
+        arsiv_oturumu().cache.clear()
+
+    for yil in YILLAR:
+        bas, bit = (d.isoformat() for d in _donem(yil))
+        cek = lambda: gecmis_veri_cek_v2(konum.lat, konum.lon, bas, bit)
+        sonuclar[f"arsiv_{yil}y_soguk"] = _olc(cek, tekrar, bosalt)
+        sonuclar[f"arsiv_{yil}y_sicak"] = _olc(cek, tekrar)
+
+
+def disa_aktarma_olcumleri(tekrar, sonuclar, klasor):
+    from disa_aktarma import BICIMLER, ust_veri, yaz
+    from konum_dizini import konum_dizini
+    from turetilmis import turetilmis_ekle
+    from veri_kaynaklari import gecmis_veri_cek_v2
+
+    konum = konum_dizini().bul(SEHIR)
+    for yil in YILLAR:
+        bas, bit = _donem(yil)
+        df = turetilmis_ekle(gecmis_veri_cek_v2(konum.lat, konum.lon, bas.isoformat(), bit.isoformat()))
+        ust = ust_veri(df, konum.etiket, konum.lat, konum.lon, bas, bit)
+        for bicim, bilgi in BICIMLER.items():
+            yol = os.path.join(klasor, "disa_aktarma" + bilgi.uzanti)
+            sonuclar[f"disa_aktarma_{bicim}_{yil}y"] = _olc(lambda: yaz(df, yol, bicim, ust), tekrar)
+
+
+def _uygulama():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(KLASOR, "app.py"), default_timeout=600)
+    at.secrets["GOOGLE_API_KEY"] = "kiyaslama"
+    return at.run()
+
+
+def _sureler(at, *adlar):
+    if at.exception:
+        raise RuntimeError(f"Uygulama hata verdi: {at.exception[0].value}")
+    kayit = at.session_state["sureler"]
+    return [kayit.get(ad, float("nan")) for ad in adlar]
+
+
+def sayfa_olcumleri(tekrar, sonuclar):
+    import streamlit as st
+    from arsiv_deposu import DEPO_KLASORU
+
+    def topla(ad, deger):
+        sonuclar.setdefault(ad, []).append(deger)
+
+    for yil in YILLAR:
+        for _ in range(tekrar):
+            # Soğuk başlangıç: boş depo ve önbellekler
+            shutil.rmtree(DEPO_KLASORU, ignore_errors=True)
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            at = _uygulama()
+            at.sidebar.text_input[0].set_value(SEHIR)
+            at.sidebar.date_input[0].set_value(_donem(yil))
+            at.sidebar.button[0].click()
+            bas = time.perf_counter()
+            at.run()
+            topla(f"sayfa_{yil}y_ilk_analiz", (time.perf_counter() - bas) * 1000)
+            _sureler(at)
+
+            # Aynı sayfa tekrar: şekiller ve baytlar önbellekten
+            at.run()
+            tam, grafik = _sureler(at, "Tam sayfa", "Grafik · Geçmiş")
+            topla(f"sayfa_{yil}y_yeniden", tam)
+            topla(f"sayfa_{yil}y_grafik_onbellekli", grafik)
+
+            # Önbellekler boşken: şekil kurma
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            at.run()
+            topla(f"sayfa_{yil}y_grafik_kurma", _sureler(at, "Grafik · Geçmiş")[0])
+
+    for _ in range(tekrar):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        at = _uygulama()
+        at.sidebar.radio[0].set_value("Hava Tahmini").run()  # kenar çubuğu moda göre değişiyor
+        at.sidebar.text_input[0].set_value(SEHIR)
+        at.sidebar.button[0].click()
+        bas = time.perf_counter()
+        at.run()
+        topla("tahmin_ilk_analiz", (time.perf_counter() - bas) * 1000)
+        topla("tahmin_grafik_kurma", _sureler(at, "Grafik · Tahmin")[0])
+        at.run()
+        topla("tahmin_yeniden", _sureler(at, "Tam sayfa")[0])
+
+
+def _git_surumu():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=KLASOR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def karsilastir(yeni, eski, esik=ESIK, yaz=print):
+    # Ortak ölçümlerin medyan oranları; eşiği aşan gerilemelerin adları döner
+    gerileyenler = []
+    for ad in sorted(set(yeni["olcumler"]) & set(eski["olcumler"])):
+        y, e = yeni["olcumler"][ad]["medyan_ms"], eski["olcumler"][ad]["medyan_ms"]
+        if not (y == y and e == e) or e <= 0:  # NaN
+            continue
+        degisim = (y / e - 1) * 100
+        isaret = ""
+        if degisim > esik:
+            gerileyenler.append(ad)
+            isaret = "  <-- GERİLEME"
+        yaz(f"{ad:<32} {e:10.1f} -> {y:10.1f} ms  {degisim:+6.1f}%{isaret}")
+    return gerileyenler
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(description="Veri çekme, çözme, dışa aktarma, grafik ve sayfa sürelerini yerel taklit sunucuyla ölçer.")
+    ayristirici.add_argument("--cikti", default="kiyaslama.json", help="sonuç dosyası (varsayılan: kiyaslama.json)")
+    ayristirici.add_argument("--tekrar", type=int, default=3, help="ölçüm başına tekrar (varsayılan: 3)")
+    ayristirici.add_argument("--gecikme-ms", type=float, default=0, help="taklit sunucuda istek başına gecikme")
+    ayristirici.add_argument("--sadece-arsiv", action="store_true", help="uygulama (AppTest) ölçümlerini atla")
+    ayristirici.add_argument("--karsilastir", help="önceki sonuç dosyası")
+    ayristirici.add_argument("--esik", type=float, default=ESIK, help=f"gerileme eşiği, %% (varsayılan: {ESIK})")
+    args = ayristirici.parse_args(argv)
+    cikti = os.path.abspath(args.cikti)
+    onceki = os.path.abspath(args.karsilastir) if args.karsilastir else None
+
+    from kiyaslama_sunucusu import KiyaslamaSunucusu
+    sunucu = KiyaslamaSunucusu(gecikme_ms=args.gecikme_ms).baslat()
+    klasor = tempfile.mkdtemp(prefix="kiyaslama_")
+    _ortami_hazirla(sunucu, klasor)
+    import izleme
+    ham = {}
+    try:
+        arsiv_olcumleri(args.tekrar, ham)
+        disa_aktarma_olcumleri(args.tekrar, ham, klasor)
+        if not args.sadece_arsiv:
+            sayfa_olcumleri(args.tekrar, ham)
+    finally:
+        sunucu.durdur()
+        os.chdir(KLASOR)
+        shutil.rmtree(klasor, ignore_errors=True)
+
+    sonuc = {
+        "surum": 1,
+        "zaman": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_surumu(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ayarlar": {"tekrar": args.tekrar, "gecikme_ms": args.gecikme_ms, "yillar": list(YILLAR)},
+        "sunucu": sunucu.sayac(),
+        "izleme": izleme.ozet(),
+        "olcumler": {ad: {"medyan_ms": statistics.median(s), "en_az_ms": min(s), "tekrarlar": s} for ad, s in ham.items()},
+    }
+    with open(cikti, "w", encoding="utf-8") as f:
+        json.dump(sonuc, f, ensure_ascii=False, indent=2)
+    for ad, olcum in sonuc["olcumler"].items():
+        print(f"{ad:<32} {olcum['medyan_ms']:10.1f} ms (en az {olcum['en_az_ms']:.1f})")
+    print(f"Sonuçlar: {cikti}")
+
+    if onceki:
+        with open(onceki, encoding="utf-8") as f:
+            gerileyenler = karsilastir(sonuc, json.load(f), args.esik)
+        if gerileyenler:
+            print(f"{len(gerileyenler)} ölçümde %{args.esik:.0f} üzeri yavaşlama: {', '.join(gerileyenler)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+# ================= KIYASLAMA SUNUCUSU =================
+# Canlı servislere gitmeden ölçüm yapmak için yerel taklit sunucu:
+#   - /v1/forecast, /v1/archive: Open-Meteo cevapları, gerçek tel biçiminde
+#     (4 bayt uzunluk önekli FlatBuffers WeatherApiResponse mesajları); GET/POST
+#     ve virgülle ayrılmış çok konumlu istekler destekleniyor,
+#   - /v1/search: Geocoding JSON,
+#   - /v1beta/models/<model>:streamGenerateContent: Gemini REST akışı (hazır metin).
+# Değerler istek parametrelerinden sabit tohumlu bir mevsim modeliyle üretiliyor;
+# aynı istek her zaman aynı baytları döndürüyor ve üretilen cevaplar bellekte
+# tutuluyor. Her isteğe gecikme_ms kadar bekleme ekleniyor.
+#   python kiyaslama_sunucusu.py --port 8765 --gecikme-ms 50
+# Uygulamayı sunucuya yönlendirmek için yazdırılan ortam değişkenleri kullanılabilir.
+
+import argparse
+import datetime
+import functools
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import flatbuffers
+import numpy as np
+
+# Alan sayıları openmeteo_sdk şemasındaki son alanın indeksinden
+_YANIT_ALANI = 15  # WeatherApiResponse
+_SERI_ALANI = 4  # VariablesWithTime: time, time_end, interval, variables
+_DEGISKEN_ALANI = 13  # VariableWithValues: variable, unit, value, values, ...
+_YANIT_SLOTLARI = {"current": 9, "daily": 10, "hourly": 11}
+
+RAPOR_METNI = (
+    "**Sıcaklık Trendi:** Dönem boyunca sıcaklıklar mevsim normalleri civarında seyretmiştir. ",
+    "Gece ve gündüz arasındaki fark belirgin değildir.\n\n",
+    "**Yağış Riski:** Yağış miktarı dönem ortalamasına yakındır; kısa süreli sağanaklar görülmüştür.\n\n",
+    "**Rüzgar Durumu:** Rüzgar genel olarak hafif ve orta kuvvettedir, fırtına riski düşüktür.\n\n",
+    "**Sonuç:** Belirgin bir risk öngörülmemektedir.",
+)
+_GECERLI_KODLAR = np.array([0, 1, 2, 3, 45, 51, 53, 61, 63, 71, 80, 95])
+
+
+# ---------- FlatBuffers kodlama ----------
+
+def _degisken_yaz(b, degerler=None, deger=None):
+    vektor = b.CreateNumpyVector(np.ascontiguousarray(degerler, dtype=np.float32)) if degerler is not None else None
+    b.StartObject(_DEGISKEN_ALANI)
+    if vektor is not None:
+        b.PrependUOffsetTRelativeSlot(3, vektor, 0)
+    if deger is not None:
+        b.PrependFloat32Slot(2, deger, 0.0)
+    return b.EndObject()
+
+
+def _seri_yaz(b, zaman, aralik, sutunlar, tekil=False):
+    ofsetler = [_degisken_yaz(b, deger=float(s[0])) if tekil else _degisken_yaz(b, s) for s in sutunlar]
+    b.StartVector(4, len(ofsetler), 4)
+    for ofset in reversed(ofsetler):
+        b.PrependUOffsetTRelative(ofset)
+    vektor = b.EndVector()
+    uzunluk = 1 if tekil else (len(sutunlar[0]) if sutunlar else 0)
+    b.StartObject(_SERI_ALANI)
+    b.PrependInt64Slot(0, zaman, 0)
+    b.PrependInt64Slot(1, zaman + uzunluk * aralik, 0)
+    b.PrependInt32Slot(2, aralik, 0)
+    b.PrependUOffsetTRelativeSlot(3, vektor, 0)
+    return b.EndObject()
+
+
+def yanit_mesaji(lat, lon, utc_offset, seriler):
+    # seriler: {"daily"/"hourly"/"current": (zaman, aralık, [sütunlar])}
+    b = flatbuffers.Builder(1024 + sum(len(s) * len(s[0]) * 4 for _, _, s in seriler.values() if s))
+    ofsetler = {ad: _seri_yaz(b, zaman, aralik, sutunlar, tekil=(ad == "current")) for ad, (zaman, aralik, sutunlar) in seriler.items()}
+    b.StartObject(_YANIT_ALANI)
+    b.PrependFloat32Slot(0, lat, 0.0)
+    b.PrependFloat32Slot(1, lon, 0.0)
+    b.PrependInt32Slot(6, utc_offset, 0)
+    for ad, ofset in ofsetler.items():
+        b.PrependUOffsetTRelativeSlot(_YANIT_SLOTLARI[ad], ofset, 0)
+    b.Finish(b.EndObject())
+    return bytes(b.Output())
+
+
+def paketle(mesajlar):
+    # Open-Meteo tel biçimi: her mesajın önünde little-endian 4 bayt uzunluk
+    return b"".join(len(m).to_bytes(4, "little") + m for m in mesajlar)
+
+
+# ---------- Sentetik veri ----------
+
+def _tohum(*parcalar):
+    return zlib.crc32(repr(parcalar).encode())
+
+
+def _seri_uret(ad, zamanlar, lat, lon, rng):
+    # zamanlar: yerel saatle epoch saniyeleri; değişken adına göre mevsimsel değerler
+    gun = zamanlar / 86400.0
+    saat = (zamanlar % 86400) / 3600.0
+    mevsim = np.sin(2 * np.pi * (gun % 365.25 - 110) / 365.25)
+    gunici = np.sin(2 * np.pi * (saat - 9) / 24)
+    ortalama = 35 - 0.6 * abs(lat) + 11 * mevsim + rng.normal(0, 2.5, len(gun))
+    if ad.startswith(("temperature_2m", "apparent_temperature")):
+        ek = {"temperature_2m_max": 5.0, "temperature_2m_min": -5.0}.get(ad, 0.0)
+        deger = ortalama + ek + (4 * gunici if ad in ("temperature_2m", "apparent_temperature") else 0)
+        return deger - (2.0 if ad.startswith("apparent") else 0.0)
+    if ad.startswith("precipitation_probability"):
+        return np.clip(rng.normal(30, 25, len(gun)), 0, 100)
+    if ad.startswith("precipitation"):
+        return np.where(rng.random(len(gun)) < 0.3, rng.gamma(0.8, 4.0 if ad.endswith("sum") else 0.6, len(gun)), 0.0)
+    if ad.startswith(("wind_speed", "wind_gusts")):
+        return rng.gamma(2.0, 6.0 if ad.startswith("wind_gusts") else 4.0, len(gun))
+    if ad.startswith("relative_humidity"):
+        return np.clip(65 - 15 * gunici + rng.normal(0, 8, len(gun)), 5, 100)
+    if ad == "weather_code":
+        return rng.choice(_GECERLI_KODLAR, len(gun)).astype(np.float64)
+    if ad == "is_day":
+        return ((saat >= 6) & (saat < 18)).astype(np.float64)
+    return rng.normal(0, 1, len(gun))
+
+
+def _liste(params, ad):
+    return [p for deger in params.get(ad, []) for p in deger.split(",") if p]
+
+
+@functools.lru_cache(maxsize=256)
+def open_meteo_cevabi(yol, sorgu):
+    # sorgu: sıralı (anahtar, (değerler...)) ikilileri; cevap baytları
+    params = {k: list(v) for k, v in sorgu}
+    enlemler, boylamlar = _liste(params, "latitude"), _liste(params, "longitude")
+    bugun = datetime.date.today()
+    if "start_date" in params:
+        ilk = datetime.date.fromisoformat(params["start_date"][0])
+        gun_sayisi = (datetime.date.fromisoformat(params["end_date"][0]) - ilk).days + 1
+    else:
+        ilk, gun_sayisi = bugun, int(params.get("forecast_days", ["7"])[0])
+
+    mesajlar = []
+    for lat, lon in zip(map(float, enlemler), map(float, boylamlar)):
+        utc_offset = int(round(lon / 15)) * 3600  # timezone=auto yerine boylamdan
+        rng = np.random.default_rng(_tohum(yol, lat, lon, ilk.isoformat(), gun_sayisi))
+        yerel_ilk = (ilk - datetime.date(1970, 1, 1)).days * 86400
+        seriler = {}
+        for tur, aralik in (("daily", 86400), ("hourly", 3600)):
+            adlar = _liste(params, tur)
+            if adlar:
+                zamanlar = yerel_ilk + np.arange(gun_sayisi * 86400 // aralik, dtype=np.int64) * aralik
+                seriler[tur] = (yerel_ilk - utc_offset, aralik, [_seri_uret(ad, zamanlar, lat, lon, rng) for ad in adlar])
+        adlar = _liste(params, "current")
+        if adlar:
+            simdi = int(time.time()) // 900 * 900
+            zamanlar = np.array([simdi + utc_offset])
+            seriler["current"] = (simdi, 900, [_seri_uret(ad, zamanlar, lat, lon, rng) for ad in adlar])
+        mesajlar.append(yanit_mesaji(lat, lon, utc_offset, seriler))
+    return paketle(mesajlar)
+
+
+def geocoding_cevabi(ad):
+    tohum = _tohum(ad.casefold())
+    return {"results": [{
+        "name": ad.strip().title(), "country": "Türkiye", "admin1": "",
+        "latitude": 36 + (tohum % 600) / 100, "longitude": 26 + (tohum // 600 % 1800) / 100,
+        "population": 10000 + tohum % 900000,
+    }]} if ad.strip() else {}
+
+
+# ---------- HTTP ----------
+
+class _Isleyici(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sunucu = None  # KiyaslamaSunucusu
+
+    def log_message(self, *args):
+        pass
+
+    def _params(self):
+        params = parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+        uzunluk = int(self.headers.get("Content-Length") or 0)
+        if uzunluk:
+            govde = self.rfile.read(uzunluk).decode("utf-8")
+            if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                for k, v in parse_qs(govde, keep_blank_values=True).items():
+                    params.setdefault(k, []).extend(v)
+        return params
+
+    def _gonder(self, govde, tur, uc):
+        self.sunucu.say(uc, len(govde))
+        self.send_response(200)
+        self.send_header("Content-Type", tur)
+        self.send_header("Content-Length", str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def _isle(self):
+        yol = urlsplit(self.path).path
+        params = self._params()
+        if self.sunucu.gecikme:
+            time.sleep(self.sunucu.gecikme)
+        if yol.endswith(("/forecast", "/archive")):
+            sorgu = tuple(sorted((k, tuple(v)) for k, v in params.items() if k != "format"))
+            self._gonder(open_meteo_cevabi(yol, sorgu), "application/octet-stream", yol.rsplit("/", 1)[1])
+        elif yol.endswith("/search"):
+            self._gonder(json.dumps(geocoding_cevabi(params.get("name", [""])[0])).encode(), "application/json", "search")
+        elif ":streamGenerateContent" in yol or ":generateContent" in yol:
+            self._gemini(":streamGenerateContent" in yol)
+        else:
+            self.send_error(404)
+
+    def _gemini(self, akis):
+        # REST akışı bir JSON dizisi; parçalar arasına da gecikme ekleniyor
+        parcalar = [{"candidates": [{"content": {"parts": [{"text": t}], "role": "model"}, "index": 0}]} for t in RAPOR_METNI]
+        if not akis:
+            self._gonder(json.dumps({"candidates": [{"content": {"parts": [{"text": "".join(RAPOR_METNI)}], "role": "model"}, "index": 0}]}).encode(),
+                         "application/json", "gemini")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        toplam = 0
+        for i, parca in enumerate(parcalar):
+            veri = ("[" if i == 0 else ",") + json.dumps(parca)
+            if i == len(parcalar) - 1:
+                veri += "]"
+            elif self.sunucu.gecikme:
+                time.sleep(self.sunucu.gecikme / len(parcalar))
+            self.wfile.write(veri.encode())
+            self.wfile.flush()
+            toplam += len(veri)
+        self.sunucu.say("gemini", toplam)
+        self.close_connection = True
+
+    do_GET = _isle
+    do_POST = _isle
+
+
+class KiyaslamaSunucusu:
+    def __init__(self, port=0, gecikme_ms=0):
+        self.gecikme = gecikme_ms / 1000
+        self.istekler, self.baytlar = Counter(), Counter()
+        self._kilit = threading.Lock()
+        isleyici = type("Isleyici", (_Isleyici,), {"sunucu": self})
+        self._http = ThreadingHTTPServer(("127.0.0.1", port), isleyici)
+        self._http.daemon_threads = True
+        self.adres = f"http://127.0.0.1:{self._http.server_port}"
+
+    def say(self, uc, bayt):
+        with self._kilit:
+            self.istekler[uc] += 1
+            self.baytlar[uc] += bayt
+
+    def sayac(self):
+        with self._kilit:
+            return {"istek": dict(self.istekler), "bayt": dict(self.baytlar)}
+
+    def ortam(self):
+        # Uygulamanın ve yardımcı modüllerin bu sunucuya gitmesi için ortam değişkenleri
+        return {
+            "OPEN_METEO_GEOCODING_URL": f"{self.adres}/v1/search",
+            "OPEN_METEO_TAHMIN_URL": f"{self.adres}/v1/forecast",
+            "OPEN_METEO_ARSIV_URL": f"{self.adres}/v1/archive",
+            "GEMINI_API_URL": self.adres,
+        }
+
+    def baslat(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True, name="kiyaslama-sunucusu").start()
+        return self
+
+    def durdur(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(description="Open-Meteo ve Gemini için yerel taklit sunucu.")
+    ayristirici.add_argument("--port", type=int, default=8765)
+    ayristirici.add_argument("--gecikme-ms", type=float, default=0, help="her isteğe eklenen gecikme")
+    args = ayristirici.parse_args(argv)
+    sunucu = KiyaslamaSunucusu(args.port, args.gecikme_ms)
+    for ad, deger in sunucu.ortam().items():
+        print(f"export {ad}={deger}")
+    try:
+        sunucu._http.serve_forever()
+    except KeyboardInterrupt:
+        sunucu.durdur()
+
+
+if __name__ == "__main__":
+    main()
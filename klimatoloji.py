@@ -0,0 +1,148 @@
+# ================= KLİMATOLOJİ =================
+# 1991-2020 referans döneminden grid hücresi başına yılın her günü için
+# normaller (ortalama, yüzdelikler, ekstremler) çıkarılır ve hücre klasöründe
+# normaller.npz olarak saklanır. Seçilen aralık için anomali, yüzdelik sırası,
+# sıcak/soğuk hava dalgaları ve kurak gün serileri tek geçişte hesaplanır.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from arsiv_deposu import gun_no, gun_tarihi
+
+NORMAL_BASLANGIC = "1991-01-01"
+NORMAL_BITIS = "2020-12-31"
+PENCERE = 7  # her gün için ±7 günlük pencere birlikte değerlendiriliyor
+YUZDELIKLER = np.arange(0, 101, 5)  # 0 ve 100 = gözlenen en düşük/en yüksek
+SICAKLIKLAR = ["max", "min", "mean"]
+DALGA_SURESI = 3  # en az bu kadar ardışık gün eşik dışındaysa dalga sayılıyor
+KURAK_ESIK = 1.0  # mm, altındaki günler kurak
+
+_bellek = OrderedDict()  # hücre yolu -> normaller
+_bellek_kilidi = threading.Lock()
+_BELLEK_BOYUTU = 64
+
+
+def gun_indeksi(gunler):
+    # Epoch günlerini artık yıl takvimine göre 0-365 indeksine çevirir (29 Şubat = 59)
+    tarihler = pd.to_datetime(np.asarray(gunler, dtype=np.int64), unit="D")
+    indeks = tarihler.dayofyear.to_numpy() - 1
+    artik_degil = ~tarihler.is_leap_year
+    return indeks + ((indeks >= 59) & artik_degil)
+
+
+def normalleri_hesapla(df, gunler):
+    yillar = pd.to_datetime(gunler, unit="D").year.to_numpy()
+    yil_no = yillar - yillar.min()
+    indeks = gun_indeksi(gunler)
+    normaller = {}
+    for ad in SICAKLIKLAR + ["yagis"]:
+        matris = np.full((yil_no.max() + 1, 366), np.nan, dtype=np.float32)
+        matris[yil_no, indeks] = df[ad].to_numpy()
+        # (2*PENCERE+1, yıl, 366) -> her gün için komşu günlerin tüm yıllardaki değerleri
+        pencere = np.stack([np.roll(matris, k, axis=1) for k in range(-PENCERE, PENCERE + 1)])
+        pencere = pencere.reshape(-1, 366)
+        normaller[f"{ad}_ort"] = np.nanmean(pencere, axis=0).astype(np.float32)
+        if ad in SICAKLIKLAR:
+            normaller[f"{ad}_yuzdelik"] = np.nanpercentile(pencere, YUZDELIKLER, axis=0).astype(np.float32)
+    return normaller
+
+
+def normalleri_getir(depo, veri_cek):
+    # Önce bellek, sonra hücre klasöründeki normaller.npz; ikisi de yoksa referans dönemi
+    # veri_cek(lat, lon, baslangic, bitis) ile depoya alınıp normaller hesaplanır
+    yol = os.path.join(depo.yol, "normaller.npz")
+    with _bellek_kilidi:
+        if depo.yol in _bellek:
+            _bellek.move_to_end(depo.yol)
+            return _bellek[depo.yol]
+
+    try:
+        with np.load(yol) as dosya:
+            normaller = dict(dosya)
+    except FileNotFoundError:
+        df = veri_cek(depo.lat, depo.lon, NORMAL_BASLANGIC, NORMAL_BITIS)
+        normaller = normalleri_hesapla(df, np.arange(gun_no(NORMAL_BASLANGIC), gun_no(NORMAL_BITIS) + 1))
+        os.makedirs(depo.yol, exist_ok=True)
+        gecici = yol + ".tmp.npz"
+        np.savez(gecici, **normaller)
+        os.replace(gecici, yol)
+
+    with _bellek_kilidi:
+        _bellek[depo.yol] = normaller
+        while len(_bellek) > _BELLEK_BOYUTU:
+            _bellek.popitem(last=False)
+    return normaller
+
+
+def yuzdelik_sirasi(degerler, esikler):
+    # esikler: (len(YUZDELIKLER), n). Her değerin kendi gününün dağılımındaki yüzdelik sırası (0-100)
+    k = np.clip((degerler[None, :] > esikler).sum(axis=0), 1, len(YUZDELIKLER) - 1)
+    sutun = np.arange(len(degerler))
+    alt, ust = esikler[k - 1, sutun], esikler[k, sutun]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        oran = np.clip(np.where(ust > alt, (degerler - alt) / (ust - alt), 0.5), 0, 1)
+    sira = YUZDELIKLER[k - 1] + oran * (YUZDELIKLER[1] - YUZDELIKLER[0])
+    return np.where(np.isnan(degerler), np.nan, sira)
+
+
+def _seri_uzunluklari(maske):
+    # Her günün içinde bulunduğu ardışık True serisinin toplam uzunluğu (False için 0)
+    baslar = maske & ~np.concatenate(([False], maske[:-1]))
+    seri_no = np.cumsum(baslar) * maske
+    return np.bincount(seri_no)[seri_no] * maske
+
+
+def _suregelen_seri(maske):
+    # O güne kadar süren ardışık True sayısı
+    toplam = np.cumsum(maske)
+    sifirla = np.maximum.accumulate(np.where(~maske, toplam, 0))
+    return toplam - sifirla
+
+
+def anomali_analizi(depo, baslangic, bitis, normaller):
+    df = depo.oku(baslangic, bitis)
+    indeks = gun_indeksi(np.arange(gun_no(baslangic), gun_no(bitis) + 1))
+
+    df["normal_max"] = normaller["max_ort"][indeks]
+    df["normal_min"] = normaller["min_ort"][indeks]
+    df["anomali"] = df["mean"].to_numpy() - normaller["mean_ort"][indeks]
+    df["yuzdelik"] = yuzdelik_sirasi(df["mean"].to_numpy(), normaller["mean_yuzdelik"][:, indeks])
+
+    p90 = normaller["max_yuzdelik"][np.searchsorted(YUZDELIKLER, 90), indeks]
+    p10 = normaller["min_yuzdelik"][np.searchsorted(YUZDELIKLER, 10), indeks]
+    sicak_dalga = _seri_uzunluklari(df["max"].to_numpy() > p90) >= DALGA_SURESI
+    soguk_dalga = _seri_uzunluklari(df["min"].to_numpy() < p10) >= DALGA_SURESI
+    kurak = _suregelen_seri(df["yagis"].to_numpy() < KURAK_ESIK)
+    df["sicak_dalga"] = sicak_dalga
+    df["soguk_dalga"] = soguk_dalga
+    df["kurak_seri"] = kurak
+
+    normal_yagis = float(np.nansum(normaller["yagis_ort"][indeks]))
+    en_uzun_kurak = int(kurak.max()) if len(kurak) else 0
+    bitis_gunu = gun_tarihi(gun_no(baslangic) + int(np.argmax(kurak))) if en_uzun_kurak else None
+    ozet = {
+        "ort_anomali": float(np.nanmean(df["anomali"])),
+        "ort_yuzdelik": float(np.nanmean(df["yuzdelik"])),
+        "sicak_dalga_gun": int(sicak_dalga.sum()),
+        "sicak_dalga_sayisi": int((sicak_dalga & ~np.concatenate(([False], sicak_dalga[:-1]))).sum()),
+        "soguk_dalga_gun": int(soguk_dalga.sum()),
+        "soguk_dalga_sayisi": int((soguk_dalga & ~np.concatenate(([False], soguk_dalga[:-1]))).sum()),
+        "en_uzun_kurak": en_uzun_kurak,
+        "en_uzun_kurak_bitis": bitis_gunu,
+        "yagis_normale_orani": float(np.nansum(df["yagis"]) / normal_yagis * 100) if normal_yagis > 0 else float("nan"),
+    }
+    return df, ozet
+
+
+def ozet_istatistikleri(df):
+    # Arayüzdeki metrik kartlarıyla toplu analizin paylaştığı dönem özeti
+    return {
+        "ortalama": float(df["max"].mean()),
+        "en_yuksek": float(df["max"].max()),
+        "en_dusuk": float(df["min"].min()),
+        "toplam_yagis": float(df["yagis"].sum()),
+    }
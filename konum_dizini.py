@@ -0,0 +1,160 @@
+# ================= KONUM DİZİNİ =================
+# Şehir adlarını ağ isteği yapmadan koordinata çeviren yerel dizin.
+#   - konumlar.tsv (81 il merkezi) ve Geocoding API'den gelip sonradan eklenen
+#     kayıtlar (KONUM_DIZINI_KLASORU/eklenenler.tsv) açılışta yükleniyor.
+#   - Adlar Türkçe kurallarıyla katlanıyor: "Diyarbakır", "diyarbakir" ve
+#     "DIYARBAKIR " aynı anahtara düşüyor.
+#   - Anahtarlar sıralı bir dizide tutuluyor; ön ek araması bisect ile yapılıyor.
+#   - Birden fazla eşleşme tam eşleşme > ön ek, sonra nüfusa göre sıralanıyor.
+
+import bisect
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+TOHUM_DOSYASI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "konumlar.tsv")
+DIZIN_KLASORU = os.environ.get("KONUM_DIZINI_KLASORU", ".konum_dizini")
+SUTUNLAR = ["ad", "ulke", "bolge", "lat", "lon", "nufus", "takma_adlar"]
+BULUNAMADI_SURESI = 3600  # sn; bulunamayan isimler bu süre boyunca tekrar sorgulanmıyor
+BULUNAMADI_SAYISI = 1024  # en fazla bu kadar bulunamayan isim tutuluyor
+
+_TURKCE_BUYUK = str.maketrans({"İ": "i", "I": "ı"})
+_SADELE = str.maketrans("ıçğöşüâîû", "icgosuaiu")
+
+
+def katla(metin):
+    # Büyük/küçük harf ve aksan farklarını yok sayan arama anahtarı
+    metin = metin.translate(_TURKCE_BUYUK).lower().translate(_SADELE)
+    if not metin.isascii():
+        metin = "".join(c for c in unicodedata.normalize("NFKD", metin) if not unicodedata.combining(c))
+    return " ".join(metin.split())
+
+
+class Konum(namedtuple("Konum", SUTUNLAR)):
+    __slots__ = ()
+
+    @property
+    def etiket(self):
+        return f"{self.ad}, {self.ulke}" if self.ulke else self.ad
+
+    @property
+    def tam_etiket(self):
+        # Aynı ülkedeki aynı adlı yerleri ayırmak için bölge de ekleniyor ("Ankara, Ankara, Türkiye" değil)
+        bolge = self.bolge if self.bolge and katla(self.bolge) != katla(self.ad) else ""
+        return ", ".join(p for p in (self.ad, bolge, self.ulke) if p)
+
+
+def _satir_oku(satir):
+    p = satir.rstrip("\n").split("\t")
+    p += [""] * (len(SUTUNLAR) - len(p))
+    return Konum(p[0], p[1], p[2], float(p[3]), float(p[4]), int(p[5] or 0), p[6])
+
+
+def _satir_yaz(konum):
+    return "\t".join(str(d) for d in konum) + "\n"
+
+
+def _sorguyu_ayir(sorgu):
+    # "Diyarbakır, Türkiye" -> ("diyarbakir", "turkiye")
+    ad, _, ek = sorgu.partition(",")
+    return katla(ad), katla(ek)
+
+
+class KonumDizini:
+    def __init__(self, tohum=TOHUM_DOSYASI, klasor=DIZIN_KLASORU):
+        self.ek_dosya = os.path.join(klasor, "eklenenler.tsv")
+        self._kayitlar = []
+        self._anahtarlar = []  # sıralı (katlanmış ad, kayıt no)
+        self._bilinenler = set()
+        self._bulunamayanlar = OrderedDict()  # katlanmış ad -> zaman, eskiden yeniye
+        self._kilit = threading.Lock()
+        for yol in (tohum, self.ek_dosya):
+            try:
+                with open(yol, encoding="utf-8") as f:
+                    next(f, None)  # başlık
+                    for satir in f:
+                        if satir.strip():
+                            self._dizine_ekle(_satir_oku(satir))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self._kayitlar)
+
+    def _dizine_ekle(self, konum):
+        kimlik = (katla(konum.ad), katla(konum.ulke), round(konum.lat, 2), round(konum.lon, 2))
+        if kimlik in self._bilinenler:
+            return False
+        self._bilinenler.add(kimlik)
+        no = len(self._kayitlar)
+        self._kayitlar.append(konum)
+        for ad in [konum.ad] + [t for t in konum.takma_adlar.split(",") if t]:
+            bisect.insort(self._anahtarlar, (katla(ad), no))
+        return True
+
+    def ara(self, sorgu, limit=8):
+        # Ön eki sorguya uyan kayıtlar, en iyi eşleşme başta
+        ad, ek = _sorguyu_ayir(sorgu)
+        if not ad:
+            return []
+        bulunanlar = {}
+        with self._kilit:
+            i = bisect.bisect_left(self._anahtarlar, (ad,))
+            while i < len(self._anahtarlar) and self._anahtarlar[i][0].startswith(ad):
+                anahtar, no = self._anahtarlar[i]
+                konum = self._kayitlar[no]
+                if not ek or katla(konum.ulke).startswith(ek) or katla(konum.bolge).startswith(ek):
+                    bulunanlar[no] = bulunanlar.get(no, False) or anahtar == ad
+                i += 1
+        sirali = sorted(bulunanlar, key=lambda no: (not bulunanlar[no], -self._kayitlar[no].nufus, self._kayitlar[no].ad))
+        return [self._kayitlar[no] for no in sirali[:limit]]
+
+    def bul(self, sorgu):
+        # Adı (veya takma adı) tam eşleşen en iyi kayıt; yoksa None
+        ad, _ = _sorguyu_ayir(sorgu)
+        for konum in self.ara(sorgu, limit=1):
+            if ad in [katla(konum.ad)] + [katla(t) for t in konum.takma_adlar.split(",") if t]:
+                return konum
+        return None
+
+    def ekle(self, konumlar):
+        # Ağdan gelen sonuçları dizine ve diske ekler
+        with self._kilit:
+            yeniler = [k for k in konumlar if self._dizine_ekle(k)]
+            if not yeniler:
+                return
+            os.makedirs(os.path.dirname(self.ek_dosya) or ".", exist_ok=True)
+            yeni_dosya = not os.path.exists(self.ek_dosya)
+            with open(self.ek_dosya, "a", encoding="utf-8") as f:
+                if yeni_dosya:
+                    f.write("\t".join(SUTUNLAR) + "\n")
+                f.writelines(_satir_yaz(k) for k in yeniler)
+
+    def bulunamadi(self, sorgu):
+        simdi = time.time()
+        with self._kilit:
+            self._bulunamayanlar[katla(sorgu)] = simdi
+            self._bulunamayanlar.move_to_end(katla(sorgu))
+            # Süresi dolanlar baştan atılıyor, sayı sınırı aşılırsa en eskiler de
+            while self._bulunamayanlar and (len(self._bulunamayanlar) > BULUNAMADI_SAYISI
+                                            or simdi - next(iter(self._bulunamayanlar.values())) >= BULUNAMADI_SURESI):
+                self._bulunamayanlar.popitem(last=False)
+
+    def bulunamadi_mi(self, sorgu):
+        zaman = self._bulunamayanlar.get(katla(sorgu))
+        return zaman is not None and time.time() - zaman < BULUNAMADI_SURESI
+
+
+_dizin = None
+_dizin_kilidi = threading.Lock()
+
+
+def konum_dizini():
+    # Süreç başına tek dizin; ilk çağrıda yükleniyor
+    global _dizin
+    with _dizin_kilidi:
+        if _dizin is None:
+            _dizin = KonumDizini()
+        return _dizin
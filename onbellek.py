@@ -0,0 +1,102 @@
+# ================= ZAMAN AYARLI ÖNBELLEK =================
+# Open-Meteo modelleri belirli aralıklarla güncelleniyor (anlık veri 15 dk,
+# tahmin saatlik). Kayıtlar bir sonraki güncelleme sınırında bayatlar; bayat
+# kayıt bir periyot daha hemen döndürülür ve arka planda yenilenir. Daha eski
+# kayıtlar beklenerek yeniden çekilir. Boyut LRU ile sınırlı.
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import izleme
+from eszamanli import doldurma_arka_planda
+
+CEYREK_SAAT = 15 * 60
+SAAT = 60 * 60
+
+# Streamlit her yenilemede app.py'yi baştan çalıştırıp fonksiyonları yeniden
+# tanımladığı için kayıtlar fonksiyon adına göre modül seviyesinde tutuluyor
+_durumlar = {}
+_durumlar_kilidi = threading.Lock()
+
+
+class _Durum:
+    def __init__(self):
+        self.kayitlar = OrderedDict()  # anahtar -> (değer, bitiş zamanı)
+        self.yenilenenler = set()
+        self.kilit = threading.Lock()
+        self.isabet = self.bayat = self.iska = 0
+
+
+def _durum(fonksiyon):
+    ad = f"{fonksiyon.__module__}.{fonksiyon.__qualname__}"
+    with _durumlar_kilidi:
+        return _durumlar.setdefault(ad, _Durum())
+
+
+def durumlar():
+    # Fonksiyon başına isabet/bayat/ıska sayıları ve kayıt sayısı
+    with _durumlar_kilidi:
+        kopya = dict(_durumlar)
+    return {ad: {"isabet": d.isabet, "bayat": d.bayat, "iska": d.iska, "kayit": len(d.kayitlar)} for ad, d in kopya.items()}
+
+
+izleme.kaynak_ekle("zamanli_onbellek", durumlar)
+
+
+def sonraki_sinir(zaman, periyot):
+    # zaman'dan sonraki ilk periyot katı (ör. 10:07 -> 10:15)
+    return (int(zaman) // periyot + 1) * periyot
+
+
+def zamanli_onbellek(periyot, max_boyut=256):
+    def dekorator(fonksiyon):
+        durum = _durum(fonksiyon)
+        kayitlar, yenilenenler, kilit = durum.kayitlar, durum.yenilenenler, durum.kilit
+
+        def yenile(anahtar, args, kwargs):
+            try:
+                deger = fonksiyon(*args, **kwargs)
+                with kilit:
+                    kayitlar[anahtar] = (deger, sonraki_sinir(time.time(), periyot))
+                    kayitlar.move_to_end(anahtar)
+                    while len(kayitlar) > max_boyut:
+                        kayitlar.popitem(last=False)
+                return deger
+            finally:
+                with kilit:
+                    yenilenenler.discard(anahtar)
+
+        @functools.wraps(fonksiyon)
+        def sarici(*args, **kwargs):
+            anahtar = (args, tuple(sorted(kwargs.items())))
+            simdi = time.time()
+            with kilit:
+                kayit = kayitlar.get(anahtar)
+                if kayit is not None:
+                    kayitlar.move_to_end(anahtar)
+                    deger, bitis = kayit
+                    if simdi < bitis:
+                        durum.isabet += 1
+                        return deger
+                    if simdi < bitis + periyot:
+                        # Bayat ama tolerans içinde: hemen döndür, arka planda yenile
+                        durum.bayat += 1
+                        if anahtar not in yenilenenler:
+                            yenilenenler.add(anahtar)
+                            doldurma_arka_planda(yenile, anahtar, args, kwargs)
+                        return deger
+                durum.iska += 1
+                yenilenenler.add(anahtar)
+            return yenile(anahtar, args, kwargs)
+
+        def temizle():
+            with kilit:
+                kayitlar.clear()
+
+        sarici.durum = durum
+        sarici.temizle = temizle
+        return sarici
+
+    return dekorator
@@ -0,0 +1,195 @@
+# ================= RAPOR ÖNBELLEĞİ =================
+# Gemini raporları diskte, prompt metni yerine girdilerin normalize edilmiş
+# parmak iziyle (konum, dönem, yuvarlanmış istatistikler) saklanıyor. Böylece
+# yeniden başlatmalar ve eşdeğer istekler LLM çağrısı yapmadan cevaplanıyor.
+# Üretilmekte olan rapor akışları da süreç genelinde paylaşılıyor.
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import izleme
+from eszamanli import rapor_arka_planda
+
+RAPOR_KLASORU = os.environ.get("RAPOR_ONBELLEK_KLASORU", ".rapor_onbellegi")
+MAKS_BOYUT = 20 * 1024 * 1024  # bayt
+HATA_BEKLEME = 60  # başarısız üretim bu kadar saniye tekrar denenmez
+
+_akislar = {}
+_akislar_kilidi = threading.Lock()
+_yazma_kilidi = threading.Lock()
+
+
+def _normalize(deger):
+    if isinstance(deger, float):
+        return round(deger, 1)
+    if isinstance(deger, str):
+        return " ".join(deger.casefold().split())
+    if isinstance(deger, (list, tuple)):
+        return [_normalize(d) for d in deger]
+    if isinstance(deger, dict):
+        return {k: _normalize(v) for k, v in deger.items()}
+    if hasattr(deger, "isoformat"):
+        return deger.isoformat()
+    if hasattr(deger, "item"):  # numpy sayıları
+        return _normalize(deger.item())
+    return deger
+
+
+def parmak_izi(**girdiler):
+    metin = json.dumps(_normalize(girdiler), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(metin.encode("utf-8")).hexdigest()[:32]
+
+
+def _yol(parmak):
+    return os.path.join(RAPOR_KLASORU, parmak + ".json")
+
+
+def oku(parmak):
+    yol = _yol(parmak)
+    try:
+        with open(yol, encoding="utf-8") as f:
+            kayit = json.load(f)
+        metin, son_kullanma = kayit["metin"], kayit["son_kullanma"]
+        if not isinstance(metin, str):
+            raise TypeError("metin")
+        if son_kullanma < time.time():
+            return None
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        # Yarım kalmış ya da elle bozulmuş kayıt ıska sayılıyor ve siliniyor
+        try:
+            os.remove(yol)
+        except FileNotFoundError:
+            pass
+        return None
+    return metin
+
+
+def yaz(parmak, metin, ttl):
+    os.makedirs(RAPOR_KLASORU, exist_ok=True)
+    gecici = _yol(parmak) + ".tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump({"metin": metin, "son_kullanma": time.time() + ttl}, f, ensure_ascii=False)
+    os.replace(gecici, _yol(parmak))
+    _buda()
+
+
+def _buda():
+    # Süresi dolanları sil, toplam boyut sınırı aşılıyorsa en eski dosyalardan başlayarak sil
+    with _yazma_kilidi:
+        dosyalar = []
+        for ad in os.listdir(RAPOR_KLASORU):
+            if not ad.endswith(".json"):
+                continue
+            yol = os.path.join(RAPOR_KLASORU, ad)
+            try:
+                bilgi = os.stat(yol)
+            except FileNotFoundError:
+                continue
+            dosyalar.append((bilgi.st_mtime, bilgi.st_size, yol))
+
+        toplam = sum(boyut for _, boyut, _ in dosyalar)
+        for _, boyut, yol in sorted(dosyalar):
+            if toplam > MAKS_BOYUT or oku(os.path.basename(yol)[:-5]) is None:
+                try:
+                    os.remove(yol)
+                except FileNotFoundError:
+                    pass
+                toplam -= boyut
+
+
+class AkisTamponu:
+    # Arka planda tüketilen bir metin üretecini tamponlar; parcalar() ile
+    # istenildiği kadar (farklı oturumlardan da) baştan okunabilir.
+    def __init__(self):
+        self._parcalar = []
+        self.bitti = False
+        self.hata = False
+        self.bitis_zamani = None
+        self._kosul = threading.Condition()
+
+    def _ekle(self, parca):
+        with self._kosul:
+            self._parcalar.append(parca)
+            self._kosul.notify_all()
+
+    def _bitir(self, hata):
+        with self._kosul:
+            self.bitti, self.hata, self.bitis_zamani = True, hata, time.time()
+            self._kosul.notify_all()
+
+    def parcalar(self):
+        i = 0
+        while True:
+            with self._kosul:
+                while i >= len(self._parcalar) and not self.bitti:
+                    self._kosul.wait()
+                yeni = self._parcalar[i:]
+                bitti = self.bitti
+            yield from yeni
+            i += len(yeni)
+            if bitti and i >= len(self._parcalar):
+                return
+
+    def metin(self):
+        return "".join(self.parcalar())
+
+
+def _eski_hatalari_at(simdi):
+    # Bekleme süresi dolan başarısız akışlar sözlükte birikmesin; _akislar_kilidi altında çağrılıyor
+    for parmak in [p for p, t in _akislar.items() if t.hata and simdi - t.bitis_zamani > HATA_BEKLEME]:
+        del _akislar[parmak]
+
+
+def rapor_akisi(parmak, uretec_fabrikasi, ttl):
+    # Aynı parmak izi için üretim sürüyorsa ona bağlanır, yoksa arka planda başlatır.
+    # Başarısız üretim HATA_BEKLEME boyunca paylaşılıyor, sonra yeniden deneniyor.
+    # uretec_fabrikasi() (parça, hata_mi) ikilileri üreten bir üreteç döndürmeli.
+    with _akislar_kilidi:
+        _eski_hatalari_at(time.time())
+        tampon = _akislar.get(parmak)
+        if tampon is not None:
+            izleme.say("rapor", "paylasilan")
+            return tampon
+        tampon = AkisTamponu()
+        metin = oku(parmak)
+        if metin is not None:
+            # Bu arada başka bir üretim bitip diske yazılmış olabilir
+            izleme.say("rapor", "isabet")
+            tampon._ekle(metin)
+            tampon._bitir(False)
+            return tampon
+        izleme.say("rapor", "iska")
+        _akislar[parmak] = tampon
+
+    def tuket():
+        hata = True
+        bas = time.perf_counter()
+        try:
+            hatali_parca = False
+            for parca, parca_hata in uretec_fabrikasi():
+                if not tampon._parcalar:
+                    izleme.kaydet("rapor · ilk parça", (time.perf_counter() - bas) * 1000)
+                hatali_parca = hatali_parca or parca_hata
+                tampon._ekle(parca)
+            hata = hatali_parca
+            izleme.kaydet("rapor · üretim", (time.perf_counter() - bas) * 1000)
+            izleme.boyut("rapor · metin", sum(len(p.encode("utf-8")) for p in tampon._parcalar))
+            if not hata:
+                yaz(parmak, "".join(tampon._parcalar), ttl)
+        finally:
+            if hata:
+                izleme.say("rapor", "hata")
+            tampon._bitir(hata)
+            if not hata:
+                # Diskte olduğu için artık tampona gerek yok
+                with _akislar_kilidi:
+                    if _akislar.get(parmak) is tampon:
+                        del _akislar[parmak]
+
+    rapor_arka_planda(tuket)
+    return tampon
@@ -0,0 +1,189 @@
+# ================= SAATLİK VERİ =================
+# Saatlik arşiv verisi de günlük depo ile aynı grid hücresi klasöründe,
+# saatlik/ alt klasöründe tutulur. Her değişken ayrı bir float32 sütun
+# dosyası (<değişken>.npy, yerel saat sırasıyla); kapsam gün bazında.
+# Çok yıllık aralıklar hiçbir zaman tamamen belleğe alınmaz: özetler memmap
+# üzerinden yıllık parçalar halinde, (gün, 24) şekline getirilerek vektörel
+# hesaplanır. Oturumda sadece özet tablolar tutulur.
+
+import datetime
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from arsiv_deposu import DEPO_KLASORU, KESINLESME_GUNU, ArsivDeposu, _atomik_kaydet, _kilit, gun_no
+
+SAATLIK_DEGISKENLER = ["sicaklik", "nem", "yagis", "ruzgar", "hamle"]
+ISLAK_SAAT_ESIGI = 0.1  # mm/saat, üstündeki saatler yağışlı sayılıyor
+PARCA_GUN = 366  # özetler bu kadar günlük parçalarla hesaplanıyor
+
+
+class SaatlikDepo(ArsivDeposu):
+    # Kapsam ve eksik aralık hesabı günlük depodakiyle aynı, sadece dosyalar farklı
+    def __init__(self, lat, lon, klasor=DEPO_KLASORU):
+        super().__init__(lat, lon, klasor)
+        self.saat_yolu = os.path.join(self.yol, "saatlik")
+        self._meta_yolu = os.path.join(self.saat_yolu, "meta.json")
+        self._kapsam_yolu = os.path.join(self.saat_yolu, "kapsam.npy")
+        self._kilit_yolu = self.saat_yolu
+
+    def _sutun_yolu(self, ad):
+        return os.path.join(self.saat_yolu, f"{ad}.npy")
+
+    def surum(self):
+        # Depo her yazıldığında değişir; özet önbelleklerinin anahtarında kullanılıyor
+        try:
+            return os.stat(self._meta_yolu).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def yaz(self, ilk_gun, degerler, utc_offset):
+        # degerler: (gün_sayısı * 24, len(SAATLIK_DEGISKENLER)), ilk satır ilk_gun'ün 00:00'ı
+        degerler = np.asarray(degerler, dtype=np.float32)
+        gun_sayisi = len(degerler) // 24
+        degerler = degerler[:gun_sayisi * 24]
+        son_gun = ilk_gun + gun_sayisi - 1
+        bugun = gun_no(datetime.date.today())
+        gunler = np.arange(ilk_gun, son_gun + 1)
+        bos_gun = np.isnan(degerler).all(axis=1).reshape(gun_sayisi, 24).all(axis=1)
+        yeni_kapsam = (gunler <= bugun - KESINLESME_GUNU) | ~bos_gun
+
+        with _kilit(self._kilit_yolu):
+            os.makedirs(self.saat_yolu, exist_ok=True)
+            meta, kapsam = self._kapsam()
+            if meta is not None:
+                ilk = meta["ilk_gun"]
+                if ilk <= ilk_gun and son_gun < ilk + len(kapsam):
+                    # Mevcut sütunların içine sığıyor, yerinde güncelle
+                    kapsam = np.load(self._kapsam_yolu, mmap_mode="r+")
+                    for i, ad in enumerate(SAATLIK_DEGISKENLER):
+                        sutun = np.load(self._sutun_yolu(ad), mmap_mode="r+")
+                        sutun[(ilk_gun - ilk) * 24:(son_gun - ilk + 1) * 24] = degerler[:, i]
+                        sutun.flush()
+                    kapsam[ilk_gun - ilk:son_gun - ilk + 1] |= yeni_kapsam
+                    kapsam.flush()
+                    return
+                yeni_ilk = min(ilk, ilk_gun)
+                yeni_son = max(ilk + len(kapsam) - 1, son_gun)
+                utc_offset = meta["utc_offset"]
+            else:
+                ilk, yeni_ilk, yeni_son = ilk_gun, ilk_gun, son_gun
+
+            # Aralık genişliyor: sütunları birleşim aralığıyla (tek tek) yeniden oluştur
+            for i, ad in enumerate(SAATLIK_DEGISKENLER):
+                tum = np.full((yeni_son - yeni_ilk + 1) * 24, np.nan, dtype=np.float32)
+                if meta is not None:
+                    eski = np.load(self._sutun_yolu(ad), mmap_mode="r")
+                    tum[(ilk - yeni_ilk) * 24:(ilk - yeni_ilk) * 24 + len(eski)] = eski
+                    del eski
+                tum[(ilk_gun - yeni_ilk) * 24:(son_gun - yeni_ilk + 1) * 24] = degerler[:, i]
+                _atomik_kaydet(self._sutun_yolu(ad), tum)
+            tum_kapsam = np.zeros(yeni_son - yeni_ilk + 1, dtype=bool)
+            if meta is not None:
+                tum_kapsam[ilk - yeni_ilk:ilk - yeni_ilk + len(kapsam)] = kapsam
+                del kapsam
+            tum_kapsam[ilk_gun - yeni_ilk:son_gun - yeni_ilk + 1] |= yeni_kapsam
+            _atomik_kaydet(self._kapsam_yolu, tum_kapsam)
+            with open(self._meta_yolu + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"ilk_gun": int(yeni_ilk), "utc_offset": int(utc_offset),
+                           "lat": self.lat, "lon": self.lon}, f)
+            os.replace(self._meta_yolu + ".tmp", self._meta_yolu)
+
+    def parcalar(self, baslangic, bitis, adlar=SAATLIK_DEGISKENLER, parca_gun=PARCA_GUN):
+        # [baslangic, bitis] aralığını parca_gun'lük dilimlerle (ilk_gun, {ad: (gün, 24)}) olarak üretir
+        bas, bit = gun_no(baslangic), gun_no(bitis)
+        # Meta ve sütunlar kilit altında birlikte açılıyor: aralık genişlerken sütunlar tek tek
+        # yeni dosyalarla değiştiği için açık memmap'ler tutarlı bir anlık görüntü olarak kalıyor.
+        # Kilit üretecin ömrü boyunca tutulmuyor.
+        with _kilit(self._kilit_yolu):
+            meta = self._meta()
+            sutunlar = {ad: np.load(self._sutun_yolu(ad), mmap_mode="r") for ad in adlar} if meta is not None else {}
+        for p_bas in range(bas, bit + 1, parca_gun):
+            p_bit = min(p_bas + parca_gun - 1, bit)
+            dilimler = {}
+            for ad in adlar:
+                dilim = np.full((p_bit - p_bas + 1) * 24, np.nan, dtype=np.float32)
+                if ad in sutunlar:
+                    ilk = meta["ilk_gun"]
+                    i0, i1 = max(p_bas, ilk), min(p_bit, ilk + len(sutunlar[ad]) // 24 - 1)
+                    if i0 <= i1:
+                        dilim[(i0 - p_bas) * 24:(i1 - p_bas + 1) * 24] = sutunlar[ad][(i0 - ilk) * 24:(i1 - ilk + 1) * 24]
+                dilimler[ad] = dilim.reshape(-1, 24)
+            yield p_bas, dilimler
+
+    def oku(self, baslangic, bitis):
+        # Kısa aralıklar için saatlik DataFrame (yerel saat); uzun aralıklarda özet fonksiyonları kullanılmalı
+        parcalar = [p for _, p in self.parcalar(baslangic, bitis)]
+        data = {"date": pd.date_range(str(baslangic), periods=(gun_no(bitis) - gun_no(baslangic) + 1) * 24, freq="h")}
+        for ad in SAATLIK_DEGISKENLER:
+            data[ad] = np.concatenate([p[ad].ravel() for p in parcalar])
+        return pd.DataFrame(data)
+
+
+def _nan_argmax(dizi):
+    # Satır bazında argmax; tamamı NaN satırlar için -1
+    bos = np.isnan(dizi).all(axis=1)
+    return np.where(bos, -1, np.argmax(np.where(np.isnan(dizi), -np.inf, dizi), axis=1))
+
+
+def gunluk_ozet(depo, baslangic, bitis):
+    # Saatlik veriden gün başına özet: günlük genlik, yağışlı saat, yağış şiddeti, en güçlü hamlenin saati
+    tablolar = []
+    # Tamamı boş günlerde nanmean/nanmax uyarı veriyor, sonuç zaten NaN
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for ilk_gun, p in depo.parcalar(baslangic, bitis):
+            sicaklik, yagis, hamle = p["sicaklik"], p["yagis"], p["hamle"]
+            en_yuksek, en_dusuk = np.nanmax(sicaklik, axis=1), np.nanmin(sicaklik, axis=1)
+            tablolar.append(pd.DataFrame({
+                "date": pd.to_datetime(np.arange(ilk_gun, ilk_gun + len(sicaklik)), unit="D"),
+                "sicaklik_max": en_yuksek,
+                "sicaklik_min": en_dusuk,
+                "sicaklik_ort": np.nanmean(sicaklik, axis=1),
+                "genlik": en_yuksek - en_dusuk,
+                "yagis": np.where(np.isnan(yagis).all(axis=1), np.nan, np.nansum(yagis, axis=1)),
+                "islak_saat": (yagis >= ISLAK_SAAT_ESIGI).sum(axis=1),
+                "yagis_siddeti": np.nanmax(yagis, axis=1),
+                "nem_ort": np.nanmean(p["nem"], axis=1),
+                "ruzgar_ort": np.nanmean(p["ruzgar"], axis=1),
+                "hamle_max": np.nanmax(hamle, axis=1),
+                "hamle_saati": _nan_argmax(hamle),
+            }))
+    return pd.concat(tablolar, ignore_index=True)
+
+
+def yeniden_ornekle(gunluk, kural):
+    # Günlük özetten haftalık ("W-MON") veya aylık ("MS") tablo; "D" verilirse aynen döner
+    if kural == "D":
+        return gunluk
+    gunluk = gunluk.set_index("date")
+    gruplar = gunluk.resample(kural, label="left", closed="left")
+    tablo = gruplar.agg({
+        "sicaklik_max": "max", "sicaklik_min": "min", "sicaklik_ort": "mean", "genlik": "mean",
+        "yagis": "sum", "islak_saat": "sum", "yagis_siddeti": "max",
+        "nem_ort": "mean", "ruzgar_ort": "mean", "hamle_max": "max",
+    })
+    tablo["yagis"] = tablo["yagis"].where(gruplar["yagis"].count() > 0)
+    # Dönemin en güçlü hamlesinin saati
+    en_guclu_gun = gunluk["hamle_max"].fillna(-np.inf).groupby(pd.Grouper(freq=kural, label="left", closed="left")).idxmax()
+    tablo["hamle_saati"] = gunluk["hamle_saati"].reindex(en_guclu_gun).to_numpy()
+    return tablo.reset_index()
+
+
+def gunici_dongu(depo, baslangic, bitis, ad, aylara_gore=False):
+    # Gün içi döngü: saat başına ortalama (24,), aylara_gore ise (12, 24)
+    toplam = np.zeros((12, 24))
+    adet = np.zeros((12, 24))
+    for ilk_gun, p in depo.parcalar(baslangic, bitis, adlar=[ad]):
+        dizi = p[ad]
+        aylar = pd.to_datetime(np.arange(ilk_gun, ilk_gun + len(dizi)), unit="D").month.to_numpy() - 1
+        gecerli = ~np.isnan(dizi)
+        np.add.at(toplam, aylar, np.where(gecerli, dizi, 0.0))
+        np.add.at(adet, aylar, gecerli)
+    if not aylara_gore:
+        toplam, adet = toplam.sum(axis=0), adet.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(adet > 0, toplam / adet, np.nan)
@@ -0,0 +1,192 @@
+# ================= TOPLU ANALİZ =================
+# Arayüz olmadan çok sayıda konumun geçmiş veya tahmin analizini yapar:
+#   python toplu_analiz.py izlenen_konumlar.csv --cikti sonuclar --isci 8
+# Girdi CSV'sinde her satır bir konum: "sehir" ya da "lat" + "lon" sütunu,
+# isteğe bağlı "kimlik", "baslangic" ve "bitis" (yoksa komut satırındaki dönem).
+# Sonuçlar iş bittikçe yazılıyor:
+#   - <cikti>/ozet.jsonl: konum başına bir satır (özet istatistikler veya hata),
+#   - <cikti>/veri/<kimlik>.parquet: günlük veri (konum, dönem ve birimler dosyanın metaverisinde),
+#   - --izleme verilirse aşama süreleri ve önbellek sayaçları (izleme.py) JSON olarak.
+# Aynı komut tekrar çalıştırılınca ozet.jsonl'de tamamlanmış görünen konumlar
+# atlanıyor, hatalı olanlar yeniden deneniyor.
+# İşler iş parçacıklarıyla yürütülüyor: süre ağda geçiyor ve hız sınırlayıcı,
+# tek uçuş ve arşiv deposu kilitleri süreç içinde paylaşılınca API limiti
+# tek yerden korunuyor.
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import izleme
+from arsiv_deposu import ArsivDeposu
+from disa_aktarma import ust_veri, yaz
+from klimatoloji import anomali_analizi, normalleri_getir, ozet_istatistikleri
+from turetilmis import donem_ozeti, turetilmis_ekle
+from veri_kaynaklari import gecmis_veri_cek_v2, koordinat_bul, tahmin_veri_cek
+
+ISCI_SAYISI = 8
+OZET_DOSYASI = "ozet.jsonl"
+
+
+def _kimlik(satir, mod):
+    # Girdide kimlik yoksa konum, dönem ve moddan türetiliyor; tekrar çalıştırmada aynı kalır
+    if satir.get("kimlik"):
+        return str(satir["kimlik"])
+    konum = satir.get("sehir") or f"{satir['lat']},{satir['lon']}"
+    metin = f"{mod}|{konum}|{satir.get('baslangic', '')}|{satir.get('bitis', '')}"
+    return hashlib.sha1(metin.encode("utf-8")).hexdigest()[:12]
+
+
+def isleri_oku(yol, mod, baslangic, bitis):
+    tablo = pd.read_csv(yol, dtype=str, keep_default_na=False)
+    if "sehir" not in tablo and not {"lat", "lon"} <= set(tablo.columns):
+        raise SystemExit("Girdi dosyasında 'sehir' ya da 'lat' ve 'lon' sütunları olmalı.")
+    isler = []
+    for satir in tablo.to_dict("records"):
+        satir = {k: v.strip() for k, v in satir.items() if v and v.strip()}
+        if mod == "gecmis":
+            satir.setdefault("baslangic", baslangic)
+            satir.setdefault("bitis", bitis)
+        satir["kimlik"] = _kimlik(satir, mod)
+        isler.append(satir)
+    return isler
+
+
+def tamamlananlar(cikti):
+    # Yarıda kesilmiş son satır (bozuk JSON) yok sayılıyor
+    biten = set()
+    try:
+        with open(os.path.join(cikti, OZET_DOSYASI), encoding="utf-8") as f:
+            for satir in f:
+                try:
+                    kayit = json.loads(satir)
+                except ValueError:
+                    continue
+                if kayit.get("durum") == "tamam":
+                    biten.add(kayit["kimlik"])
+    except FileNotFoundError:
+        pass
+    return biten
+
+
+def _json_uyumlu(deger):
+    if isinstance(deger, float) and math.isnan(deger):
+        return None
+    if isinstance(deger, dict):
+        return {k: _json_uyumlu(v) for k, v in deger.items()}
+    if hasattr(deger, "isoformat"):
+        return deger.isoformat()
+    return deger
+
+
+def konum_analizi(is_, mod, cikti, normaller=False):
+    # Tek konum; havuzdaki iş parçacığında çalışıyor, sonucu ozet.jsonl satırı olarak döndürür
+    if "sehir" in is_:
+        lat, lon, etiket = koordinat_bul(is_["sehir"])
+        if lat is None:
+            raise LookupError(f"Konum bulunamadı: {is_['sehir']}")
+    else:
+        lat, lon = float(is_["lat"]), float(is_["lon"])
+        etiket = f"{lat:.4f}, {lon:.4f}"
+
+    kayit = {"kimlik": is_["kimlik"], "mod": mod, "konum": etiket, "lat": lat, "lon": lon}
+    if mod == "gecmis":
+        baslangic, bitis = is_.get("baslangic"), is_.get("bitis")
+        if not baslangic or not bitis:
+            raise ValueError("Dönem belirtilmemiş (baslangic/bitis).")
+        baslangic = datetime.date.fromisoformat(baslangic).isoformat()
+        bitis = datetime.date.fromisoformat(bitis).isoformat()
+        df = gecmis_veri_cek_v2(lat, lon, baslangic, bitis)
+        if normaller:
+            depo = ArsivDeposu(lat, lon)
+            df, kayit["klima"] = anomali_analizi(depo, baslangic, bitis, normalleri_getir(depo, gecmis_veri_cek_v2))
+        df = turetilmis_ekle(df)
+        kayit.update(baslangic=baslangic, bitis=bitis, ozet={**ozet_istatistikleri(df), **donem_ozeti(df)})
+    else:
+        df = turetilmis_ekle(tahmin_veri_cek(lat, lon))
+        kayit["ozet"] = {
+            "en_yuksek": float(df["max"].max()),
+            "en_dusuk": float(df["min"].min()),
+            "yagis_ihtimal_maks": float(df["yagis_ihtimal"].max()),
+            "ruzgar_maks": float(df["ruzgar"].max()),
+        }
+
+    ust = ust_veri(df, etiket, lat, lon, kayit.get("baslangic"), kayit.get("bitis"), veri="Günlük geçmiş veri" if mod == "gecmis" else "7 günlük tahmin")
+    yaz(df, os.path.join(cikti, "veri", f"{is_['kimlik']}.parquet"), "parquet", ust)
+    kayit["gun"] = len(df)
+    return kayit
+
+
+def calistir(isler, mod, cikti, isci=ISCI_SAYISI, normaller=False, bildir=print):
+    os.makedirs(os.path.join(cikti, "veri"), exist_ok=True)
+    biten = tamamlananlar(cikti)
+    bekleyen = [is_ for is_ in isler if is_["kimlik"] not in biten]
+    bildir(f"{len(isler)} konum, {len(isler) - len(bekleyen)} tanesi daha önce tamamlanmış, {len(bekleyen)} iş kuyrukta.")
+
+    sayac = {"tamam": 0, "hata": 0}
+    basla = time.perf_counter()
+    with open(os.path.join(cikti, OZET_DOSYASI), "a", encoding="utf-8") as ozet, \
+            ThreadPoolExecutor(max_workers=isci, thread_name_prefix="toplu") as havuz:
+        gorevler = {havuz.submit(konum_analizi, is_, mod, cikti, normaller): is_ for is_ in bekleyen}
+        try:
+            for gorev in as_completed(gorevler):
+                girdi = gorevler[gorev]
+                try:
+                    kayit = {**gorev.result(), "durum": "tamam"}
+                except Exception as e:
+                    kayit = {"kimlik": girdi["kimlik"], "mod": mod, "konum": girdi.get("sehir") or f"{girdi.get('lat')},{girdi.get('lon')}",
+                             "durum": "hata", "hata": f"{type(e).__name__}: {e}"}
+                sayac[kayit["durum"]] += 1
+                # Satır yalnızca ana iş parçacığından yazılıyor; her satır hemen diske iniyor
+                ozet.write(json.dumps(_json_uyumlu(kayit), ensure_ascii=False) + "\n")
+                ozet.flush()
+
+                biten_sayi = sayac["tamam"] + sayac["hata"]
+                gecen = time.perf_counter() - basla
+                hiz = biten_sayi / gecen if gecen > 0 else 0.0
+                kalan = (len(bekleyen) - biten_sayi) / hiz if hiz > 0 else 0.0
+                durum = "tamam" if kayit["durum"] == "tamam" else f"HATA ({kayit['hata']})"
+                bildir(f"[{biten_sayi}/{len(bekleyen)}] {kayit['konum']}: {durum} | {hiz:.2f} konum/sn, kalan ~{kalan / 60:.1f} dk")
+        except KeyboardInterrupt:
+            # Yazılmış satırlar korunuyor; bir sonraki çalıştırma kalan işlerden devam eder
+            havuz.shutdown(wait=False, cancel_futures=True)
+            bildir("Durduruldu; tekrar çalıştırınca kalan konumlardan devam edilecek.")
+            raise
+
+    gecen = time.perf_counter() - basla
+    bildir(f"Bitti: {sayac['tamam']} tamam, {sayac['hata']} hata, {gecen:.1f} sn "
+        f"({(sayac['tamam'] + sayac['hata']) / gecen if gecen > 0 else 0.0:.2f} konum/sn).")
+    return sayac
+
+
+def main(argv=None):
+    bugun = datetime.date.today()
+    ayristirici = argparse.ArgumentParser(description="Konum listesi için toplu iklim analizi (Streamlit gerektirmez).")
+    ayristirici.add_argument("girdi", help="CSV: sehir veya lat+lon; isteğe bağlı kimlik, baslangic, bitis")
+    ayristirici.add_argument("--cikti", default="toplu_sonuclar", help="sonuç klasörü (varsayılan: toplu_sonuclar)")
+    ayristirici.add_argument("--mod", choices=["gecmis", "tahmin"], default="gecmis")
+    ayristirici.add_argument("--baslangic", default=(bugun - datetime.timedelta(days=365)).isoformat(), help="girdide dönem yoksa (YYYY-AA-GG)")
+    ayristirici.add_argument("--bitis", default=bugun.isoformat(), help="girdide dönem yoksa (YYYY-AA-GG)")
+    ayristirici.add_argument("--isci", type=int, default=ISCI_SAYISI, help=f"aynı anda işlenen konum (varsayılan: {ISCI_SAYISI})")
+    ayristirici.add_argument("--normaller", action="store_true", help="1991-2020 normallerine göre anomali özeti de ekle (konum başına 30 yıllık arşiv)")
+    ayristirici.add_argument("--izleme", help="aşama süreleri ve önbellek sayaçlarının yazılacağı JSON dosyası")
+    args = ayristirici.parse_args(argv)
+
+    isler = isleri_oku(args.girdi, args.mod, args.baslangic, args.bitis)
+    sayac = calistir(isler, args.mod, args.cikti, max(1, args.isci), args.normaller,
+                     bildir=lambda metin: print(metin, file=sys.stderr, flush=True))
+    if args.izleme:
+        izleme.disa_dok(args.izleme)
+    return 1 if sayac["hata"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
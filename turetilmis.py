@@ -0,0 +1,111 @@
+# ================= TÜRETİLMİŞ METRİKLER =================
+# Günlük veriden türetilen sütunlar ve sınıflandırmalar, satır döngüsü
+# olmadan tüm sütun üzerinde hesaplanıyor (7 günlük tahmin ile 70 yıllık
+# arşiv aynı kod yolundan geçiyor):
+#   - WMO hava durumu kodu -> ikon/durum: 0-99 arası hazır arama tablosu,
+#   - tahmin tavsiyesi: np.select ile öncelik sıralı koşullar,
+#   - derece-günler (büyüme, ısıtma, soğutma), donlu günler, rüzgar etkili
+#     hissedilen en düşük sıcaklık.
+# Sütunlar veri havuzuna girmeden önce bir kez eklenip veriyle birlikte saklanıyor.
+
+import numpy as np
+
+BUYUME_TABANI = 10.0  # °C, büyüme derece-günü tabanı
+ISITMA_TABANI = 18.0  # °C, altı ısıtma ihtiyacı
+SOGUTMA_TABANI = 22.0  # °C, üstü soğutma ihtiyacı
+RUZGAR_SOGUGU_SICAKLIK = 10.0  # °C, rüzgar soğuğu formülü bu sıcaklığın altında geçerli
+RUZGAR_SOGUGU_HIZ = 4.8  # km/h
+
+# (ilk kod, son kod, gündüz ikonu, gece ikonu, durum)
+_KOD_ARALIKLARI = [
+    (0, 0, "☀️", "🌙", "Açık"),
+    (1, 2, "🌤️", "☁️", "Parçalı Bulutlu"),
+    (3, 3, "☁️", "☁️", "Bulutlu"),
+    (45, 48, "☁️", "☁️", "Çok Bulutlu"),
+    (51, 55, "🌦️", "🌦️", "Hafif Yağmur"),
+    (56, 57, "🌨️", "🌨️", "Karla Karışık"),
+    (61, 65, "🌧️", "🌧️", "Yağmurlu"),
+    (66, 67, "🌨️", "🌨️", "Donan Yağmur"),
+    (71, 77, "❄️", "❄️", "Karlı"),
+    (80, 82, "☔", "☔", "Sağanak"),
+    (95, 99, "⛈️", "⛈️", "Gök Gürültülü"),
+]
+# Son eleman (indeks 100) tanımsız ve aralık dışı kodlar için
+IKON_GUNDUZ = np.full(101, "❓", dtype=object)
+IKON_GECE = np.full(101, "❓", dtype=object)
+DURUM = np.full(101, "Bilinmiyor", dtype=object)
+for _ilk, _son, _gunduz, _gece, _durum in _KOD_ARALIKLARI:
+    IKON_GUNDUZ[_ilk:_son + 1], IKON_GECE[_ilk:_son + 1], DURUM[_ilk:_son + 1] = _gunduz, _gece, _durum
+
+TAVSIYELER = np.array(["⚠️ Fırtına", "☔ Yağışlı", "🔥 Sıcak", "❄️ Soğuk", "🧥 Serin", "☀️ Güneşli"], dtype=object)
+TAVSIYE_DURUM = len(TAVSIYELER)  # hiçbiri uymazsa "☁️ <durum>"
+
+
+def _kod_indeksi(kodlar):
+    kodlar = np.asarray(kodlar, dtype=np.float64)
+    gecerli = np.isfinite(kodlar) & (kodlar >= 0) & (kodlar <= 99)
+    return np.where(gecerli, np.nan_to_num(kodlar), 100).astype(np.intp)
+
+
+def kod_bilgisi(kodlar, gunduz=True):
+    # WMO kodları -> (ikonlar, durumlar); gunduz tek değer ya da kodlarla aynı boyda dizi olabilir
+    indeks = _kod_indeksi(kodlar)
+    ikonlar = np.where(np.asarray(gunduz, dtype=bool), IKON_GUNDUZ[indeks], IKON_GECE[indeks])
+    return ikonlar, DURUM[indeks]
+
+
+def kod_cozucu(kod, gunduz_mu=True):
+    # Tek kod için (ikon, durum)
+    ikonlar, durumlar = kod_bilgisi([kod], gunduz_mu)
+    return ikonlar[0], durumlar[0]
+
+
+def tavsiye_sinifi(df):
+    # Koşullar yukarıdan aşağı öncelikli; TAVSIYELER indeksi ya da TAVSIYE_DURUM
+    kod, en_yuksek = df["kod"].to_numpy(), df["max"].to_numpy()
+    durum = DURUM[_kod_indeksi(kod)]
+    kosullar = [kod >= 95, df["yagis_ihtimal"].to_numpy() > 60, en_yuksek > 30, en_yuksek < 5, en_yuksek < 15, durum == "Açık"]
+    return np.select(kosullar, np.arange(len(kosullar)), TAVSIYE_DURUM).astype(np.int8)
+
+
+def tavsiye_metinleri(df):
+    sinif = df["tavsiye"].to_numpy() if "tavsiye" in df else tavsiye_sinifi(df)
+    durum = DURUM[_kod_indeksi(df["kod"].to_numpy())]
+    return np.where(sinif == TAVSIYE_DURUM, "☁️ " + durum, TAVSIYELER[np.minimum(sinif, TAVSIYE_DURUM - 1)])
+
+
+def ruzgar_sogugu(sicaklik, ruzgar):
+    # Kanada/ABD rüzgar soğuğu formülü; geçerli olmadığı yerlerde sıcaklığın kendisi
+    sicaklik, ruzgar = np.asarray(sicaklik, dtype=np.float64), np.asarray(ruzgar, dtype=np.float64)
+    us = np.power(np.maximum(ruzgar, 0.0), 0.16)
+    soguk = 13.12 + 0.6215 * sicaklik - 11.37 * us + 0.3965 * sicaklik * us
+    return np.where((sicaklik <= RUZGAR_SOGUGU_SICAKLIK) & (ruzgar > RUZGAR_SOGUGU_HIZ), soguk, sicaklik)
+
+
+def turetilmis_ekle(df):
+    # Kopya üzerinde türetilmiş sütunları ekler; "kod" sütunu olan (tahmin) veride tavsiye sınıfı da
+    df = df.copy()
+    en_yuksek, en_dusuk = df["max"].to_numpy(dtype=np.float64), df["min"].to_numpy(dtype=np.float64)
+    ortalama = df["mean"].to_numpy(dtype=np.float64) if "mean" in df else (en_yuksek + en_dusuk) / 2
+    # Büyüme derece-günü için sıcaklıklar taban ile 30 °C arasına kırpılıyor
+    buyume = (np.clip(en_yuksek, BUYUME_TABANI, 30.0) + np.clip(en_dusuk, BUYUME_TABANI, 30.0)) / 2 - BUYUME_TABANI
+    df["buyume_gd"] = buyume.astype(np.float32)
+    df["isitma_gd"] = np.maximum(ISITMA_TABANI - ortalama, 0.0).astype(np.float32)
+    df["sogutma_gd"] = np.maximum(ortalama - SOGUTMA_TABANI, 0.0).astype(np.float32)
+    df["don"] = en_dusuk < 0
+    if "ruzgar" in df:
+        # Günlük en yüksek rüzgarla hesaplandığı için üst sınır niteliğinde
+        df["hissedilen_min"] = ruzgar_sogugu(en_dusuk, df["ruzgar"].to_numpy()).astype(np.float32)
+    if "kod" in df:
+        df["tavsiye"] = tavsiye_sinifi(df)
+    return df
+
+
+def donem_ozeti(df):
+    # Türetilmiş sütunların dönem toplamları (turetilmis_ekle'den geçmiş veri)
+    return {
+        "don_gunu": int(df["don"].sum()),
+        "buyume_gd": float(np.nansum(df["buyume_gd"])),
+        "isitma_gd": float(np.nansum(df["isitma_gd"])),
+        "sogutma_gd": float(np.nansum(df["sogutma_gd"])),
+    }
@@ -0,0 +1,167 @@
+# ================= VERİ HAVUZU =================
+# Oturumlar büyük DataFrame'leri st.session_state'te kendileri tutmak yerine
+# süreç genelindeki bu havuzdan bir tutamaç alıyor. Aynı içerikli veri (aynı
+# şehir ve dönem) tek kopya olarak, sıkıştırılmış sütunlarla saklanıyor:
+#   - ondalıklı sütunlar float32,
+#   - hava durumu kodları int8, tam sayılar sığdığı en küçük tipte,
+#   - tarihler int32 epoch günü (saatlik veride epoch saati).
+# Kayıtlar tutamaç sayısıyla referans sayılıyor; tutamaç çöp toplanınca (oturum
+# kapanınca ya da yeni analizle değişince) sayı düşüyor. Bellek bütçesi aşılınca
+# hiçbir oturumun kullanmadığı kayıtlar en eskiden başlayarak atılıyor.
+
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import izleme
+
+BUTCE = int(os.environ.get("VERI_HAVUZU_MB", 256)) * 1024 * 1024
+KOD_SUTUNLARI = {"kod"}  # WMO hava durumu kodları 0-99
+
+
+def _tarih_sikistir(seri):
+    # Düzenli aralıklı tarihleri (kaydırma + birim * int32) olarak saklar, olmuyorsa int64 saniye
+    tz = seri.dt.tz
+    if tz is not None:
+        seri = seri.dt.tz_convert(None)
+    saniye = seri.to_numpy().astype("datetime64[s]").astype(np.int64)
+    for birim in (86400, 3600):
+        kaydirma = int(saniye[0] % birim) if len(saniye) else 0
+        adim = saniye - kaydirma
+        if not (adim % birim).any():
+            birimli = adim // birim
+            if len(birimli) == 0 or np.abs(birimli).max() < 2 ** 31:
+                return birimli.astype(np.int32), {"kaydirma": kaydirma, "birim": birim, "tz": tz}
+    return saniye, {"kaydirma": 0, "birim": 1, "tz": tz}
+
+
+def _tarih_ac(dizi, bilgi):
+    saniye = dizi.astype(np.int64) * bilgi["birim"] + bilgi["kaydirma"]
+    if bilgi["tz"] is None:
+        return pd.to_datetime(saniye, unit="s")
+    return pd.to_datetime(saniye, unit="s", utc=True).tz_convert(bilgi["tz"])
+
+
+def sikistir(df):
+    # DataFrame -> ({sütun: salt okunur dizi}, {tarih sütunu: çözme bilgisi})
+    sutunlar, tarihler = {}, {}
+    for ad in df.columns:
+        seri = df[ad]
+        if pd.api.types.is_datetime64_any_dtype(seri):
+            dizi, tarihler[ad] = _tarih_sikistir(seri)
+        elif ad in KOD_SUTUNLARI and seri.notna().all():
+            dizi = seri.to_numpy().astype(np.int8)
+        elif pd.api.types.is_float_dtype(seri):
+            dizi = seri.to_numpy(dtype=np.float32)
+        elif pd.api.types.is_integer_dtype(seri):
+            dizi = pd.to_numeric(seri, downcast="integer").to_numpy()
+        else:
+            dizi = seri.to_numpy().copy()
+        dizi.flags.writeable = False
+        sutunlar[ad] = dizi
+    return sutunlar, tarihler
+
+
+def _parmak_izi(sutunlar):
+    ozet = hashlib.sha1()
+    for ad, dizi in sutunlar.items():
+        ozet.update(f"{ad}:{dizi.dtype}:{len(dizi)};".encode())
+        ozet.update(np.ascontiguousarray(dizi).tobytes() if dizi.dtype != object else repr(dizi.tolist()).encode())
+    return ozet.hexdigest()
+
+
+class _Kayit:
+    def __init__(self, sutunlar, tarihler):
+        self.sutunlar = sutunlar
+        self.tarihler = tarihler
+        self.boyut = sum(d.nbytes for d in sutunlar.values())
+        self.referans = 0
+        self._df = None  # en son açılan DataFrame; kullanan kalmayınca serbest kalıyor
+
+    def df(self):
+        df = self._df() if self._df is not None else None
+        if df is None:
+            veri = {ad: _tarih_ac(d, self.tarihler[ad]) if ad in self.tarihler else d for ad, d in self.sutunlar.items()}
+            df = pd.DataFrame(veri, copy=False)
+            self._df = weakref.ref(df)
+        return df
+
+
+class Tutamac:
+    # Oturumda saklanan hafif nesne; veriye df() ile erişiliyor
+    __slots__ = ("anahtar", "satir", "_havuz", "__weakref__")
+
+    def __init__(self, havuz, anahtar, satir):
+        self._havuz, self.anahtar, self.satir = havuz, anahtar, satir
+
+    def df(self):
+        return self._havuz._ac(self.anahtar)
+
+    def __repr__(self):
+        return f"Tutamac({self.anahtar[:10]}, {self.satir} satır)"
+
+
+class VeriHavuzu:
+    def __init__(self, butce=BUTCE):
+        self.butce = butce
+        self._kayitlar = OrderedDict()  # anahtar -> _Kayit, en eski kullanılan başta
+        # Tutamaçlar çöp toplanırken (kilit tutulan bir anda da olabilir) _birak çağrılıyor
+        self._kilit = threading.RLock()
+        self.eklenen = self.paylasilan = self.atilan = 0
+
+    def ekle(self, df):
+        # Aynı içerik havuzda varsa onu paylaşır, yoksa sıkıştırıp ekler
+        sutunlar, tarihler = sikistir(df)
+        anahtar = _parmak_izi(sutunlar)
+        with self._kilit:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is None:
+                kayit = self._kayitlar[anahtar] = _Kayit(sutunlar, tarihler)
+                self.eklenen += 1
+            else:
+                self.paylasilan += 1
+                self._kayitlar.move_to_end(anahtar)
+            kayit.referans += 1
+            self._buda()
+        tutamac = Tutamac(self, anahtar, len(df))
+        weakref.finalize(tutamac, self._birak, anahtar)
+        return tutamac
+
+    def _ac(self, anahtar):
+        with self._kilit:
+            self._kayitlar.move_to_end(anahtar)
+            return self._kayitlar[anahtar].df()
+
+    def _birak(self, anahtar):
+        with self._kilit:
+            kayit = self._kayitlar.get(anahtar)
+            if kayit is not None:
+                kayit.referans -= 1
+                self._buda()
+
+    def _buda(self):
+        # Bütçe aşılıyorsa referansı kalmamış kayıtları en eskiden başlayarak at
+        toplam = sum(k.boyut for k in self._kayitlar.values())
+        for anahtar in [a for a, k in self._kayitlar.items() if k.referans <= 0]:
+            if toplam <= self.butce:
+                break
+            toplam -= self._kayitlar.pop(anahtar).boyut
+            self.atilan += 1
+
+    def durum(self):
+        with self._kilit:
+            return {
+                "kayit": len(self._kayitlar),
+                "bayt": sum(k.boyut for k in self._kayitlar.values()),
+                "referans": sum(k.referans for k in self._kayitlar.values()),
+                "eklenen": self.eklenen, "paylasilan": self.paylasilan, "atilan": self.atilan,
+            }
+
+
+veri_havuzu = VeriHavuzu()
+izleme.kaynak_ekle("veri_havuzu", veri_havuzu.durum)
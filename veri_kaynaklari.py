@@ -0,0 +1,282 @@
+# ================= VERİ KAYNAKLARI =================
+# Open-Meteo'dan veri çeken fonksiyonlar. Streamlit'e bağımlı değil; hem
+# arayüz (app.py) hem de toplu analiz komutu (toplu_analiz.py) bunları
+# kullanıyor. Önbellek, hız sınırı ve tek uçuş süreç içinde paylaşılıyor.
+
+import datetime
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import izleme
+from arsiv_deposu import DEGISKENLER, ArsivDeposu, gun_tarihi, yillik_parcalar
+from bolge import anlik_matrisleri, gunluk_matrisler, toplu_cek
+from eszamanli import arsiv_oturumu, ortak_oturum
+from hiz_sinirlayici import tek_ucus
+from konum_dizini import Konum, katla, konum_dizini
+from onbellek import CEYREK_SAAT, SAAT, zamanli_onbellek
+from saatlik import SAATLIK_DEGISKENLER, SaatlikDepo
+
+# Yerel bir test sunucusuna yönlendirmek için ortam değişkenleriyle değiştirilebilir
+GEOCODING_URL = os.environ.get("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+TAHMIN_URL = os.environ.get("OPEN_METEO_TAHMIN_URL", "https://api.open-meteo.com/v1/forecast")
+ARSIV_URL = os.environ.get("OPEN_METEO_ARSIV_URL", "https://archive-api.open-meteo.com/v1/archive")
+
+@functools.lru_cache(maxsize=None)
+def _istemci(oturum_adi):
+    # openmeteo_requests (FlatBuffers çözücüsüyle) ilk veri isteğinde yükleniyor; oturum başına tek istemci
+    import openmeteo_requests
+    return openmeteo_requests.Client(session=arsiv_oturumu() if oturum_adi == "arsiv" else ortak_oturum())
+
+def koordinat_bul(sehir_adi):
+    # Önce yerel konum dizinine bakılıyor; Open-Meteo Geocoding API'sine sadece dizinde olmayan isimler için gidiliyor
+    dizin = konum_dizini()
+    konum = dizin.bul(sehir_adi)
+    izleme.say("konum_dizini", "iska" if konum is None else "isabet")
+    if konum is None and not dizin.bulunamadi_mi(sehir_adi):
+        konum = _geocoding_sorgula(sehir_adi)
+    if konum is None:
+        return None, None, None
+    return konum.lat, konum.lon, konum.etiket
+
+@tek_ucus
+def _geocoding_sorgula(sehir_adi):
+    url = GEOCODING_URL
+    params = {"name": sehir_adi.partition(",")[0].strip(), "count": 5, "language": "tr"}
+    
+    try:
+        with izleme.aralik("geocoding · istek"):
+            response = ortak_oturum().get(url, params=params, timeout=10)
+            response.raise_for_status() # HTTP hatalarını kontrol et
+            data = response.json()
+    except Exception as e:
+        # Hata olursa buraya düşer (Örneğin internet yoksa falan)
+        izleme.say("geocoding", "hata")
+        print(f"Geocoding API Hatası: {e}")
+        return None
+    
+    dizin = konum_dizini()
+    sonuclar = [Konum(r.get('name', sehir_adi), r.get('country', ''), r.get('admin1', ''), r['latitude'], r['longitude'], r.get('population') or 0, "")
+                for r in (data or {}).get('results') or []]
+    if not sonuclar:
+        dizin.bulunamadi(sehir_adi)
+        return None
+    # Cevap dizine yazılıyor; API'nin yakın eşleşmeyle bulduğu ilk sonuç sorgulanan adla da bulunabilsin
+    ilk = sonuclar[0]
+    if katla(ilk.ad) != katla(params["name"]):
+        sonuclar[0] = ilk._replace(takma_adlar=params["name"].replace(",", " "))
+    dizin.ekle(sonuclar)
+    return dizin.bul(sehir_adi) or ilk
+
+# Anlık veriler 15 dakikada bir güncelleniyor, bir sonraki çeyrek saate kadar önbellekte kalıyor
+@zamanli_onbellek(CEYREK_SAAT)
+@tek_ucus
+def _anlik_veri_cek(lat, lon):
+    openmeteo = _istemci("ortak")
+    url = TAHMIN_URL
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "current": ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "is_day", "weather_code", "wind_speed_10m"],
+        "timezone": "auto"
+    }
+    with izleme.aralik("anlık · istek"):
+        responses = openmeteo.weather_api(url, params=params)
+    response = responses[0]
+    current = response.Current()
+    
+    degerler = tuple(current.Variables(i).Value() for i in range(6))
+    return degerler, response.UtcOffsetSeconds()
+
+def anlik_durum_cek(lat, lon):
+    (sicaklik, nem, hissedilen, gunduz_mu, kod, ruzgar_hiz), offset_saniye = _anlik_veri_cek(lat, lon)
+    
+    # Yerel saat önbellekten bağımsız, her çağrıda şimdiki zamandan hesaplanıyor
+    utc_simdi = datetime.datetime.now(datetime.timezone.utc)
+    yerel_saat = utc_simdi + datetime.timedelta(seconds=offset_saniye)
+    
+    return sicaklik, nem, hissedilen, gunduz_mu, ruzgar_hiz, yerel_saat, int(kod)
+
+# Aynı hücre ve aralık için eşzamanlı gelen istekler (farklı oturumlardan da) tek çağrıda birleşiyor
+@tek_ucus
+def _arsiv_parcasi_cek(lat, lon, baslangic, bitis):
+    openmeteo = _istemci("arsiv")
+    url = ARSIV_URL
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": baslangic,
+        "end_date": bitis,
+        "daily": ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean", "precipitation_sum", "wind_speed_10m_max"],
+        "timezone": "auto"
+    }
+    with izleme.aralik("arşiv · istek"):
+        responses = openmeteo.weather_api(url, params=params)
+    with izleme.aralik("arşiv · çözme"):
+        response = responses[0]
+        daily = response.Daily()
+        offset_saniye = response.UtcOffsetSeconds()
+        
+        # Yerel gün numarası (zaman damgaları yerel gece yarısının UTC karşılığı)
+        ilk_gun = (daily.Time() + offset_saniye) // 86400
+        degerler = np.column_stack([daily.Variables(i).ValuesAsNumpy() for i in range(len(DEGISKENLER))])
+    return ilk_gun, degerler, offset_saniye
+
+ARSIV_ISCI_SAYISI = 4
+
+@izleme.izle("arşiv · toplam")
+def gecmis_veri_cek_v2(lat, lon, baslangic, bitis, ilerleme=None):
+    # Veriler grid hücresi bazında diskte tutuluyor, sadece eksik günler API'den çekiliyor.
+    # Eksik aralıklar yıllık parçalara bölünüp paralel çekilir; ilerleme verilmişse
+    # baştan itibaren hazır olan kısım her parça geldikçe DataFrame olarak ona iletilir.
+    depo = ArsivDeposu(lat, lon)
+    parcalar = [p for bas, bit in depo.eksik_araliklar(baslangic, bitis) for p in yillik_parcalar(bas, bit)]
+    izleme.say("arşiv deposu", "iska" if parcalar else "isabet")
+    if parcalar:
+        with ThreadPoolExecutor(max_workers=ARSIV_ISCI_SAYISI) as havuz:
+            isler = {havuz.submit(_arsiv_parcasi_cek, depo.lat, depo.lon, gun_tarihi(bas).isoformat(), gun_tarihi(bit).isoformat()): i
+                     for i, (bas, bit) in enumerate(parcalar)}
+            biten = [False] * len(parcalar)
+            sira = 0
+            for is_ in as_completed(isler):
+                with izleme.aralik("arşiv · depoya yazma"):
+                    depo.yaz(*is_.result())
+                biten[isler[is_]] = True
+                if ilerleme is None or not biten[sira]:
+                    continue
+                while sira < len(parcalar) and biten[sira]:
+                    sira += 1
+                if sira < len(parcalar):
+                    ilerleme(depo.oku(baslangic, gun_tarihi(parcalar[sira][0] - 1)))
+    
+    with izleme.aralik("arşiv · depodan okuma"):
+        return depo.oku(baslangic, bitis)
+
+# Saatlik mod: değişkenler ayrı float32 sütunlar halinde hücre klasöründe tutuluyor
+SAATLIK_API = dict(zip(SAATLIK_DEGISKENLER, ["temperature_2m", "relative_humidity_2m", "precipitation", "wind_speed_10m", "wind_gusts_10m"]))
+
+@tek_ucus
+def _saatlik_parca_cek(lat, lon, baslangic, bitis):
+    openmeteo = _istemci("arsiv")
+    url = ARSIV_URL
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": baslangic,
+        "end_date": bitis,
+        "hourly": list(SAATLIK_API.values()),
+        "timezone": "auto"
+    }
+    with izleme.aralik("saatlik arşiv · istek"):
+        responses = openmeteo.weather_api(url, params=params)
+    with izleme.aralik("saatlik arşiv · çözme"):
+        response = responses[0]
+        hourly = response.Hourly()
+        offset_saniye = response.UtcOffsetSeconds()
+        
+        ilk_gun = (hourly.Time() + offset_saniye) // 86400
+        degerler = np.column_stack([hourly.Variables(i).ValuesAsNumpy() for i in range(len(SAATLIK_API))])
+    return ilk_gun, degerler, offset_saniye
+
+@izleme.izle("saatlik arşiv · toplam")
+def saatlik_veri_cek(lat, lon, baslangic, bitis):
+    # Eksik yıllar paralel çekilip depoya yazılıyor. Veri belleğe alınmıyor, depo döndürülüyor;
+    # özetler gerektiğinde depodan parça parça hesaplanıyor.
+    depo = SaatlikDepo(lat, lon)
+    parcalar = [p for bas, bit in depo.eksik_araliklar(baslangic, bitis) for p in yillik_parcalar(bas, bit)]
+    izleme.say("saatlik depo", "iska" if parcalar else "isabet")
+    if parcalar:
+        with ThreadPoolExecutor(max_workers=ARSIV_ISCI_SAYISI) as havuz:
+            isler = [havuz.submit(_saatlik_parca_cek, depo.lat, depo.lon, gun_tarihi(bas).isoformat(), gun_tarihi(bit).isoformat())
+                     for bas, bit in parcalar]
+            for is_ in as_completed(isler):
+                depo.yaz(*is_.result())
+    return depo
+
+# Tahmin modelleri saatlik güncelleniyor, eski tahmin sunulmasın diye saat başında bayatlıyor
+@zamanli_onbellek(SAAT)
+@tek_ucus
+def tahmin_veri_cek(lat, lon):
+    openmeteo = _istemci("ortak")
+    url = TAHMIN_URL
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_probability_max", "wind_speed_10m_max", "weather_code"],
+        "forecast_days": 7,
+        "timezone": "auto"
+    }
+    with izleme.aralik("tahmin · istek"):
+        responses = openmeteo.weather_api(url, params=params)
+    daily = responses[0].Daily()
+    
+    data = {"date": pd.date_range(
+        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
+        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
+        freq=pd.Timedelta(seconds=daily.Interval()),
+        inclusive="left"
+    )}
+    data["max"] = daily.Variables(0).ValuesAsNumpy()
+    data["min"] = daily.Variables(1).ValuesAsNumpy()
+    data["yagis_ihtimal"] = daily.Variables(2).ValuesAsNumpy()
+    data["ruzgar"] = daily.Variables(3).ValuesAsNumpy()
+    data["kod"] = daily.Variables(4).ValuesAsNumpy()
+    
+    return pd.DataFrame(data)
+
+@zamanli_onbellek(SAAT)
+@tek_ucus
+def saatlik_tahmin_cek(lat, lon):
+    openmeteo = _istemci("ortak")
+    url = TAHMIN_URL
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": list(SAATLIK_API.values()),
+        "forecast_days": 7,
+        "timezone": "auto"
+    }
+    with izleme.aralik("saatlik tahmin · istek"):
+        responses = openmeteo.weather_api(url, params=params)
+    hourly = responses[0].Hourly()
+    
+    # Saatler yerel saat olarak tutuluyor (gün içi saatler doğrudan okunabilsin)
+    degerler = {ad: hourly.Variables(i).ValuesAsNumpy() for i, ad in enumerate(SAATLIK_API)}
+    baslangic = pd.to_datetime(hourly.Time() + responses[0].UtcOffsetSeconds(), unit="s")
+    data = {"date": pd.date_range(baslangic, periods=len(degerler["sicaklik"]), freq="h")}
+    data.update(degerler)
+    return pd.DataFrame(data)
+
+# Bölge modu: ızgaradaki noktalar virgülle ayrılmış koordinat listeleriyle partiler halinde
+# çekiliyor (yüzlerce nokta birkaç istekte). Uzun listeler URL'ye sığsın diye POST kullanılıyor.
+BOLGE_ANLIK = {"sicaklik": "temperature_2m", "hissedilen": "apparent_temperature", "nem": "relative_humidity_2m", "ruzgar": "wind_speed_10m"}
+BOLGE_TAHMIN = {"max": "temperature_2m_max", "min": "temperature_2m_min", "yagis_ihtimal": "precipitation_probability_max", "ruzgar": "wind_speed_10m_max"}
+BOLGE_ARSIV = dict(zip(DEGISKENLER, ["temperature_2m_max", "temperature_2m_min", "temperature_2m_mean", "precipitation_sum", "wind_speed_10m_max"]))
+
+def _bolge_istegi(url, oturum_adi, params):
+    openmeteo = _istemci(oturum_adi)
+
+    def istek(enlemler, boylamlar):
+        with izleme.aralik("bölge · istek"):
+            return openmeteo.weather_api(url, params={**params, "latitude": enlemler, "longitude": boylamlar}, method="POST")
+    return istek
+
+@zamanli_onbellek(CEYREK_SAAT)
+@tek_ucus
+def bolge_anlik_cek(izgara):
+    istek = _bolge_istegi(TAHMIN_URL, "ortak", {"current": list(BOLGE_ANLIK.values()), "timezone": "auto"})
+    return anlik_matrisleri(toplu_cek(istek, izgara), izgara, list(BOLGE_ANLIK))
+
+@zamanli_onbellek(SAAT)
+@tek_ucus
+def bolge_tahmin_cek(izgara):
+    istek = _bolge_istegi(TAHMIN_URL, "ortak", {"daily": list(BOLGE_TAHMIN.values()), "forecast_days": 7, "timezone": "auto"})
+    return gunluk_matrisler(toplu_cek(istek, izgara), izgara, list(BOLGE_TAHMIN))
+
+@tek_ucus
+def bolge_arsiv_cek(izgara, baslangic, bitis):
+    istek = _bolge_istegi(ARSIV_URL, "arsiv", {"daily": list(BOLGE_ARSIV.values()), "start_date": baslangic, "end_date": bitis, "timezone": "auto"})
+    return gunluk_matrisler(toplu_cek(istek, izgara), izgara, list(BOLGE_ARSIV))